@@ -7,6 +7,7 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.models import Base
+from app.models.partition import is_partition_name
 from app.core.config import db_settings
 
 # this is the Alembic Config object, which provides
@@ -29,6 +30,27 @@ config.set_main_option("sqlalchemy.url", db_settings.url)
 # то есть какие таблицы описаны в моделях и какие метаданные они имеют (столбцы, строки и их параметры)
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Секции секционированных таблиц (и отсоединенные в архив) не описаны в моделях,
+    поэтому autogenerate не должен предлагать их удалить
+    """
+    return not (type_ == "table" and is_partition_name(name))
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Внешний ключ на секционированную таблицу PostgreSQL дублирует служебными ограничениями
+    на каждую ее секцию, в моделях их нет
+    """
+    return not (
+        type_ == "foreign_key_constraint"
+        and reflected
+        and is_partition_name(object.referred_table.name)
+    )
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +73,8 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -60,7 +84,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
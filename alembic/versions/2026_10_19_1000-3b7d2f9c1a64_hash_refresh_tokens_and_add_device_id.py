@@ -0,0 +1,80 @@
+"""store sha-256 hash of refresh token instead of the raw token, add device_id for multiple devices per user
+
+Revision ID: 3b7d2f9c1a64
+Revises: 19f8f61eb46b
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7d2f9c1a64"
+down_revision: Union[str, Sequence[str], None] = "19f8f61eb46b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens",
+        sa.Column(
+            "device_id",
+            sa.String(length=64),
+            server_default="default",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.LargeBinary(length=32), nullable=True),
+    )
+    # Существующие токены не теряются: хэш считается на стороне БД (sha256 встроена в PostgreSQL 11+)
+    op.execute(
+        "UPDATE refresh_tokens SET token_hash = sha256(convert_to(token, 'UTF8'))"
+    )
+    op.alter_column("refresh_tokens", "token_hash", nullable=False)
+
+    op.drop_constraint(
+        "refresh_tokens_token_key", "refresh_tokens", type_="unique"
+    )
+    op.drop_column("refresh_tokens", "token")
+    op.create_unique_constraint(
+        "refresh_tokens_token_hash_key", "refresh_tokens", ["token_hash"]
+    )
+
+    # Составной уникальный ключ - цель для INSERT ... ON CONFLICT, его ведущая колонка заменяет индекс по user_id
+    op.create_unique_constraint(
+        "idx_unique_user_device", "refresh_tokens", ["user_id", "device_id"]
+    )
+    op.drop_index(op.f("ix_refresh_tokens_user_id"), table_name="refresh_tokens")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходный токен по хэшу не восстановить, поэтому все сессии сбрасываются
+    op.execute("DELETE FROM refresh_tokens")
+
+    op.create_index(
+        op.f("ix_refresh_tokens_user_id"),
+        "refresh_tokens",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_constraint("idx_unique_user_device", "refresh_tokens", type_="unique")
+    op.drop_constraint(
+        "refresh_tokens_token_hash_key", "refresh_tokens", type_="unique"
+    )
+    op.drop_column("refresh_tokens", "token_hash")
+    op.add_column(
+        "refresh_tokens", sa.Column("token", sa.Text(), nullable=False)
+    )
+    op.create_unique_constraint(
+        "refresh_tokens_token_key", "refresh_tokens", ["token"]
+    )
+    op.drop_column("refresh_tokens", "device_id")
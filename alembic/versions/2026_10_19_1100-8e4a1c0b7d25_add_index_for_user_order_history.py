@@ -0,0 +1,44 @@
+"""add composite index (user_id, created_at DESC, id DESC) for user order history pagination
+
+Revision ID: 8e4a1c0b7d25
+Revises: 3b7d2f9c1a64
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4a1c0b7d25"
+down_revision: Union[str, Sequence[str], None] = "3b7d2f9c1a64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в orders, но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_user_id_created_at_id",
+            "orders",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_orders_user_id_created_at_id",
+            table_name="orders",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
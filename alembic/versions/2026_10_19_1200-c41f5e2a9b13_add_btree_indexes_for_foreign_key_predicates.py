@@ -0,0 +1,57 @@
+"""add btree indexes on user_id and product_id foreign keys used in repository predicates
+
+Revision ID: c41f5e2a9b13
+Revises: 8e4a1c0b7d25
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f5e2a9b13"
+down_revision: Union[str, Sequence[str], None] = "8e4a1c0b7d25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (таблица, колонка): orders.user_id уже покрыт составным индексом истории заказов,
+# cart_id и order_id - уникальными ограничениями (cart_id, product_id) и (order_id, product_id),
+# индексы по product_id нужны для каскадного удаления продукта
+INDEXES = (
+    ("posts", "user_id"),
+    ("profiles", "user_id"),
+    ("carts", "user_id"),
+    ("cart_products", "product_id"),
+    ("order_products", "product_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицы, но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(
+                op.f(f"ix_{table}_{column}"),
+                table,
+                [column],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.drop_index(
+                op.f(f"ix_{table}_{column}"),
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
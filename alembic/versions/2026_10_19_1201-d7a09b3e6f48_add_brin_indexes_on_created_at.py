@@ -0,0 +1,60 @@
+"""add brin indexes on created_at for date range queries
+
+Revision ID: d7a09b3e6f48
+Revises: c41f5e2a9b13
+Create Date: 2026-10-19 12:01:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a09b3e6f48"
+down_revision: Union[str, Sequence[str], None] = "c41f5e2a9b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Таблицы, по которым get_by_date выбирает интервал created_at
+TABLES = (
+    "users",
+    "posts",
+    "products",
+    "profiles",
+    "carts",
+    "orders",
+)
+
+# Должно совпадать с BRIN_PAGES_PER_RANGE в app/models/mixin.py
+BRIN_PAGES_PER_RANGE = 16
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f"ix_{table}_created_at_brin",
+                table,
+                ["created_at"],
+                unique=False,
+                postgresql_using="brin",
+                postgresql_with={"pages_per_range": BRIN_PAGES_PER_RANGE},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                f"ix_{table}_created_at_brin",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,254 @@
+"""partition orders and order_products by month of created_at
+
+Revision ID: 5f2e8b61d0a7
+Revises: d7a09b3e6f48
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2e8b61d0a7"
+down_revision: Union[str, Sequence[str], None] = "d7a09b3e6f48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Секции на сколько месяцев вперед создаются сразу, дальше их создает app.maintenance.partitions
+MONTHS_AHEAD = 3
+
+# Должно совпадать с BRIN_PAGES_PER_RANGE в app/models/mixin.py
+BRIN_PAGES_PER_RANGE = 16
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def create_partitions(table: str, first: datetime, last: datetime) -> None:
+    month = first
+
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Старые таблицы переименовываются, имена их индексов освобождаются для новых таблиц
+    op.rename_table("order_products", "order_products_unpartitioned")
+    op.rename_table("orders", "orders_unpartitioned")
+    op.execute(
+        "ALTER TABLE orders_unpartitioned "
+        "RENAME CONSTRAINT orders_pkey TO orders_unpartitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE order_products_unpartitioned "
+        "RENAME CONSTRAINT order_products_pkey TO order_products_unpartitioned_pkey"
+    )
+    op.drop_constraint("orders_promo_code_key", "orders_unpartitioned", type_="unique")
+    op.drop_index("ix_orders_user_id_created_at_id", table_name="orders_unpartitioned")
+    op.drop_index("ix_orders_created_at_brin", table_name="orders_unpartitioned")
+    op.drop_constraint(
+        "idx_unique_order_product", "order_products_unpartitioned", type_="unique"
+    )
+    op.drop_index(
+        "ix_order_products_product_id", table_name="order_products_unpartitioned"
+    )
+
+    # Колонки, значения по умолчанию (в том числе nextval последовательностей id) и CHECK копируются как есть
+    op.execute(
+        "CREATE TABLE orders (LIKE orders_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        "CREATE TABLE order_products "
+        "(LIKE order_products_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_products_id_seq OWNED BY order_products.id")
+
+    # Секции создаются с месяца самого старого заказа, границы месяцев в UTC
+    oldest = op.get_bind().execute(
+        sa.text("SELECT min(created_at) FROM orders_unpartitioned")
+    ).scalar() or datetime.now(timezone.utc)
+    oldest = oldest.astimezone(timezone.utc)
+    first = datetime(oldest.year, oldest.month, 1, tzinfo=timezone.utc)
+    current = datetime.now(timezone.utc)
+    current = datetime(current.year, current.month, 1, tzinfo=timezone.utc)
+    last = add_months(current, MONTHS_AHEAD)
+
+    for table in ("orders", "order_products"):
+        create_partitions(table, first, last)
+
+    op.execute("INSERT INTO orders SELECT * FROM orders_unpartitioned")
+    # Позиция заказа лежит в секции своего заказа, поэтому получает его created_at
+    op.execute(
+        "INSERT INTO order_products "
+        "(id, order_id, product_id, quantity, current_price, created_at, updated_at) "
+        "SELECT p.id, p.order_id, p.product_id, p.quantity, p.current_price, o.created_at, p.updated_at "
+        "FROM order_products_unpartitioned p "
+        "JOIN orders_unpartitioned o ON o.id = p.order_id"
+    )
+
+    op.create_primary_key("orders_pkey", "orders", ["id", "created_at"])
+    op.create_foreign_key(
+        "orders_user_id_fkey",
+        "orders",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_orders_user_id_created_at_id",
+        "orders",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_created_at_brin",
+        "orders",
+        ["created_at"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": BRIN_PAGES_PER_RANGE},
+    )
+
+    op.create_primary_key("order_products_pkey", "order_products", ["id", "created_at"])
+    op.create_unique_constraint(
+        "idx_unique_order_product",
+        "order_products",
+        ["order_id", "product_id", "created_at"],
+    )
+    op.create_foreign_key(
+        "order_products_order_id_created_at_fkey",
+        "order_products",
+        "orders",
+        ["order_id", "created_at"],
+        ["id", "created_at"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_products_product_id_fkey",
+        "order_products",
+        "products",
+        ["product_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_order_products_product_id",
+        "order_products",
+        ["product_id"],
+        unique=False,
+    )
+
+    op.drop_table("order_products_unpartitioned")
+    op.drop_table("orders_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Отсоединенные в архив секции не возвращаются, переносятся только строки, оставшиеся в таблицах
+    op.rename_table("order_products", "order_products_partitioned")
+    op.rename_table("orders", "orders_partitioned")
+    op.execute(
+        "ALTER TABLE orders_partitioned "
+        "RENAME CONSTRAINT orders_pkey TO orders_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE order_products_partitioned "
+        "RENAME CONSTRAINT order_products_pkey TO order_products_partitioned_pkey"
+    )
+    op.drop_index("ix_orders_user_id_created_at_id", table_name="orders_partitioned")
+    op.drop_index("ix_orders_created_at_brin", table_name="orders_partitioned")
+    op.drop_constraint(
+        "idx_unique_order_product", "order_products_partitioned", type_="unique"
+    )
+    op.drop_index(
+        "ix_order_products_product_id", table_name="order_products_partitioned"
+    )
+
+    op.execute(
+        "CREATE TABLE orders (LIKE orders_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute(
+        "CREATE TABLE order_products "
+        "(LIKE order_products_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_products_id_seq OWNED BY order_products.id")
+
+    op.execute("INSERT INTO orders SELECT * FROM orders_partitioned")
+    op.execute("INSERT INTO order_products SELECT * FROM order_products_partitioned")
+
+    op.create_primary_key("orders_pkey", "orders", ["id"])
+    op.create_unique_constraint("orders_promo_code_key", "orders", ["promo_code"])
+    op.create_foreign_key(
+        "orders_user_id_fkey",
+        "orders",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_orders_user_id_created_at_id",
+        "orders",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_created_at_brin",
+        "orders",
+        ["created_at"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": BRIN_PAGES_PER_RANGE},
+    )
+
+    op.create_primary_key("order_products_pkey", "order_products", ["id"])
+    op.create_unique_constraint(
+        "idx_unique_order_product",
+        "order_products",
+        ["order_id", "product_id"],
+    )
+    op.create_foreign_key(
+        "order_products_order_id_fkey",
+        "order_products",
+        "orders",
+        ["order_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_products_product_id_fkey",
+        "order_products",
+        "products",
+        ["product_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_order_products_product_id",
+        "order_products",
+        ["product_id"],
+        unique=False,
+    )
+
+    op.drop_table("order_products_partitioned")
+    op.drop_table("orders_partitioned")
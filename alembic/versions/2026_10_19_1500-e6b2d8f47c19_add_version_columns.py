@@ -0,0 +1,49 @@
+"""add version columns
+
+Revision ID: e6b2d8f47c19
+Revises: a9c3e7d2b815
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2d8f47c19"
+down_revision: Union[str, Sequence[str], None] = "a9c3e7d2b815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Таблицы моделей с TimestampMixin, для секционированных orders и order_products колонка добавляется во все секции
+TABLES = (
+    "users",
+    "profiles",
+    "products",
+    "carts",
+    "cart_products",
+    "posts",
+    "orders",
+    "order_products",
+    "refresh_tokens",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # server_default с константой не переписывает таблицу, существующие строки получают версию 1
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        op.drop_column(table, "version")
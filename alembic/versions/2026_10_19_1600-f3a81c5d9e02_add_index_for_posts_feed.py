@@ -0,0 +1,45 @@
+"""add index (created_at DESC, id DESC) for posts feed pagination
+
+Revision ID: f3a81c5d9e02
+Revises: e6b2d8f47c19
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a81c5d9e02"
+down_revision: Union[str, Sequence[str], None] = "e6b2d8f47c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # BRIN индекс по created_at не отдает строки в порядке сортировки, ленте нужен btree.
+    # CONCURRENTLY не блокирует запись в posts, но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_created_at_id",
+            "posts",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_created_at_id",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
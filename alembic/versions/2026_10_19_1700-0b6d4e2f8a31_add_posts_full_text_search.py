@@ -0,0 +1,67 @@
+"""add generated tsvector column and GIN index for posts full-text search
+
+Revision ID: 0b6d4e2f8a31
+Revises: f3a81c5d9e02
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b6d4e2f8a31"
+down_revision: Union[str, Sequence[str], None] = "f3a81c5d9e02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Выражение должно совпадать с Computed колонки Post.search_vector
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Добавление STORED колонки переписывает таблицу posts под ACCESS EXCLUSIVE блокировкой,
+    # дальше вектор пересчитывается только для вставляемых и изменяемых строк
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=False,
+        ),
+    )
+
+    # CONCURRENTLY не блокирует запись в posts, но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_search_vector",
+            "posts",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_search_vector",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column("posts", "search_vector")
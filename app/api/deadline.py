@@ -0,0 +1,106 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request
+from starlette.requests import ClientDisconnect
+from starlette.responses import Response
+
+from app.core import deadline_settings
+from app.core.deadline import canceled_by_statement_timeout, deadline_scope
+from app.core.metrics import REQUESTS_ABANDONED
+from app.tools import HTTPErrors
+
+
+# Код ответа nginx для запроса, клиент которого отключился до ответа. Ответ никто не получит, код виден в логах
+CLIENT_CLOSED_REQUEST = 499
+
+
+def client_timeout(request: Request) -> Optional[float]:
+    """
+    :param request: Запрос
+    :return: Время ожидания клиента из заголовка deadline_settings.header, None без заголовка или с неверным значением
+    """
+    value = request.headers.get(deadline_settings.header)
+
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+def request_timeout(request: Request, timeout: float) -> float:
+    """
+    :param request: Запрос
+    :param timeout: Срок маршрута в секундах
+    :return: Срок запроса: срок маршрута, сокращенный временем ожидания клиента
+    """
+    waiting = client_timeout(request)
+
+    return timeout if waiting is None else min(timeout, waiting)
+
+
+async def cancel_on_disconnect(request: Request, task: asyncio.Task) -> None:
+    # Тело запроса уже прочитано, следующее сообщение сервер отдает только при отключении клиента
+    while True:
+        message = await request.receive()
+
+        if message["type"] == "http.disconnect":
+            task.cancel()
+            return
+
+
+async def handle_with_deadline(
+    handler: Callable[[Request], Awaitable[Response]],
+    request: Request,
+    route: str,
+    timeout: Optional[float] = None,
+) -> Response:
+    """
+    Обрабатывает запрос со сроком: по истечении срока обработка прерывается и клиент получает 504,
+    при отключении клиента обработка отменяется сразу. В обоих случаях отменяется и текущий запрос к БД,
+    asyncpg отправляет PostgreSQL запрос отмены, а транзакция откатывается
+    :param handler: Обработчик маршрута FastAPI
+    :param request: Запрос
+    :param route: Метод и шаблон пути маршрута для метрики
+    :param timeout: Срок маршрута (RouteTimeout) в секундах, по умолчанию deadline_settings.default
+    :raises HTTPException: 504, если срок истек
+    :raises ClientDisconnect: Клиент отключился до ответа
+    """
+    if timeout is None:
+        timeout = deadline_settings.default
+
+    # FastAPI берет тело из кеша запроса, поэтому чтение сообщений дальше не отнимает его у обработчика
+    await request.body()
+
+    task = asyncio.current_task()
+    watcher = asyncio.create_task(cancel_on_disconnect(request, task))
+
+    try:
+        async with deadline_scope(request_timeout(request, timeout)) as deadline:
+            return await handler(request)
+
+    except asyncio.CancelledError:
+        if not watcher.done() or watcher.cancelled():
+            raise
+
+        task.uncancel()
+        REQUESTS_ABANDONED.labels(route=route, reason="disconnect").inc()
+        raise ClientDisconnect()
+
+    except Exception as e:
+        # Кроме TimeoutError таймера срока сюда попадает ошибка statement_timeout, выставленного по сроку
+        if not (deadline.expired() or canceled_by_statement_timeout(e)):
+            raise
+
+        REQUESTS_ABANDONED.labels(route=route, reason="deadline").inc()
+        raise HTTPErrors.deadline_exceeded from e
+
+    finally:
+        watcher.cancel()
+
+
+async def client_disconnected(request: Request, exc: ClientDisconnect) -> Response:
+    return Response(status_code=CLIENT_CLOSED_REQUEST)
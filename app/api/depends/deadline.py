@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi.dependencies.models import Dependant
+
+
+class RouteTimeout:
+    """
+    Срок обработки маршрута вместо deadline_settings.default, подключается в dependencies маршрута или роутера:
+    отчетам и выгрузкам нужно больше времени, чем запросам пользователей. Заголовок клиента по-прежнему его сокращает.
+    Срок читает PydanticRoute из зависимостей маршрута (route_timeout) до выполнения любой из них, поэтому
+    транзакция, которую открыла зависимость роутера (admin_guard), получает statement_timeout уже по сроку маршрута
+    """
+
+    def __init__(self, timeout: float) -> None:
+        """
+        :param timeout: Время на обработку запроса в секундах
+        """
+        self.timeout = timeout
+
+    async def __call__(self) -> None:
+        return None
+
+
+def route_timeout(dependant: Dependant) -> Optional[float]:
+    """
+    Срок маршрута из RouteTimeout в его зависимостях, включая вложенные.
+    Если их несколько, действует последний по порядку выполнения: срок маршрута заменяет срок роутера
+    :param dependant: Зависимости маршрута
+    :return: Срок в секундах, None без RouteTimeout
+    """
+    timeout = None
+
+    for dependency in dependant.dependencies:
+        nested = route_timeout(dependency)
+
+        if nested is not None:
+            timeout = nested
+
+        if isinstance(dependency.call, RouteTimeout):
+            timeout = dependency.call.timeout
+
+    return timeout
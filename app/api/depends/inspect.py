@@ -1,8 +1,10 @@
-from datetime import datetime
-from typing import Annotated
+from datetime import date, datetime
+from typing import Annotated, Optional
 
 from fastapi import Query, HTTPException, status
 
+from app.utils.cursor import CursorUtils
+
 
 class Inspector:
 
@@ -25,3 +27,91 @@ class Inspector:
             )
 
         return date_start, date_end
+
+    @classmethod
+    async def optional_date_checker(
+        cls,
+        date_start: Annotated[
+            Optional[datetime],
+            Query(description="Start date, inclusive (Format: YYYY-MM-DD HH:MM:SS)"),
+        ] = None,
+        date_end: Annotated[
+            Optional[datetime],
+            Query(description="End date, exclusive (Format: YYYY-MM-DD HH:MM:SS)"),
+        ] = None,
+    ) -> tuple[Optional[datetime], Optional[datetime]]:
+        if date_start is not None and date_end is not None and date_start >= date_end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_start must be less than date_end",
+            )
+
+        return date_start, date_end
+
+    @classmethod
+    async def day_checker(
+        cls,
+        date_start: Annotated[
+            date,
+            Query(..., description="First day, inclusive (Format: YYYY-MM-DD)"),
+        ],
+        date_end: Annotated[
+            date,
+            Query(..., description="Last day, inclusive (Format: YYYY-MM-DD)"),
+        ],
+    ) -> tuple[date, date]:
+        if date_start > date_end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_start must not be greater than date_end",
+            )
+
+        return date_start, date_end
+
+    @classmethod
+    async def page_checker(
+        cls,
+        limit: Annotated[
+            int,
+            Query(ge=1, le=100, description="Page size"),
+        ] = 20,
+        cursor: Annotated[
+            Optional[str],
+            Query(description="Cursor of the next page from the previous response"),
+        ] = None,
+    ) -> tuple[int, Optional[tuple[datetime, int]]]:
+        if cursor is None:
+            return limit, None
+
+        try:
+            return limit, CursorUtils.decode_cursor(cursor)
+
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    @classmethod
+    async def search_page_checker(
+        cls,
+        limit: Annotated[
+            int,
+            Query(ge=1, le=100, description="Page size"),
+        ] = 20,
+        cursor: Annotated[
+            Optional[str],
+            Query(description="Cursor of the next page from the previous response"),
+        ] = None,
+    ) -> tuple[int, Optional[tuple[float, int]]]:
+        if cursor is None:
+            return limit, None
+
+        try:
+            return limit, CursorUtils.decode_rank_cursor(cursor)
+
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
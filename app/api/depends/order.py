@@ -3,9 +3,10 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Order as Order_model
-from app.schemas import OrderCreate, OrderUpdate
+from app.schemas import OrderCreate, OrderUpdate, OrderPageResponse, OrderResponse
 from app.service.order import OrderService
-from app.tools import HTTPErrors
+from app.tools import ConflictError, HTTPErrors
+from app.utils import ResponseUtils
 
 
 class OrderDepends:
@@ -33,6 +34,29 @@ class OrderDepends:
 
         return list_order_model
 
+    @classmethod
+    async def get_order_page(
+        cls,
+        user_id: int,
+        page: tuple[int, Optional[tuple[datetime, int]]],
+        session: AsyncSession,
+    ) -> OrderPageResponse:
+        """
+        Обрабатывает запрос с frontend на получение страницы истории заказов пользователя
+        :param user_id: id пользователя
+        :param page: Размер страницы и раскодированный курсор, полученные из зависимости Inspector.page_checker
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Страница заказов без позиций
+        """
+        limit, after = page
+
+        return await OrderService.get_order_page(
+            user_id=user_id,
+            limit=limit,
+            after=after,
+            session=session,
+        )
+
     @classmethod
     async def get_all_oreders_by_date(
         cls,
@@ -118,12 +142,15 @@ class OrderDepends:
         :param param:
         :return:
         """
-        updated_order_model = await OrderService.update_order_partial(
-            user_id=user_id,
-            order_id=order_id,
-            order_schema=order_schema,
-            session=session,
-        )
+        try:
+            updated_order_model = await OrderService.update_order_partial(
+                user_id=user_id,
+                order_id=order_id,
+                order_schema=order_schema,
+                session=session,
+            )
+        except ConflictError as e:
+            raise HTTPErrors.conflict(ResponseUtils.dump_python(Optional[OrderResponse], e.current))
 
         if not updated_order_model:
             raise HTTPErrors.db_error
@@ -154,7 +181,7 @@ class OrderDepends:
         return deleted_order_model
     
 
-    classmethod
+    @classmethod
     async def delete_all_user_orders(
         cls,
         session: AsyncSession,
@@ -2,10 +2,11 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas import PostCreate, PostUpdate, PostResponse
+from app.schemas import PostCreate, PostUpdate, PostResponse, PostPageResponse, PostSearchPageResponse
 from app.models import Post as Post_model
 from app.service import PostService
-from app.tools import HTTPErrors
+from app.tools import ConflictError, HTTPErrors
+from app.utils import ResponseUtils
 
 
 class PostDepends:
@@ -32,6 +33,55 @@ class PostDepends:
 
         return list_post_models
 
+    @classmethod
+    async def get_feed_page(
+        cls,
+        page: tuple[int, Optional[tuple[datetime, int]]],
+        session: AsyncSession,
+    ) -> PostPageResponse:
+        """
+        Обрабатывает запрос с frontend на получение страницы ленты постов всех пользователей
+        :param page: Размер страницы и раскодированный курсор, полученные из зависимости Inspector.page_checker
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Страница постов, пустая, если постов нет
+        """
+        limit, after = page
+
+        return await PostService.get_feed_page(
+            limit=limit,
+            after=after,
+            session=session,
+        )
+
+    @classmethod
+    async def search_posts(
+        cls,
+        query: str,
+        page: tuple[int, Optional[tuple[float, int]]],
+        dates: tuple[Optional[datetime], Optional[datetime]],
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+    ) -> PostSearchPageResponse:
+        """
+        Обрабатывает запрос с frontend на полнотекстовый поиск постов
+        :param query: Строка поиска
+        :param page: Размер страницы и раскодированный курсор, полученные из зависимости Inspector.search_page_checker
+        :param dates: Интервал даты создания поста, полученный из зависимости Inspector.optional_date_checker
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :param user_id: Искать только среди постов пользователя
+        :return: Страница результатов, пустая, если ничего не найдено
+        """
+        limit, after = page
+
+        return await PostService.search_page(
+            query=query,
+            limit=limit,
+            user_id=user_id,
+            dates=dates,
+            after=after,
+            session=session,
+        )
+
     @classmethod
     async def get_all_posts_by_date(
         cls,
@@ -117,13 +167,16 @@ class PostDepends:
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
         :return: Добавленного в БД пользователя в виде Pydantic схемы
         """
-        updated_post_model = await PostService.update_model(
-            scheme_in=post_scheme,
-            session=session,
-            user_id=user_id,
-            model_id=post_id,
-            partial=partial,
-        )
+        try:
+            updated_post_model = await PostService.update_model(
+                scheme_in=post_scheme,
+                session=session,
+                user_id=user_id,
+                model_id=post_id,
+                partial=partial,
+            )
+        except ConflictError as e:
+            raise HTTPErrors.conflict(ResponseUtils.dump_python(Optional[PostResponse], e.current))
 
         if not updated_post_model:
             raise HTTPErrors.err_update_model
@@ -2,8 +2,9 @@ from typing import Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas import ProductCreate, ProductUpdate
-from app.tools import HTTPErrors
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.tools import ConflictError, HTTPErrors
+from app.utils import ResponseUtils
 from app.service import ProductService
 from app.models import Product as Product_model
 
@@ -110,12 +111,15 @@ class ProductDepends:
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
         :return: Добавленного в БД пользователя в виде Pydantic схемы
         """
-        product_model = await ProductService.update_model(
-            model_id=product_id,
-            scheme_in=product_scheme,
-            session=session,
-            partial=partial,
-        )
+        try:
+            product_model = await ProductService.update_model(
+                model_id=product_id,
+                scheme_in=product_scheme,
+                session=session,
+                partial=partial,
+            )
+        except ConflictError as e:
+            raise HTTPErrors.conflict(ResponseUtils.dump_python(Optional[ProductResponse], e.current))
 
         if not product_model:
             raise HTTPErrors.db_error
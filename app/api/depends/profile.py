@@ -2,10 +2,11 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas import ProfileCreate, ProfileUpdate
+from app.schemas import ProfileCreate, ProfileUpdate, ProfileResponse
 from app.models import Profile as Profile_model
 from app.service import ProfileService
-from app.tools import HTTPErrors
+from app.tools import ConflictError, HTTPErrors
+from app.utils import ResponseUtils
 
 
 class ProfileDepends:
@@ -113,12 +114,15 @@ class ProfileDepends:
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
         :return: Добавленного в БД пользователя в виде Pydantic схемы
         """
-        updated_profile_model = await ProfileService.update_model(
-            scheme_in=profile_scheme,
-            session=session,
-            partial=partial,
-            user_id=user_id,
-        )
+        try:
+            updated_profile_model = await ProfileService.update_model(
+                scheme_in=profile_scheme,
+                session=session,
+                partial=partial,
+                user_id=user_id,
+            )
+        except ConflictError as e:
+            raise HTTPErrors.conflict(ResponseUtils.dump_python(Optional[ProfileResponse], e.current))
 
         if not updated_profile_model:
             raise HTTPErrors.db_error
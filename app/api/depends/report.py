@@ -0,0 +1,50 @@
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas import ProductSalesResponse, SalesReportResponse
+from app.service import SalesService
+from app.tools import SalesPeriod
+
+
+class ReportDepends:
+
+    @classmethod
+    async def get_sales_report(
+        cls,
+        dates: tuple[date, date],
+        period: SalesPeriod,
+        session: AsyncSession,
+    ) -> list[SalesReportResponse]:
+        """
+        Обрабатывает запрос с frontend на получение итогов продаж за интервал дней
+        :param dates: Первый и последний день интервала, полученные из зависимости Inspector.day_checker
+        :param period: Период группировки итогов
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Список итогов по периодам, пустой, если продаж не было
+        """
+        return await SalesService.get_sales_report(
+            dates=dates,
+            period=period,
+            session=session,
+        )
+
+    @classmethod
+    async def get_product_sales(
+        cls,
+        dates: tuple[date, date],
+        limit: int,
+        session: AsyncSession,
+    ) -> list[ProductSalesResponse]:
+        """
+        Обрабатывает запрос с frontend на получение продуктов с наибольшей выручкой за интервал дней
+        :param dates: Первый и последний день интервала, полученные из зависимости Inspector.day_checker
+        :param limit: Количество продуктов
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Список итогов по продуктам, пустой, если продаж не было
+        """
+        return await SalesService.get_product_sales(
+            dates=dates,
+            limit=limit,
+            session=session,
+        )
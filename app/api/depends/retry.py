@@ -0,0 +1,9 @@
+class RetryUnitOfWork:
+    """
+    Маркер маршрута, который можно повторить целиком после временной ошибки БД, подключается в dependencies.
+    Маршрут должен выполнять все изменения в одной транзакции сессии запроса (get_session) и не иметь
+    других побочных эффектов: без маркера изменяющие запросы не повторяются
+    """
+
+    async def __call__(self) -> None:
+        return None
@@ -1,9 +1,9 @@
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi import Depends, Request
 
-from app.core import db_connector
+from app.core import db_connector, login_limiter, rate_limit_settings
 from app.tools import HTTPErrors, UserRole
 from app.api.depends.user import UserAuth
 
@@ -12,9 +12,39 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/auth/login")
 
 async def admin_guard(
     token: Annotated[str,  Depends(oauth2_scheme)],
-    session: AsyncSession = Depends(db_connector.get_session),
+    session: AsyncSession = Depends(db_connector.get_admin_session, scope="function"),
 ):
     user = await UserAuth.get_current_user_by_access(token, session)
 
     if user.role != UserRole.admin:
         raise HTTPErrors.not_admin
+
+
+async def login_rate_limit(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+) -> None:
+    """
+    Ограничивает попытки входа с одного IP и для одного логина до обращения к БД и проверки пароля bcrypt.
+    Лимит по IP останавливает перебор логинов, лимит по логину - перебор паролей одного пользователя с разных IP
+    :param request: Запрос, из которого берется IP клиента
+    :param form_data: Форма входа, из которой берется логин
+    :raises HTTPException: 429 с заголовком Retry-After при превышении любого из лимитов
+    """
+    client_ip = request.client.host if request.client else "unknown"
+
+    retry_after = await login_limiter.acquire(
+        rule="ip",
+        key=client_ip,
+        limit=rate_limit_settings.login_per_ip,
+    )
+
+    if retry_after is None:
+        retry_after = await login_limiter.acquire(
+            rule="login",
+            key=form_data.username.strip().lower(),
+            limit=rate_limit_settings.login_per_login,
+        )
+
+    if retry_after is not None:
+        raise HTTPErrors.too_many_requests(retry_after)
@@ -1,14 +1,16 @@
+import asyncio
 from pydantic import EmailStr
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import jwt_settings
-from app.tools import HTTPErrors
+from app.core import db_connector, jwt_settings
+from app.tools import ConflictError, HTTPErrors
+from app.tools.types import DEFAULT_DEVICE_ID
 from app.service import UserService, TokenService
-from app.utils import JWTUtils, AuthUtils
+from app.utils import JWTUtils, AuthUtils, ResponseUtils
 from app.models import User as User_model, RefreshToken as Refresh_model
-from app.schemas import UserCreate, UserUpdate, TokenResponse, RefreshCreate
+from app.schemas import UserCreate, UserUpdate, UserResponse, UserMeResponse, TokenResponse, RefreshCreate
 
 
 class UserDepends:
@@ -75,6 +77,28 @@ class UserDepends:
 
         return user_model
 
+    @classmethod
+    async def get_me(
+        cls,
+        user_id: int,
+        session: AsyncSession,
+    ) -> UserMeResponse:
+        """
+        Обрабатывает запрос с frontend на получение пользователя вместе с профилем и итогами корзины
+        :param user_id: id пользователя
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Pydantic схема UserMeResponse
+        """
+        me = await UserService.get_me(
+            user_id=user_id,
+            session=session,
+        )
+
+        if not me:
+            raise HTTPErrors.not_found
+
+        return me
+
     @classmethod
     async def get_users_by_date(
         cls,
@@ -109,7 +133,8 @@ class UserDepends:
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
         :return: Добавленного в БД пользователя в виде Pydantic схемы
         """
-        user_scheme.password = AuthUtils.hash_password(user_scheme.password)
+        # bcrypt выполняется в потоке и не останавливает цикл событий на время хеширования
+        user_scheme.password = await asyncio.to_thread(AuthUtils.hash_password, user_scheme.password)
 
         user_model = await UserService.register_model(
             scheme_in=user_scheme,
@@ -122,43 +147,29 @@ class UserDepends:
         return user_model
 
     @classmethod
-    async def get_refresh(
+    async def rotate_refresh(
         cls,
         user_id: int,
+        device_id: str,
+        refresh: str,
         session: AsyncSession,
     ) -> Refresh_model:
         """
-        Обрабатывает запрос с fontend на добавление пользователя в БД
-        :param user_in: Pydantic Схема - объект, содержащий данные пользователя
+        Записывает хэш нового refresh токена устройства пользователя, заменяя предыдущий, одним запросом к БД
+        :param user_id: id пользователя
+        :param device_id: id устройства
+        :param refresh: Новый refresh токен
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
-        :return: Добавленного в БД пользователя в виде Pydantic схемы
+        :return: Модель refresh токена, записанную в БД
         """
-
-        refresh_model = await TokenService.get_model(
+        refresh_schema = RefreshCreate(
             user_id=user_id,
-            session=session,
+            device_id=device_id,
+            token_hash=AuthUtils.hash_token(refresh),
         )
 
-        return refresh_model
-
-    @classmethod
-    async def create_refresh(
-        cls,
-        user_id: int,
-        refresh: str,
-        session: AsyncSession,
-    ) -> Refresh_model:
-        """
-        Обрабатывает запрос с fontend на добавление пользователя в БД
-        :param user_in: Pydantic Схема - объект, содержащий данные пользователя
-        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
-        :return: Добавленного в БД пользователя в виде Pydantic схемы
-        """
-        refresh_schema = RefreshCreate(token=refresh)
-
-        refresh_model = await TokenService.register_model(
-            scheme_in=refresh_schema,
-            user_id=user_id,
+        refresh_model = await TokenService.rotate_refresh(
+            refresh_scheme=refresh_schema,
             session=session,
         )
 
@@ -168,26 +179,32 @@ class UserDepends:
         return refresh_model
 
     @classmethod
-    async def delete_refresh(
+    async def get_user_by_refresh(
         cls,
         user_id: int,
+        device_id: str,
+        refresh: str,
         session: AsyncSession,
-    ) -> Refresh_model:
+    ) -> User_model:
         """
-        Обрабатывает запрос с fontend на добавление пользователя в БД
-        :param user_in: Pydantic Схема - объект, содержащий данные пользователя
+        Возвращает пользователя, которому принадлежит refresh токен устройства
+        :param user_id: id пользователя из payload токена
+        :param device_id: id устройства из payload токена
+        :param refresh: Полученный refresh токен
         :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
-        :return: Добавленного в БД пользователя в виде Pydantic схемы
+        :return: Модель пользователя
         """
-        refresh_model = await TokenService.delete_model(
-            session=session,
+        user_model = await UserService.get_user_by_refresh(
             user_id=user_id,
+            device_id=device_id,
+            token_hash=AuthUtils.hash_token(refresh),
+            session=session,
         )
 
-        if not refresh_model:
-            raise HTTPErrors.err_delete_model
+        if not user_model:
+            raise HTTPErrors.token_invalid
 
-        return refresh_model
+        return user_model
 
     @classmethod
     async def update_user(
@@ -204,14 +221,19 @@ class UserDepends:
         :return: Добавленного в БД пользователя в виде Pydantic схемы
         """
         if user_scheme.password is not None:
-            user_scheme.password = AuthUtils.hash_password(user_scheme.password)
-
-        user_model = await UserService.update_model(
-            model_id=user_id,
-            scheme_in=user_scheme,
-            session=session,
-            partial=partial,
-        )
+            # Пользователь уже прочитан при проверке токена, на время хеширования соединение возвращается в пул
+            await db_connector.release_connection(session)
+            user_scheme.password = await asyncio.to_thread(AuthUtils.hash_password, user_scheme.password)
+
+        try:
+            user_model = await UserService.update_model(
+                model_id=user_id,
+                scheme_in=user_scheme,
+                session=session,
+                partial=partial,
+            )
+        except ConflictError as e:
+            raise HTTPErrors.conflict(ResponseUtils.dump_python(Optional[UserResponse], e.current))
 
         if not user_model:
             raise HTTPErrors.err_update_model
@@ -278,7 +300,12 @@ class UserAuth:
             session=session,
         )
 
-        if not AuthUtils.check_password(
+        # Проверка пароля bcrypt занимает десятки миллисекунд процессора: соединение на это время возвращается в пул,
+        # а сама проверка выполняется в потоке и не останавливает цикл событий
+        await db_connector.release_connection(session)
+
+        if not await asyncio.to_thread(
+            AuthUtils.check_password,
             password=password,
             hashed_password=user_model.password,
         ):
@@ -306,26 +333,22 @@ class UserAuth:
         cls,
         user_model: User_model,
         session: AsyncSession,
+        device_id: str = DEFAULT_DEVICE_ID,
     ) -> str:
         """
-        Создает конкретно refresh_token
+        Создает конкретно refresh_token и заменяет им предыдущий токен устройства (один запрос к БД)
         :param user: схема пользователя с данными изи БД
+        :param device_id: id устройства, для которого выдается токен
         :return: refresh_token
         """
-        refresh = JWTUtils.create_refresh_token(user_model=user_model)
-
-        if await UserDepends.get_refresh(
-            user_id=user_model.id,
-            session=session,
-        ):
-
-            await UserDepends.delete_refresh(
-                user_id=user_model.id,
-                session=session,
-            )
+        refresh = JWTUtils.create_refresh_token(
+            user_model=user_model,
+            device_id=device_id,
+        )
 
-        await UserDepends.create_refresh(
+        await UserDepends.rotate_refresh(
             user_id=user_model.id,
+            device_id=device_id,
             refresh=refresh,
             session=session,
         )
@@ -338,6 +361,7 @@ class UserAuth:
         user_model: User_model,
         session: AsyncSession,
         refresh_status: bool = False,
+        device_id: str = DEFAULT_DEVICE_ID,
     ) -> TokenResponse:
         """
 
@@ -353,6 +377,7 @@ class UserAuth:
             refresh = await cls.update_refresh(
                 user_model=user_model,
                 session=session,
+                device_id=device_id,
             )
 
         return TokenResponse(
@@ -371,6 +396,28 @@ class UserAuth:
         :param token: Токен, полученный через зависимость из заголовка запроса
         :return: Возвращает пользователя, если такой существует в БД
         """
+        user_id = cls.get_user_id_by_access(token=token)
+
+        user_model = await UserDepends.get_user(
+            user_id=user_id,
+            session=session,
+        )
+
+        if not AuthUtils.check_user_status(user_model=user_model):
+            raise HTTPErrors.user_inactive
+
+        return user_model
+
+    @classmethod
+    def get_user_id_by_access(
+        cls,
+        token: str,
+    ) -> int:
+        """
+        Парсит access токен и проверяет его тип, не обращаясь к БД
+        :param token: Токен, полученный через зависимость из заголовка запроса
+        :return: id пользователя из payload токена
+        """
         payload = JWTUtils.decode_jwt(token)
 
         if not AuthUtils.check_token_type(
@@ -378,18 +425,31 @@ class UserAuth:
             token_type=jwt_settings.access_name,
         ):
             raise HTTPErrors.token_invalid
-    
-        user_id = int(payload.get("sub"))
 
-        user_model = await UserDepends.get_user(
-            user_id=user_id,
+        return int(payload.get("sub"))
+
+    @classmethod
+    async def get_me_by_access(
+        cls,
+        token: str,
+        session: AsyncSession,
+    ) -> UserMeResponse:
+        """
+        Возвращает текущего пользователя вместе с профилем и итогами корзины,
+        проверка пользователя и загрузка данных выполняются одним запросом к БД
+        :param token: Токен, полученный через зависимость из заголовка запроса
+        :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+        :return: Pydantic схема UserMeResponse
+        """
+        me = await UserDepends.get_me(
+            user_id=cls.get_user_id_by_access(token=token),
             session=session,
         )
 
-        if not AuthUtils.check_user_status(user_model=user_model):
+        if not me.user.is_active:
             raise HTTPErrors.user_inactive
 
-        return user_model
+        return me
 
     @classmethod
     async def get_current_user_by_refresh(
@@ -409,18 +469,10 @@ class UserAuth:
         ):
             raise HTTPErrors.token_invalid
         
-        user_id = int(payload.get("sub"))
-
-        refresh_model = await UserDepends.get_refresh(
-            user_id=user_id,
-            session=session,
-        )
-
-        if not refresh_model or refresh_model.token != token:
-            raise HTTPErrors.token_invalid
-
-        user_model = await UserDepends.get_user(
-            user_id=user_id,
+        user_model = await UserDepends.get_user_by_refresh(
+            user_id=int(payload.get("sub")),
+            device_id=payload.get("device", DEFAULT_DEVICE_ID),
+            refresh=token,
             session=session,
         )
 
@@ -0,0 +1,46 @@
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core import db_connector, db_settings
+from app.repositories import ProductRepo, UserRepo
+from app.repositories.cart import CartRepo
+from app.tools import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+# Запросы, с которых начинается большинство запросов к API: пользователь из access токена, корзина, продукт.
+# Несуществующий id дает тот же SQL, что и настоящий, строки при прогреве не нужны
+HOT_STATEMENTS = (
+    partial(UserRepo.get_by_id, model_id=0),
+    partial(CartRepo.get_by_user_id, user_id=0),
+    partial(ProductRepo.get_by_id, model_id=0),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Жизненный цикл процесса приложения: до приема запросов прогревает пул соединений и подготавливает
+    частые запросы, чтобы их цену не платили первые запросы после запуска процесса. После остановки закрывает пулы.
+    Недоступная при запуске БД не мешает процессу стартовать, соединения тогда открываются первыми запросами
+    :param app: Приложение FastAPI
+    """
+    try:
+        await db_connector.warm_up(
+            connections=db_settings.warm_connections,
+            statements=HOT_STATEMENTS,
+        )
+
+    except (DatabaseError, SQLAlchemyError, OSError):
+        logger.warning("Connection pool warm-up failed, connections will be opened by requests", exc_info=True)
+
+    yield
+
+    await db_connector.dispose()
@@ -0,0 +1,394 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.connector import track_checkout_wait
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_REJECTED
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен, ответы сжимаются только gzip
+    brotli = None
+
+
+# Уже сжатые и потоковые без конца форматы не сжимаются
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Выбирает кодирование ответа по заголовку Accept-Encoding с учетом q-весов.
+    При равных весах br предпочтительнее gzip, br выбирается только если установлен пакет brotli
+    :param accept_encoding: Значение заголовка Accept-Encoding
+    :return: "br" | "gzip" | None, если клиент не принимает сжатые ответы
+    """
+    weights: dict[str, float] = {}
+
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+
+        if coding:
+            weights[coding] = q
+
+    wildcard = weights.get("*", 0.0)
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_q = None, 0.0
+
+    for coding in supported:
+        q = weights.get(coding, wildcard)
+
+        if q > best_q:
+            best, best_q = coding, q
+
+    return best
+
+
+class StreamCompressor:
+    """Сжимает тело ответа частями, каждая часть отдается клиенту сразу, не дожидаясь конца ответа"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressedCache:
+    """
+    LRU кеш сжатых тел ответов с ограничением по суммарному размеру.
+    Ключ - кодирование и хеш несжатого тела, повторный одинаковый ответ каталога не сжимается заново:
+    хеширование тела на порядок дешевле сжатия
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> Optional[bytes]:
+        compressed = self._items.get(key)
+
+        if compressed is not None:
+            self._items.move_to_end(key)
+
+        return compressed
+
+    def put(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes or key in self._items:
+            return
+
+        self._items[key] = compressed
+        self.size += len(compressed)
+
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware сжатия ответов gzip и brotli (если установлен пакет brotli).
+    Ответы меньше minimum_size отдаются как есть. Потоковые ответы (StreamingResponse и другие ответы,
+    отдающие тело несколькими сообщениями) сжимаются по частям без буферизации всего тела.
+    Сжатые тела GET ответов с путями из cache_paths кешируются в памяти
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_paths: tuple[str, ...] = (),
+        cache_size: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_paths = tuple(cache_paths)
+        self.cache = CompressedCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope["method"] == "GET" and scope["path"].startswith(self.cache_paths)
+        responder = CompressionResponder(self, encoding, cacheable, send)
+
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        """
+        Сжимает тело ответа целиком, для cacheable ответов сначала ищет сжатое тело в кеше
+        :param encoding: Кодирование
+        :param body: Тело ответа
+        :param cacheable: Можно ли брать тело из кеша и класть в кеш
+        :return: Сжатое тело
+        """
+        if not cacheable:
+            return self._compress(encoding, body)
+
+        key = self.cache.key(encoding, body)
+        compressed = self.cache.get(key)
+
+        if compressed is None:
+            compressed = self._compress(encoding, body)
+            self.cache.put(key, compressed)
+
+        return compressed
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+        return compressor.compress(body) + compressor.flush()
+
+
+class CompressionResponder:
+    """Состояние сжатия одного ответа: заголовки придерживаются до первого сообщения тела"""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        encoding: str,
+        cacheable: bool,
+        send: Send,
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+            )
+
+            if self.passthrough:
+                await self._send(message)
+            else:
+                self.start_message = message
+
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            if more_body:
+                chunk = self.compressor.compress(body)
+            else:
+                chunk = self.compressor.finish(body)
+
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        start_message, self.start_message = self.start_message, None
+        headers = MutableHeaders(raw=start_message["headers"])
+
+        if not more_body and len(body) < self.middleware.minimum_size:
+            await self._send(start_message)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+
+        if more_body:
+            # Размер сжатого потока заранее неизвестен, ответ уходит с Transfer-Encoding: chunked
+            del headers["Content-Length"]
+            self.compressor = StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            body = self.compressor.compress(body)
+        else:
+            body = self.middleware.compress(
+                self.encoding, body, self.cacheable and start_message["status"] == 200
+            )
+            headers["Content-Length"] = str(len(body))
+
+        await self._send(start_message)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+def route_group(path: str) -> str:
+    """Группа маршрутов, у каждой свой лимит: запросы админки не вытесняют запросы пользователей и наоборот"""
+    return "admin" if path.startswith("/admin") else "user"
+
+
+class AIMDLimit:
+    """
+    Адаптивный лимит одновременных запросов (AIMD, как окно перегрузки TCP): каждый запрос без признаков
+    перегрузки увеличивает лимит на 1 / limit, то есть примерно на 1 за каждые limit запросов,
+    перегрузка уменьшает его в backoff раз. Запросы, начатые до последнего уменьшения, видели старый лимит,
+    поэтому их перегрузка не уменьшает лимит повторно: одна волна медленных ответов дает одно уменьшение
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, backoff: float) -> None:
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.in_flight = 0
+        self.epoch = 0
+
+    def try_acquire(self) -> Optional[int]:
+        """
+        :return: Эпоха лимита, с которой начат запрос, None если лимит исчерпан
+        """
+        if self.in_flight >= int(self.limit):
+            return None
+
+        self.in_flight += 1
+
+        return self.epoch
+
+    def release(self, epoch: int, overloaded: bool) -> None:
+        """
+        :param epoch: Эпоха из try_acquire
+        :param overloaded: Запрос видел перегрузку
+        """
+        self.in_flight -= 1
+
+        if overloaded:
+            if epoch == self.epoch:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.epoch += 1
+
+        # Лимит растет, только если он действительно используется, иначе после простоя он был бы любым
+        elif self.in_flight + 1 >= self.limit / 2:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware адаптивного ограничения нагрузки. Когда БД замедляется, запросы ждут соединения в очереди пула
+    и все вместе не успевают к сроку. Вместо этого число одновременных запросов группы маршрутов ограничивается
+    AIMDLimit, а лишние запросы сразу получают 503 с Retry-After, не занимая очередь пула.
+    Перегрузка - запрос ждал соединения из пула дольше wait_target или завершился по сроку (504).
+    Лимит свой в каждом процессе, пути из exempt_paths не ограничиваются
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        backoff: float = 0.9,
+        wait_target: float = 0.05,
+        retry_after: int = 1,
+        exempt_paths: tuple[str, ...] = (),
+        group: Callable[[str], str] = route_group,
+    ) -> None:
+        self.app = app
+        self.wait_target = wait_target
+        self.retry_after = retry_after
+        self.exempt_paths = tuple(exempt_paths)
+        self.group = group
+        self.limits: dict[str, AIMDLimit] = {}
+        self._limit_options = {
+            "initial": initial_limit,
+            "min_limit": min_limit,
+            "max_limit": max_limit,
+            "backoff": backoff,
+        }
+
+    def limit(self, group: str) -> AIMDLimit:
+        limit = self.limits.get(group)
+
+        if limit is None:
+            limit = self.limits[group] = AIMDLimit(**self._limit_options)
+
+        return limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        group = self.group(scope["path"])
+        limit = self.limit(group)
+        epoch = limit.try_acquire()
+
+        if epoch is None:
+            ADMISSION_REJECTED.labels(group=group).inc()
+            response = JSONResponse(
+                {"detail": "Service overloaded"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        ADMISSION_IN_FLIGHT.labels(group=group).inc()
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+            await send(message)
+
+        with track_checkout_wait() as waits:
+            try:
+                await self.app(scope, receive, send_status)
+
+            finally:
+                limit.release(epoch, overloaded=status == 504 or sum(waits) > self.wait_target)
+                ADMISSION_IN_FLIGHT.labels(group=group).dec()
+                ADMISSION_LIMIT.labels(group=group).set(limit.limit)
@@ -0,0 +1,124 @@
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.dependencies.models import Dependant
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, request_response
+from pydantic import ValidationError
+from pydantic_core import to_json
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.deadline import handle_with_deadline
+from app.api.depends.deadline import route_timeout
+from app.api.depends.retry import RetryUnitOfWork
+from app.api.retry import handle_with_retry
+from app.core.deadline import expired
+from app.utils import ResponseUtils
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON ответ, сериализуемый pydantic-core вместо json.dumps.
+    Готовые байты (результат TypeAdapter.dump_json) отдаются без повторной сериализации
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+
+        return to_json(content)
+
+
+class PydanticRoute(APIRoute):
+    """
+    Маршрут, который валидирует результат endpoint закешированным TypeAdapter response_model
+    и сериализует его сразу в байты. Стандартный путь FastAPI валидирует ответ, переводит его в dict
+    и кодирует json.dumps, на списках из тысяч заказов и корзин это основная доля CPU запроса.
+    Маршруты, которым нужен стандартный путь (include/exclude у response_model, параметр Response,
+    синхронный endpoint, ответ без тела), обрабатываются FastAPI как обычно
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+
+        if self._can_dump_json():
+            self.dependant.call = self._dump_json_endpoint(self.dependant.call)
+            self.app = request_response(self.get_route_handler())
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+        route = f"{'|'.join(sorted(self.methods))} {self.path}"
+        timeout = route_timeout(self.dependant)
+        unit_of_work = any(isinstance(depends.dependency, RetryUnitOfWork) for depends in self.dependencies)
+
+        async def retrying(request: Request) -> Response:
+            return await handle_with_retry(handler, request, route, unit_of_work)
+
+        # Повторы укладываются в срок запроса
+        async def app(request: Request) -> Response:
+            return await handle_with_deadline(retrying, request, route, timeout)
+
+        return app
+
+    def _can_dump_json(self) -> bool:
+        response_class = self.response_class
+
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        return (
+            self.response_field is not None
+            and self.dependant.is_coroutine_callable
+            and issubclass(response_class, JSONResponse)
+            and self.response_model_include is None
+            and self.response_model_exclude is None
+            and self.response_model_by_alias
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+            and self.status_code not in (204, 304)
+            and not self._uses_response_param(self.dependant)
+        )
+
+    @classmethod
+    def _uses_response_param(cls, dependant: Dependant) -> bool:
+        """Параметр Response меняет заголовки и код ответа, их переносит только стандартный путь FastAPI"""
+        return dependant.response_param_name is not None or any(
+            cls._uses_response_param(sub) for sub in dependant.dependencies
+        )
+
+    def _dump_json_endpoint(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        response_model = self.response_model
+        status_code: Optional[int] = self.status_code
+
+        @wraps(call)
+        async def endpoint(**values: Any) -> Any:
+            content = await call(**values)
+
+            if isinstance(content, Response):
+                return content
+
+            # Сериализация не прерывается таймером, результат, который клиент уже не ждет, не сериализуется
+            if expired():
+                raise TimeoutError
+
+            try:
+                body = ResponseUtils.dump_json(response_model, content)
+            except ValidationError as e:
+                raise ResponseValidationError(
+                    errors=[
+                        {**error, "loc": ("response", *error["loc"])}
+                        for error in e.errors(include_url=False)
+                    ],
+                    body=content,
+                ) from e
+
+            if status_code is None:
+                return PydanticJSONResponse(body)
+
+            return PydanticJSONResponse(body, status_code=status_code)
+
+        return endpoint
@@ -0,0 +1,44 @@
+from typing import Awaitable, Callable
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.retry import Attempt, attempt_scope, retry_policy
+
+
+# Методы, повтор которых по HTTP безопасен: они только читают
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+async def handle_with_retry(
+    handler: Callable[[Request], Awaitable[Response]],
+    request: Request,
+    route: str,
+    unit_of_work: bool,
+) -> Response:
+    """
+    Повторяет обработку запроса целиком после временной ошибки БД (взаимоблокировка, ошибка сериализации,
+    потерянное соединение). Повторяются только запросы на чтение и маршруты с RetryUnitOfWork, все изменения
+    которых выполняются в одной транзакции сессии запроса: неудачная попытка откатывается целиком,
+    поэтому следующая не повторяет ее изменений
+    :param handler: Обработчик маршрута FastAPI
+    :param request: Запрос
+    :param route: Метод и шаблон пути маршрута для метрики
+    :param unit_of_work: Маршрут объявил RetryUnitOfWork
+    """
+    idempotent = request.method in SAFE_METHODS
+
+    if not (idempotent or unit_of_work):
+        return await handler(request)
+
+    async def attempt(state: Attempt) -> Response:
+        # Зависимости FastAPI scope="function" закрываются только после последней попытки, поэтому сессия
+        # входит в единицу работы через attempt_scoped: каждая попытка сама фиксирует или откатывает свою
+        # транзакцию до следующей, а ошибка commit тоже повторяется
+        async with attempt_scope(request):
+            response = await handler(request)
+            state.committing = True
+
+        return response
+
+    return await retry_policy().run(attempt, operation=route, idempotent=idempotent)
@@ -1,15 +1,17 @@
-from app.api.view.admin.post import router as post_router
-from app.api.view.admin.user import router as user_router
-from app.api.view.admin.cart import router as cart_router
-from app.api.view.admin.order import router as order_router
-from app.api.view.admin.product import router as product_router
-from app.api.view.admin.profile import router as profile_router
-
-
 def include_admin_routers(app):
+    # Модули маршрутов импортируются при сборке приложения, а не при импорте пакета
+    from app.api.view.admin.post import router as post_router
+    from app.api.view.admin.user import router as user_router
+    from app.api.view.admin.cart import router as cart_router
+    from app.api.view.admin.order import router as order_router
+    from app.api.view.admin.product import router as product_router
+    from app.api.view.admin.profile import router as profile_router
+    from app.api.view.admin.report import router as report_router
+
     app.include_router(post_router)
     app.include_router(user_router)
     app.include_router(cart_router)
     app.include_router(order_router)
     app.include_router(product_router)
-    app.include_router(profile_router)
\ No newline at end of file
+    app.include_router(profile_router)
+    app.include_router(report_router)
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.security import admin_guard
 from app.api.depends.cart import CartDepends
 from app.api.depends.inspect import Inspector
@@ -17,6 +18,7 @@ router = APIRouter(
     prefix="/admin/carts",
     tags=["Admin Cart"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -26,7 +28,7 @@ router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_carts(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[CartResponse]:
     """
 
@@ -43,7 +45,7 @@ async def get_all_carts(
 )
 async def get_carts_by_date(
     dates: datetime = Depends(Inspector.date_checker),
-    session: AsyncSession = Depends(db_connector.get_session),
+    session: AsyncSession = Depends(db_connector.get_admin_session, scope="function"),
 ) -> list[CartResponse]:
     """
 
@@ -64,7 +66,7 @@ async def get_carts_by_date(
 )
 async def get_cart_by_user_id(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -86,7 +88,7 @@ async def get_cart_by_user_id(
 async def add_product(
     product_add: ProductAddOrUpdate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -110,7 +112,7 @@ async def add_product(
 async def update_count_product(
     product_upd: ProductAddOrUpdate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -134,7 +136,7 @@ async def update_count_product(
 async def delete_product(
     user_id: Annotated[int, Path(..., description="User ID")],
     product_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -157,7 +159,7 @@ async def delete_product(
 )
 async def clear_user_cart(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
 
@@ -6,7 +6,9 @@ from typing import Annotated
 
 from app.api.depends.order import OrderDepends
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.security import admin_guard
+from app.api.depends.deadline import RouteTimeout
 from app.api.depends.inspect import Inspector
 from app.schemas import OrderResponse, OrderCreate, OrderUpdate
 
@@ -14,6 +16,7 @@ router = APIRouter(
     prefix="/admin/orders",
     tags=["Admin Orders"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -21,9 +24,10 @@ router = APIRouter(
     "/all",
     response_model=list[OrderResponse],
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RouteTimeout(30))],
 )
 async def get_all_orders(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[OrderResponse]:
     """
 
@@ -40,7 +44,7 @@ async def get_all_orders(
 )
 async def get_orders_by_date(
     dates: Annotated[tuple[datetime, datetime], Depends(Inspector.date_checker)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[OrderResponse]:
     """
 
@@ -61,7 +65,7 @@ async def get_orders_by_date(
 )
 async def get_all_user_orders(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[OrderResponse]:
     """
 
@@ -81,7 +85,7 @@ async def get_all_user_orders(
 )
 async def get_order_by_id(
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -103,7 +107,7 @@ async def get_order_by_id(
 async def create_order(
     order_scheme: OrderCreate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -126,7 +130,7 @@ async def create_order(
 async def update_order_partial(
     order_scheme: OrderUpdate,
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -147,7 +151,7 @@ async def update_order_partial(
     status_code=status.HTTP_200_OK,
 )
 async def clear_orders(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
 
@@ -165,7 +169,7 @@ async def clear_orders(
 )
 async def delete_order(
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -186,7 +190,7 @@ async def delete_order(
 )
 async def delete_user_orders(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -1,19 +1,21 @@
 from datetime import datetime
-from typing import Annotated
-from fastapi import APIRouter, status, Depends, Path
+from typing import Annotated, Optional
+from fastapi import APIRouter, status, Depends, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.post import PostDepends
 from app.api.depends.security import admin_guard
 from app.api.depends.inspect import Inspector 
-from app.schemas import PostCreate, PostUpdate, PostResponse
+from app.schemas import PostCreate, PostUpdate, PostResponse, PostSearchPageResponse
 
 
 router = APIRouter(
     prefix="/admin/posts",
     tags=["Admin Posts"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -23,7 +25,7 @@ router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_posts(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[PostResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех постов пользователей
@@ -40,7 +42,7 @@ async def get_all_posts(
 )
 async def get_posts_by_date(
     dates: Annotated[tuple[datetime, datetime], Depends(Inspector.date_checker)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[PostResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех постов пользователей, добавленных за указанный интервал времени
@@ -54,6 +56,40 @@ async def get_posts_by_date(
     )
 
 
+@router.get(
+    "/search",
+    response_model=PostSearchPageResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def search_posts(
+    q: Annotated[
+        str,
+        Query(min_length=1, max_length=200, description='Search query: words, "phrase", or, -word'),
+    ],
+    page: Annotated[tuple, Depends(Inspector.search_page_checker)],
+    dates: Annotated[tuple, Depends(Inspector.optional_date_checker)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
+    user_id: Annotated[Optional[int], Query(ge=1, description="Author ID")] = None,
+) -> PostSearchPageResponse:
+    """
+    Обрабатывает запрос с фронт энда на полнотекстовый поиск постов по заголовку и тексту,
+    результаты упорядочены по релевантности и содержат фрагменты текста с подсвеченными совпадениями
+    :param q: Строка поиска
+    :param page: Размер страницы и курсор
+    :param dates: Интервал даты создания поста, любая граница необязательна
+    :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+    :param user_id: id автора постов
+    :return: Страница результатов поиска
+    """
+    return await PostDepends.search_posts(
+        query=q,
+        page=page,
+        dates=dates,
+        user_id=user_id,
+        session=session,
+    )
+
+
 @router.get(
     "/{post_id}",
     response_model=PostResponse,
@@ -61,7 +97,7 @@ async def get_posts_by_date(
 )
 async def get_post_by_id(
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> PostResponse:
     """
      Обрабатывает запрос с фронт энда на получение конкретного поста по его id
@@ -82,7 +118,7 @@ async def get_post_by_id(
 )
 async def get_posts_by_user_id(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[PostResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех постов конкретного пользователя
@@ -104,7 +140,7 @@ async def get_posts_by_user_id(
 async def register_post(
     post_scheme: PostCreate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на добавление нового поста пользователя в БД
@@ -128,7 +164,7 @@ async def register_post(
 async def full_update_post(
     post_scheme: PostUpdate,
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на полное обновление конкретного поста пользователя в БД
@@ -152,7 +188,7 @@ async def full_update_post(
 async def update_post_partial(
     post_scheme: PostUpdate,
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на частичное обновление конкретного поста пользователя в БД
@@ -175,7 +211,7 @@ async def update_post_partial(
     status_code=status.HTTP_200_OK,
 )
 async def clear_all_posts(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с фронт энда на удаление всех постов пользователей из БД
@@ -193,7 +229,7 @@ async def clear_all_posts(
 )
 async def delete_post(
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного поста пользователя из БД
@@ -214,7 +250,7 @@ async def delete_post(
 )
 async def delete_all_user_posts(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного поста пользователя из БД
@@ -5,6 +5,7 @@ from fastapi import APIRouter, status, Depends, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.security import admin_guard
 from app.api.depends.product import ProductDepends
 from app.api.depends.inspect import Inspector
@@ -15,6 +16,7 @@ router = APIRouter(
     prefix="/admin/products",
     tags=["Admin Products"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -24,7 +26,7 @@ router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_products(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[ProductResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех продуктов
@@ -41,7 +43,7 @@ async def get_all_products(
 )
 async def get_products_by_date(
     dates: Annotated[tuple[datetime, datetime], Depends(Inspector.date_checker)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[ProductResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех продуктов, добавленных за указанный интервал времени
@@ -62,7 +64,7 @@ async def get_products_by_date(
 )
 async def get_product_by_id(
     product_id: Annotated[int, Path(..., description="Product ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProductResponse:
     """
     Обрабатывает запрос с фронт энда на получение продукта по его id
@@ -83,7 +85,7 @@ async def get_product_by_id(
 )
 async def register_product(
     product_scheme: ProductCreate,
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProductResponse:
     """
     Обрабатывает запрос с фронт энда на добавление продукта в БД
@@ -105,7 +107,7 @@ async def register_product(
 async def update_product(
     product_scheme: ProductUpdate,
     product_id: Annotated[int, Path(..., description="Product ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProductResponse:
     """
     Обрабатывает запрос с фронт энда на полную замену данных продукта по его id
@@ -129,7 +131,7 @@ async def update_product(
 async def update_product_partial(
     product_scheme: ProductUpdate,
     product_id: Annotated[int, Path(..., description="Product ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProductResponse:
     """
     Обрабатывает запрос с фронт энда на частичную замену данных продукта по его id
@@ -152,7 +154,7 @@ async def update_product_partial(
     status_code=status.HTTP_200_OK,
 )
 async def clear_products(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с фронт энда на удаление всех пользователей
@@ -169,7 +171,7 @@ async def clear_products(
 )
 async def delete_product(
     product_id: Annotated[int, Path(..., description="Product ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProductResponse:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного продукта
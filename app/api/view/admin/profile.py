@@ -4,6 +4,7 @@ from fastapi import APIRouter, status, Depends, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.security import admin_guard
 from app.api.depends.profile import ProfileDepends
 from app.api.depends.inspect import Inspector
@@ -16,6 +17,7 @@ router = APIRouter(
     prefix="/admin/profiles",
     tags=["Admin Profiles"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -25,7 +27,7 @@ router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_profiles(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[ProfileResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех профилей пользователей
@@ -42,7 +44,7 @@ async def get_all_profiles(
 )
 async def get_profiles_by_date(
     dates: Annotated[tuple[datetime, datetime], Depends(Inspector.date_checker)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[ProfileResponse]:
     """
     Возвращает всех добавленных в БД пользователей за указанный интервал времени
@@ -65,7 +67,7 @@ async def get_profiles_by_date(
 )
 async def get_profile_by_user_id(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на получение профиля пользователя по id пользователя
@@ -86,7 +88,7 @@ async def get_profile_by_user_id(
 )
 async def get_profile_by_id(
     profile_id: Annotated[int, Path(..., description="Profile ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на получение профиля пользователя по его id
@@ -108,7 +110,7 @@ async def get_profile_by_id(
 async def register_profile(
     profile_scheme: ProfileCreate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на создание профиля пользователя в БД
@@ -132,7 +134,7 @@ async def register_profile(
 async def full_update_profile(
     profile_scheme: ProfileUpdate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на полную замену данных профиля конкретного пользователя
@@ -156,7 +158,7 @@ async def full_update_profile(
 async def partial_update_profile(
     profile_scheme: ProfileUpdate,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на частичную замену данных профиля конкретного пользователя
@@ -179,7 +181,7 @@ async def partial_update_profile(
     status_code=status.HTTP_200_OK,
 )
 async def clear_profiles(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с фронт энда на удаление всех пользователей
@@ -198,7 +200,7 @@ async def clear_profiles(
 )
 async def delete_profile(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного пользователя
@@ -0,0 +1,75 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import db_connector
+from app.api.response import PydanticRoute
+from app.api.depends.security import admin_guard
+from app.api.depends.deadline import RouteTimeout
+from app.api.depends.report import ReportDepends
+from app.api.depends.inspect import Inspector
+from app.schemas import ProductSalesResponse, SalesReportResponse
+from app.tools import SalesPeriod
+
+
+router = APIRouter(
+    prefix="/admin/reports",
+    tags=["Admin Reports"],
+    dependencies=[Depends(RouteTimeout(60)), Depends(admin_guard)],
+    route_class=PydanticRoute,
+)
+
+
+@router.get(
+    "/sales",
+    response_model=list[SalesReportResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_sales_report(
+    dates: Annotated[tuple[date, date], Depends(Inspector.day_checker)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
+    period: Annotated[
+        SalesPeriod, Query(description="Grouping period of the report")
+    ] = SalesPeriod.month,
+) -> list[SalesReportResponse]:
+    """
+    Обрабатывает запрос с фронт энда на получение итогов продаж (заказы, выручка, единицы товара)
+    за интервал дней, сгруппированных по дням, месяцам или годам. Отчет строится по дневным итогам sales_daily
+    :param dates: Первый и последний день интервала
+    :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+    :param period: Период группировки
+    :return: list[SalesReportResponse]
+    """
+    return await ReportDepends.get_sales_report(
+        dates=dates,
+        period=period,
+        session=session,
+    )
+
+
+@router.get(
+    "/sales/products",
+    response_model=list[ProductSalesResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_product_sales(
+    dates: Annotated[tuple[date, date], Depends(Inspector.day_checker)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
+    limit: Annotated[
+        int, Query(ge=1, le=100, description="Number of products")
+    ] = 20,
+) -> list[ProductSalesResponse]:
+    """
+    Обрабатывает запрос с фронт энда на получение продуктов с наибольшей выручкой за интервал дней
+    :param dates: Первый и последний день интервала
+    :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+    :param limit: Количество продуктов
+    :return: list[ProductSalesResponse]
+    """
+    return await ReportDepends.get_product_sales(
+        dates=dates,
+        limit=limit,
+        session=session,
+    )
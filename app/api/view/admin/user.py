@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, status, Depends, Query, Path
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.user import UserDepends
 from app.api.depends.inspect import Inspector
 from app.api.depends.security import admin_guard
@@ -15,6 +16,7 @@ router = APIRouter(
     prefix="/admin/users",
     tags=["Admin Users"],
     dependencies=[Depends(admin_guard)],
+    route_class=PydanticRoute,
 )
 
 
@@ -24,7 +26,7 @@ router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_users(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list[UserResponse]:
     """
     Обрабатывает запрос с fontend на получение списка всех пользователей
@@ -40,7 +42,7 @@ async def get_all_users(
     status_code=status.HTTP_200_OK,
 )
 async def get_users_by_date(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
     dates: Annotated[tuple[datetime, datetime], Depends(Inspector.date_checker)],
 ) -> list[UserResponse]:
     """
@@ -62,7 +64,7 @@ async def get_users_by_date(
 )
 async def get_user_by_login(
     login: Annotated[EmailStr, Query(..., description="User login")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на получение пользователя по его имени
@@ -83,7 +85,7 @@ async def get_user_by_login(
 )
 async def get_user_by_id(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на получение пользователя по его id
@@ -104,7 +106,7 @@ async def get_user_by_id(
 )
 async def register_user(
     user_scheme: UserCreate,
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на добавление пользователя в БД
@@ -127,7 +129,7 @@ async def register_user(
 async def full_update_user(
     user_scheme: UserUpdateForAdmin,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на полную замену данных пользователя по его id
@@ -151,7 +153,7 @@ async def full_update_user(
 async def partial_update_user(
     user_scheme: UserUpdateForAdmin,
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на полную замену данных пользователя по его id
@@ -174,7 +176,7 @@ async def partial_update_user(
     status_code=status.HTTP_200_OK,
 )
 async def clear_users(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с fontend на полную очистку таблицы пользователей
@@ -191,7 +193,7 @@ async def clear_users(
 )
 async def delete_user(
     user_id: Annotated[int, Path(..., description="User ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_admin_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на удаление пользователя из БД
@@ -5,9 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.user import UserAuth
 from app.api.depends.cart import CartDepends
 from app.api.depends.security import oauth2_scheme
+from app.api.depends.retry import RetryUnitOfWork
 from app.schemas import CartResponse
 from app.schemas import ProductAddOrUpdate
 
@@ -15,6 +17,7 @@ from app.schemas import ProductAddOrUpdate
 router = APIRouter(
     prefix="/user/cart",
     tags=["My Cart"],
+    route_class=PydanticRoute,
 )
 
 
@@ -25,7 +28,7 @@ router = APIRouter(
 )
 async def get_my_cart(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -48,11 +51,12 @@ async def get_my_cart(
     "/",
     response_model=CartResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RetryUnitOfWork())],
 )
 async def add_product(
     product_add_schema: ProductAddOrUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -81,7 +85,7 @@ async def add_product(
 async def update_count_product(
     product_upd_schema: ProductAddOrUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -110,7 +114,7 @@ async def update_count_product(
 async def delete_product(
     token: Annotated[str, Depends(oauth2_scheme)],
     product_id: Annotated[int, Path(..., description="Product ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> CartResponse:
     """
 
@@ -138,7 +142,7 @@ async def delete_product(
 )
 async def clear_my_cart(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> list:
     """
 
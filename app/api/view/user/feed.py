@@ -0,0 +1,37 @@
+from typing import Annotated
+from fastapi import APIRouter, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import db_connector
+from app.api.response import PydanticRoute
+from app.api.depends.post import PostDepends
+from app.api.depends.inspect import Inspector
+from app.schemas import PostPageResponse
+
+
+router = APIRouter(
+    prefix="/posts",
+    tags=["Feed"],
+    route_class=PydanticRoute,
+)
+
+
+@router.get(
+    "/feed",
+    response_model=PostPageResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_feed(
+    page: Annotated[tuple, Depends(Inspector.page_checker)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
+) -> PostPageResponse:
+    """
+    Обрабатывает запрос с фронт энда на получение ленты постов всех пользователей постранично, от новых к старым
+    :param page: Размер страницы и курсор
+    :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+    :return: Страница постов
+    """
+    return await PostDepends.get_feed_page(
+        page=page,
+        session=session,
+    )
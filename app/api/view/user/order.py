@@ -6,40 +6,48 @@ from fastapi import APIRouter, status, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.user import UserAuth
 from app.api.depends.order import OrderDepends
 from app.api.depends.security import oauth2_scheme
-from app.schemas import OrderResponse
+from app.api.depends.retry import RetryUnitOfWork
+from app.api.depends.inspect import Inspector
+from app.schemas import OrderResponse, OrderPageResponse
 from app.schemas.order import OrderCreate, OrderUpdate
 
 
 router = APIRouter(
     prefix="/user/orders",
     tags=["My Orders"],
+    route_class=PydanticRoute,
 )
 
 
 @router.get(
     "/all",
-    response_model=list[OrderResponse],
+    response_model=OrderPageResponse,
     status_code=status.HTTP_200_OK,
 )
 async def get_all_my_orders(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
-) -> list[OrderResponse]:
+    page: Annotated[tuple, Depends(Inspector.page_checker)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
+) -> OrderPageResponse:
     """
-
+    Обрабатывает запрос с фронт энда на получение истории заказов постранично,
+    без позиций заказов - они загружаются только в GET /user/orders/{order_id}
+    :param page: Размер страницы и курсор
     :param session:
-    :return:
+    :return: Страница заказов
     """
     user_model = await UserAuth.get_current_user_by_access(
         token=token,
         session=session,
     )
 
-    return await OrderDepends.get_all_oreders(
+    return await OrderDepends.get_order_page(
         user_id=user_model.id,
+        page=page,
         session=session,
     )
 
@@ -52,7 +60,7 @@ async def get_all_my_orders(
 async def get_my_order(
     token: Annotated[str, Depends(oauth2_scheme)],
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> list[OrderResponse]:
     """
 
@@ -76,11 +84,12 @@ async def get_my_order(
     "/",
     response_model=OrderResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RetryUnitOfWork())],
 )
 async def create_my_order(
     order_schema: OrderCreate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -109,7 +118,7 @@ async def update_my_order_partial(
     order_schema: OrderUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -138,7 +147,7 @@ async def update_my_order_partial(
 async def delete_my_order(
     token: Annotated[str, Depends(oauth2_scheme)],
     order_id: Annotated[int, Path(..., description="Order ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> OrderResponse:
     """
 
@@ -3,6 +3,7 @@ from fastapi import APIRouter, status, Depends, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.api.depends.user import UserAuth
 from app.api.depends.post import PostDepends
 from app.api.depends.security import oauth2_scheme
@@ -12,6 +13,7 @@ from app.schemas import PostResponse, PostCreate, PostUpdate
 router = APIRouter(
     prefix="/user/posts",
     tags=["My posts"],
+    route_class=PydanticRoute,
 )
 
 
@@ -22,7 +24,7 @@ router = APIRouter(
 )
 async def get_all_my_posts(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> list[PostResponse]:
     """
     Обрабатывает запрос с фронт энда на получение списка всех постов пользователей
@@ -48,7 +50,7 @@ async def get_all_my_posts(
 async def get_my_post(
     token: Annotated[str, Depends(oauth2_scheme)],
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на получение списка всех постов конкретного пользователя
@@ -76,7 +78,7 @@ async def get_my_post(
 async def register_my_post(
     post_scheme: PostCreate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на добавление нового поста пользователя в БД
@@ -106,7 +108,7 @@ async def full_update_my_post(
     post_scheme: PostUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на полное обновление конкретного поста пользователя в БД
@@ -137,7 +139,7 @@ async def partial_update_my_post(
     post_scheme: PostUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на частичное обновление конкретного поста пользователя в БД
@@ -167,7 +169,7 @@ async def partial_update_my_post(
 )
 async def delete_all_my_post(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> list:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного поста пользователя из БД
@@ -194,7 +196,7 @@ async def delete_all_my_post(
 async def delete_my_post(
     token: Annotated[str, Depends(oauth2_scheme)],
     post_id: Annotated[int, Path(..., description="Post ID")],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> PostResponse:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного поста пользователя из БД
@@ -3,6 +3,7 @@ from fastapi import APIRouter, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.schemas import ProfileResponse
 from app.api.depends.user import UserAuth
 from app.api.depends.security import oauth2_scheme
@@ -13,6 +14,7 @@ from app.schemas.profile import ProfileCreate, ProfileUpdate
 router = APIRouter(
     prefix="/user/profile",
     tags=["My profile"],
+    route_class=PydanticRoute,
 )
 
 
@@ -23,7 +25,7 @@ router = APIRouter(
 )
 async def get_my_profile(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на получение профиля пользователя по id пользователя
@@ -50,7 +52,7 @@ async def get_my_profile(
 async def create_my_profile(
     profile_scheme: ProfileCreate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на создание профиля пользователя в БД
@@ -79,7 +81,7 @@ async def create_my_profile(
 async def full_update_my_profile(
     profile_scheme: ProfileUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на полную замену данных профиля конкретного пользователя
@@ -108,7 +110,7 @@ async def full_update_my_profile(
 async def partial_update_my_profile(
     profile_scheme: ProfileUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на частичную замену данных профиля конкретного пользователя
@@ -137,7 +139,7 @@ async def partial_update_my_profile(
 )
 async def delete_my_profile(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> ProfileResponse:
     """
     Обрабатывает запрос с фронт энда на удаление конкретного пользователя
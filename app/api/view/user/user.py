@@ -1,18 +1,21 @@
 from typing import Annotated
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core import db_connector
+from app.api.response import PydanticRoute
 from app.schemas import UserUpdate
-from app.api.depends.security import oauth2_scheme
+from app.api.depends.security import oauth2_scheme, login_rate_limit
 from app.api.depends.user import UserAuth, UserDepends
-from app.schemas import UserResponse, UserCreate, TokenResponse
+from app.schemas import UserResponse, UserMeResponse, UserCreate, TokenResponse
+from app.tools.types import DEFAULT_DEVICE_ID
 
 
 router = APIRouter(
     prefix="/user/auth",
     tags=["Me"],
+    route_class=PydanticRoute,
 )
 
 
@@ -20,10 +23,21 @@ router = APIRouter(
     "/login",
     response_model=TokenResponse,
     status_code=status.HTTP_200_OK,
+    # Лимит проверяется раньше зависимости сессии: отклоненная попытка не берет соединение из пула
+    dependencies=[Depends(login_rate_limit)],
 )
 async def login_user(
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    device_id: Annotated[
+        str,
+        Header(
+            alias="X-Device-Id",
+            min_length=1,
+            max_length=64,
+            description="Device ID, each device keeps its own refresh token",
+        ),
+    ] = DEFAULT_DEVICE_ID,
 ) -> TokenResponse:
     """
 
@@ -41,6 +55,7 @@ async def login_user(
         user_model=user_model,
         session=session,
         refresh_status=True,
+        device_id=device_id,
     )
 
 
@@ -51,7 +66,7 @@ async def login_user(
 )
 async def give_access(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> TokenResponse:
     """
 
@@ -77,7 +92,7 @@ async def give_access(
 )
 async def register_me(
     user_scheme: UserCreate,
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на добавление пользователя в БД
@@ -92,6 +107,28 @@ async def register_me(
     )
 
 
+@router.get(
+    "/me",
+    response_model=UserMeResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_me(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
+) -> UserMeResponse:
+    """
+    Обрабатывает запрос с fontend на получение данных стартового экрана: пользователя, его профиля и итогов корзины.
+    Проверка пользователя из токена и загрузка всех данных выполняются одним запросом к БД
+    :param token: Токен, полученный через зависимость из заголовка запроса
+    :param session: объект сессии, который получается путем выполнения зависимости (метода session_dependency объекта db_connector)
+    :return: Пользователя, профиль и итоги корзины в виде Pydantic схемы
+    """
+    return await UserAuth.get_me_by_access(
+        token=token,
+        session=session,
+    )
+
+
 @router.put(
     "/",
     response_model=UserResponse,
@@ -100,7 +137,7 @@ async def register_me(
 async def full_update_me(
     user_scheme: UserUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на полную замену данных пользователя по его id
@@ -129,7 +166,7 @@ async def full_update_me(
 async def partial_update_me(
     user_scheme: UserUpdate,
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на полную замену данных пользователя по его id
@@ -158,7 +195,7 @@ async def partial_update_me(
 )
 async def delete_me(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: Annotated[AsyncSession, Depends(db_connector.get_session)],
+    session: Annotated[AsyncSession, Depends(db_connector.get_session, scope="function")],
 ) -> UserResponse:
     """
     Обрабатывает запрос с fontend на удаление пользователя из БД
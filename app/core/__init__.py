@@ -1,9 +1,41 @@
+import importlib
+from typing import Any
+
+
 __all__ = [
     "db_connector",
     "db_settings",
+    "server_settings",
     "jwt_settings",
+    "compression_settings",
+    "feed_settings",
+    "rate_limit_settings",
+    "deadline_settings",
+    "admission_settings",
+    "login_limiter",
 ]
 
-from app.core.config import db_settings
-from app.core.config import jwt_settings
-from app.core.connector import db_connector
+
+# Модули импортируются при первом обращении к имени: импорт app.core не тянет драйвер БД, Redis и Prometheus
+_EXPORTS = {
+    "db_connector": "app.core.connector",
+    "db_settings": "app.core.config",
+    "server_settings": "app.core.config",
+    "jwt_settings": "app.core.config",
+    "compression_settings": "app.core.config",
+    "feed_settings": "app.core.config",
+    "rate_limit_settings": "app.core.config",
+    "deadline_settings": "app.core.config",
+    "admission_settings": "app.core.config",
+    "login_limiter": "app.core.limiter",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+
+    return value
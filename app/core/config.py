@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Any, Callable, Generic, Literal, Optional, TypeVar, cast
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -11,9 +12,81 @@ class DBSettings(BaseSettings):
 
     echo: bool
 
+    # Сколько соединений пула interactive открывается при старте процесса, не больше размера пула
+    warm_connections: int = 5
+
+    # Отдельные пулы соединений для классов нагрузки: долгие запросы админки и фоновые задачи
+    # не занимают соединения пользовательских запросов. Сумма size + max_overflow всех пулов всех процессов
+    # должна помещаться в max_connections PostgreSQL. timeout - сколько секунд ждать свободное соединение
+    interactive_pool_size: int = 5
+
+    interactive_max_overflow: int = 10
+
+    interactive_pool_timeout: float = 30.0
+
+    admin_pool_size: int = 2
+
+    admin_max_overflow: int = 2
+
+    admin_pool_timeout: float = 30.0
+
+    background_pool_size: int = 1
+
+    background_max_overflow: int = 1
+
+    background_pool_timeout: float = 60.0
+
+    # Попыток единицы работы при взаимоблокировке, ошибке сериализации или потере соединения, включая первую,
+    # и границы случайной задержки перед повтором в секундах
+    retry_attempts: int = 3
+
+    retry_base_delay: float = 0.02
+
+    retry_max_delay: float = 0.5
+
     model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="DB_")
 
 
+class ServerSettings(BaseSettings):
+
+    host: str = "0.0.0.0"
+
+    port: int = 8000
+
+    # Число процессов uvicorn, по умолчанию - число доступных процессу ядер
+    workers: Optional[int] = None
+
+    # auto выбирает uvloop и httptools, если они установлены, иначе asyncio и h11
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+
+    http: Literal["auto", "h11", "httptools"] = "auto"
+
+    # Очередь установленных соединений, которые процессы еще не приняли
+    backlog: int = 2048
+
+    # Сколько секунд держать простаивающее keep-alive соединение. Должно быть больше таймаута простоя
+    # балансировщика перед сервером, иначе он отправляет запросы в уже закрытые соединения
+    keep_alive: int = 75
+
+    # Одновременных соединений и задач на процесс, сверх лимита сразу отвечает 503, без ограничения если None
+    limit_concurrency: Optional[int] = None
+
+    # Сколько секунд при остановке ждать завершения начатых запросов
+    graceful_timeout: int = 30
+
+    # Адрес клиента берется из X-Forwarded-For и X-Forwarded-Proto только в соединениях с этих адресов
+    # (через запятую, * - с любых): за балансировщиком сюда добавляется его адрес или подсеть, иначе request.client
+    # у всех запросов - адрес балансировщика и лимит входа с одного IP становится общим лимитом сайта
+    proxy_headers: bool = True
+
+    forwarded_allow_ips: str = "127.0.0.1"
+
+    # Приложение импортируется один раз в родительском процессе, процессы создаются fork и разделяют его память
+    preload: bool = False
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="SERVER_")
+
+
 class JWTSettings(BaseSettings):
 
     private_key: Path
@@ -33,6 +106,140 @@ class JWTSettings(BaseSettings):
     model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="JWT_")
 
 
-db_settings = DBSettings()
+class CompressionSettings(BaseSettings):
+
+    # Ответы меньше minimum_size байт не сжимаются
+    minimum_size: int = 1024
+
+    gzip_level: int = 6
+
+    brotli_quality: int = 5
+
+    # GET ответы каталога, сжатые тела которых кешируются в памяти
+    cache_paths: tuple[str, ...] = ("/admin/products",)
+
+    cache_size: int = 32 * 1024 * 1024
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="COMPRESSION_")
+
+
+class FeedSettings(BaseSettings):
+
+    # Сколько последних постов ленты держится в памяти процесса
+    window: int = 1000
+
+    # Окно перечитывается не реже, чем раз в ttl секунд: записи в других процессах сбрасывают только свое окно
+    ttl: float = 5.0
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="FEED_")
+
+
+class RateLimitSettings(BaseSettings):
+
+    # Общее хранилище счетчиков для всех процессов, без него каждый процесс считает попытки сам
+    redis_url: Optional[str] = None
+
+    # Сколько секунд ждать подключения и ответа Redis. Дольше попытка входа не ждет, после ошибки
+    # счетчики redis_cooldown секунд берутся из памяти процесса без обращения к Redis
+    redis_timeout: float = 0.1
+
+    redis_cooldown: float = 5.0
+
+    # Длина скользящего окна в секундах
+    window: int = 60
+
+    # Попыток входа за окно с одного IP адреса и для одного логина. IP - адрес клиента uvicorn: за балансировщиком
+    # его адрес должен быть в SERVER_FORWARDED_ALLOW_IPS, иначе все клиенты считаются одним IP
+    login_per_ip: int = 20
+
+    login_per_login: int = 5
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="RATE_LIMIT_")
+
+
+class DeadlineSettings(BaseSettings):
+
+    # Сколько секунд дается на обработку запроса, если маршрут не задает свой срок (RouteTimeout)
+    default: float = 10.0
+
+    # Заголовок, которым клиент или балансировщик сокращает срок: оставшееся у него время ожидания в секундах
+    header: str = "X-Request-Timeout"
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="DEADLINE_")
+
+
+class AdmissionSettings(BaseSettings):
+
+    enabled: bool = True
+
+    # Лимит одновременных запросов группы маршрутов в процессе: начальный, нижняя и верхняя граница
+    initial_limit: int = 20
+
+    min_limit: int = 2
+
+    max_limit: int = 200
+
+    # Во сколько раз уменьшается лимит, когда запрос ждал соединение из пула дольше wait_target секунд
+    backoff: float = 0.9
+
+    wait_target: float = 0.05
+
+    # Через сколько секунд клиенту повторить отклоненный запрос
+    retry_after: int = 1
+
+    # Проверки живости, метрики и обновление токенов не ограничиваются: их отказ хуже перегрузки
+    exempt_paths: tuple[str, ...] = ("/health", "/metrics", "/user/auth/refresh")
+
+    model_config = ConfigDict(env_file=".env", extra="ignore", env_prefix="ADMISSION_")
+
+
+Settings = TypeVar("Settings", bound=BaseSettings)
+
+
+class LazySettings(Generic[Settings]):
+    """
+    Настройки, которые читаются из окружения и .env при первом обращении к полю, а не при импорте модуля.
+    Импорт app.core не требует переменных окружения: Alembic, скрипты обслуживания и тесты читают только
+    нужные им настройки, а отсутствующая переменная дает ошибку там, где настройка действительно используется
+    """
+
+    def __init__(self, factory: Callable[[], Settings]) -> None:
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_settings", None)
+
+    def get(self) -> Settings:
+        if self._settings is None:
+            object.__setattr__(self, "_settings", self._factory())
+
+        return self._settings
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.get(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.get(), name)
+
+
+def lazy(factory: Callable[[], Settings]) -> Settings:
+    """Для проверки типов ленивые настройки неотличимы от экземпляра класса настроек"""
+    return cast(Settings, LazySettings(factory))
+
+
+db_settings = lazy(DBSettings)
+
+server_settings = lazy(ServerSettings)
+
+jwt_settings = lazy(JWTSettings)
+
+compression_settings = lazy(CompressionSettings)
+
+feed_settings = lazy(FeedSettings)
+
+rate_limit_settings = lazy(RateLimitSettings)
+
+deadline_settings = lazy(DeadlineSettings)
 
-jwt_settings = JWTSettings()
+admission_settings = lazy(AdmissionSettings)
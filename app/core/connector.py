@@ -1,36 +1,404 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import event, exc as sa_exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, ORMExecuteState, SessionTransaction, configure_mappers
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
+    AsyncConnection,
+    AsyncEngine,
     AsyncSession,
 )
-from . import db_settings
-from typing import AsyncGenerator
+from app.core.config import db_settings, deadline_settings
+from app.core.deadline import CANCEL_GRACE, remaining as deadline_remaining
+from app.core.retry import Attempt, attempt_scoped, retry_policy
+from app.core.metrics import DB_CONNECTION_HOLD, DB_POOL_CAPACITY, DB_POOL_CHECKOUT, DB_POOL_IN_USE, DB_POOL_TIMEOUTS
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterator, Literal, Mapping, Optional, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+# Запрос, выполняемый при прогреве соединения, получает сессию, привязанную к нему
+WarmUpStatement = Callable[..., Awaitable[Any]]
+
+# Классы нагрузки, у каждого свой пул соединений: запросы пользователей, админка и отчеты, фоновые задачи
+PoolName = Literal["interactive", "admin", "background"]
+
+POOLS: tuple[PoolName, ...] = ("interactive", "admin", "background")
+
+SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+# Время получения соединений из пула текущим запросом, по нему AdmissionMiddleware замечает перегрузку БД
+_checkout_waits: ContextVar[Optional[list[float]]] = ContextVar("checkout_waits", default=None)
+
+
+@contextmanager
+def track_checkout_wait() -> Iterator[list[float]]:
+    """
+    Собирает время получения соединений из пула внутри блока
+    :return: Список, в который добавляется время каждого получения соединения в секундах
+    """
+    waits: list[float] = []
+    token = _checkout_waits.set(waits)
+
+    try:
+        yield waits
+
+    finally:
+        _checkout_waits.reset(token)
+
+
+class BulkheadPool(AsyncAdaptedQueuePool):
+    """Пул соединений одного класса нагрузки, пишет в метрики время получения соединения и таймауты ожидания"""
+
+    bulkhead: PoolName = "interactive"
+
+    # statement_timeout соединений пула в секундах, None - без ограничения
+    statement_timeout: Optional[float] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+
+        try:
+            return super()._do_get()
+
+        except sa_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=self.bulkhead).inc()
+            raise
+
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_POOL_CHECKOUT.labels(pool=self.bulkhead).observe(elapsed)
+            waits = _checkout_waits.get()
+
+            if waits is not None:
+                waits.append(elapsed)
+
+    def recreate(self) -> "BulkheadPool":
+        pool = super().recreate()
+        pool.bulkhead = self.bulkhead
+        pool.statement_timeout = self.statement_timeout
+
+        return pool
 
 
 class DBConnector:
 
-    def __init__(self, url: str, echo: bool):
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
-        )
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        echo: Optional[bool] = None,
+        pools: Optional[Mapping[PoolName, Mapping[str, Any]]] = None,
+    ):
+        """
+        :param url: URL БД, по умолчанию DB_URL
+        :param echo: Логировать запросы, по умолчанию DB_ECHO
+        :param pools: pool_size, max_overflow и pool_timeout пулов, по умолчанию DB_<POOL>_POOL_SIZE и т.д.
+        """
+        self.url = url
+        self.echo = echo
+        self.pools = pools
 
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
-            autoflush=False,
-            autocommit=False,
-            expire_on_commit=False,
-        )
+    def __getattr__(self, name: str) -> Any:
+        # Движок создается при первом обращении: импорт модулей с db_connector не читает настройки БД
+        if name in ("engines", "session_factories", "engine", "session_factory"):
+            self.create_engine()
+            return self.__dict__[name]
+
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def pool_options(self, pool: PoolName) -> dict[str, Any]:
+        if self.pools is not None:
+            return dict(self.pools[pool])
+
+        return {
+            "pool_size": getattr(db_settings, f"{pool}_pool_size"),
+            "max_overflow": getattr(db_settings, f"{pool}_max_overflow"),
+            "pool_timeout": getattr(db_settings, f"{pool}_pool_timeout"),
+        }
+
+    @staticmethod
+    def statement_timeout(pool: PoolName) -> Optional[float]:
+        """
+        statement_timeout соединений пула по умолчанию. Для interactive он равен сроку запроса по умолчанию,
+        поэтому первой транзакции запроса не нужен отдельный set_config (apply_request_deadline).
+        Отчеты админки и фоновые задачи работают дольше и получают срок только от запроса
+        :param pool: Пул
+        :return: Секунды, None - без ограничения
+        """
+        return deadline_settings.default if pool == "interactive" else None
+
+    def create_engine(self) -> None:
+        """
+        Создает движки и фабрики сессий всех пулов. Процесс, созданный fork, вызывает его заново:
+        соединения пула и состояние драйвера родителя не должны использоваться в двух процессах.
+        engine и session_factory - пул interactive
+        """
+        url = self.url if self.url is not None else db_settings.url
+        echo = self.echo if self.echo is not None else db_settings.echo
+
+        self.engines: dict[PoolName, AsyncEngine] = {}
+        self.session_factories: dict[PoolName, async_sessionmaker[AsyncSession]] = {}
+
+        for pool in POOLS:
+            # SQLite в тестах использует свои пулы без ограничения размера
+            if make_url(url).get_backend_name() == "sqlite":
+                engine = create_async_engine(url=url, echo=echo)
+
+            else:
+                options = self.pool_options(pool)
+                timeout = self.statement_timeout(pool)
+                connect_args = {}
+
+                if timeout is not None and make_url(url).get_backend_name() == "postgresql":
+                    connect_args["server_settings"] = {"statement_timeout": f"{int(timeout * 1000)}ms"}
+
+                engine = create_async_engine(
+                    url=url,
+                    echo=echo,
+                    poolclass=BulkheadPool,
+                    connect_args=connect_args,
+                    **options,
+                )
+                engine.pool.bulkhead = pool
+                engine.pool.statement_timeout = timeout if connect_args else None
+                self._observe_pool(engine, pool, options)
+
+            self.engines[pool] = engine
+            self.session_factories[pool] = async_sessionmaker(
+                bind=engine,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+            )
+
+        self.engine = self.engines["interactive"]
+        self.session_factory = self.session_factories["interactive"]
+
+    @staticmethod
+    def _observe_pool(engine: AsyncEngine, pool: PoolName, options: Mapping[str, Any]) -> None:
+        in_use = DB_POOL_IN_USE.labels(pool=pool)
+        DB_POOL_CAPACITY.labels(pool=pool).set(options["pool_size"] + options["max_overflow"])
+
+        event.listen(engine.sync_engine, "checkout", lambda *args: in_use.inc())
+        event.listen(engine.sync_engine, "checkin", lambda *args: in_use.dec())
+
+    async def dispose(self) -> None:
+        """Закрывает соединения всех пулов"""
+        await asyncio.gather(*(engine.dispose() for engine in self.engines.values()))
+
+    @asynccontextmanager
+    async def unit_of_work(self, pool: PoolName = "interactive") -> AsyncIterator[AsyncSession]:
+        """
+        Единица работы: одна сессия и одна транзакция на весь блок.
+        Репозитории только отправляют изменения в БД (flush), фиксирует их один commit в конце блока,
+        при исключении внутри блока транзакция откатывается целиком и частичных изменений в БД не остается
+        :param pool: Пул, из которого сессия берет соединение
+        :return: Сессия
+        """
+        # session_factory подменяется в тестах и бенчмарках, поэтому для interactive берется атрибут
+        session_factory = self.session_factory if pool == "interactive" else self.session_factories[pool]
+
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+
+            except BaseException:
+                await session.rollback()
+                raise
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+    async def run(
+        self,
+        work: Callable[[AsyncSession], Awaitable[T]],
+        operation: str,
+        pool: PoolName = "interactive",
+        idempotent: bool = False,
+    ) -> T:
+        """
+        Выполняет work в единице работы и повторяет ее целиком на новой сессии после временной ошибки БД
+        (retry_policy). Для скриптов и фоновых задач, запросы API повторяет маршрут (handle_with_retry)
+        :param work: Корутина, которая получает сессию
+        :param operation: Имя операции для метрик
+        :param pool: Пул, из которого сессия берет соединение
+        :param idempotent: Повторное выполнение уже зафиксированной работы безопасно
+        :return: Результат work
+        """
+        async def attempt(state: Attempt) -> T:
+            async with self.unit_of_work(pool=pool) as session:
+                result = await work(session)
+                state.committing = True
+
+            return result
+
+        return await retry_policy().run(attempt, operation=operation, idempotent=idempotent)
+
+    @asynccontextmanager
+    async def request_unit_of_work(self, request: Request, pool: PoolName) -> AsyncIterator[AsyncSession]:
+        """
+        Единица работы запроса: сессия подписывается шаблоном пути маршрута для метрики удержания соединения.
+        В повторяемом запросе единица работы закрывается вместе с попыткой, а не с зависимостью
+        :param request: Запрос
+        :param pool: Пул, из которого сессия берет соединение
+        :return: Сессия
+        """
+        route = request.scope.get("route")
+
+        async with attempt_scoped(request, self.unit_of_work(pool=pool)) as session:
+            session.info["route"] = f"{request.method} {route.path}" if route else request.url.path
+            yield session
+
+    async def get_session(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
         """
         Асинхронный генератор, который предоставляет сессию для FastAPI-маршрутов и автоматически закрывает её после использования.
         "Отдаёт" её маршруту (через yield), чтобы тот мог работать с базой.
+        Весь запрос выполняется в одной единице работы unit_of_work: commit после обработчика, откат при исключении,
+        в том числе HTTPException. Зависимость подключается с Depends(..., scope="function"), чтобы commit выполнялся
+        до отправки ответа, а ошибка commit возвращалась клиенту, а не терялась после ответа 200
+        Соединение берется из пула первым запросом к БД, а не при создании сессии: маршрут, который отвечает
+        из кеша в памяти, пул не занимает. Время удержания соединения пишется в метрику по маршруту
         После завершения запроса закрывает сессию и возвращает ее в пул соединений
+        :param request: Запрос, по шаблону пути которого подписывается метрика
         :return:
         """
-        async with self.session_factory() as session:
+        async with self.request_unit_of_work(request, pool="interactive") as session:
             yield session
 
+    async def get_admin_session(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Сессия маршрутов админки и отчетов из пула admin: их долгие запросы и выгрузки
+        не занимают соединения пользовательских запросов. В остальном как get_session
+        :param request: Запрос, по шаблону пути которого подписывается метрика
+        :return:
+        """
+        async with self.request_unit_of_work(request, pool="admin") as session:
+            yield session
+
+    @staticmethod
+    async def release_connection(session: AsyncSession) -> bool:
+        """
+        Возвращает соединение сессии в пул между этапами запроса, например после чтения пользователя
+        и перед проверкой пароля: пока идет работа без БД, соединение может использовать другой запрос.
+        Транзакция, в которой только читали, фиксируется, следующий запрос сессии возьмет соединение заново.
+        Если в транзакции уже есть изменения, соединение остается у сессии: изменения единицы работы
+        фиксируются одним commit в ее конце
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Возвращено ли соединение в пул
+        """
+        if not session.in_transaction() or session.info.get("has_writes"):
+            return False
+
+        if session.new or session.dirty or session.deleted:
+            return False
+
+        await session.commit()
+
+        return True
+
+    async def warm_up(
+        self,
+        connections: int,
+        statements: Sequence[WarmUpStatement] = (),
+    ) -> int:
+        """
+        Подготавливает процесс к первым запросам: настраивает мапперы ORM и открывает соединения пула.
+        На каждом соединении выполняются statements, поэтому asyncpg заранее получает типы и подготавливает запросы,
+        а SQLAlchemy кэширует их компиляцию. Соединения открываются одновременно, иначе пул отдавал бы одно и то же
+        :param connections: Сколько соединений открыть, не больше размера пула: лишние закрылись бы при возврате
+        :param statements: Запросы, которые вызываются с аргументом session
+        :return: Количество прогретых соединений
+        """
+        configure_mappers()
+
+        pool_size = getattr(self.engine.pool, "size", None)
+
+        if pool_size is not None:
+            connections = min(connections, pool_size())
+
+        conns = [self.engine.connect() for _ in range(connections)]
+        # Соединения закрываются только после завершения прогрева всех остальных
+        results = await asyncio.gather(
+            *(self._warm_connection(conn, statements) for conn in conns),
+            return_exceptions=True,
+        )
+        await asyncio.gather(*(conn.close() for conn in conns if conn.sync_connection is not None))
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return connections
+
+    async def _warm_connection(
+        self,
+        conn: AsyncConnection,
+        statements: Sequence[WarmUpStatement],
+    ) -> None:
+        await conn.start()
+
+        # Запрос срока выполняется в начале каждой транзакции запроса, он подготавливается вместе с частыми запросами
+        if conn.dialect.name == "postgresql":
+            await conn.execute(SET_STATEMENT_TIMEOUT, {"timeout": "0"})
+
+        async with self.session_factory(bind=conn) as session:
+            for statement in statements:
+                await statement(session=session)
+
+        await conn.rollback()
+
+
+@event.listens_for(Session, "after_begin")
+def start_connection_hold(session: Session, transaction: SessionTransaction, connection) -> None:
+    session.info.setdefault("hold_started", time.perf_counter())
+
+
+@event.listens_for(Session, "after_begin")
+def apply_request_deadline(session: Session, transaction: SessionTransaction, connection) -> None:
+    # PostgreSQL сам прерывает запросы, которые не успевают к сроку запроса. Как SET LOCAL, значение действует
+    # до конца транзакции, но срок передается параметром: asyncpg подготавливает запрос один раз на соединение
+    remaining = deadline_remaining()
+
+    if remaining is None or connection.dialect.name != "postgresql":
+        return
+
+    # statement_timeout пула уже подходит, если PostgreSQL прервет запрос не раньше срока и до отмены задачи:
+    # так для первой транзакции большинства запросов не нужен лишний обмен с сервером
+    default = getattr(connection.engine.pool, "statement_timeout", None)
+
+    if default is not None and remaining <= default <= remaining + CANCEL_GRACE:
+        return
+
+    connection.execute(SET_STATEMENT_TIMEOUT, {"timeout": f"{max(1, int(remaining * 1000))}ms"})
+
+
+@event.listens_for(Session, "after_transaction_end")
+def end_connection_hold(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is not None:
+        return
+
+    session.info.pop("has_writes", None)
+    started = session.info.pop("hold_started", None)
+
+    if started is not None:
+        DB_CONNECTION_HOLD.labels(route=session.info.get("route", "other")).observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "after_flush")
+def mark_flush_writes(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def mark_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    # Текстовые запросы считаются изменяющими: по ним нельзя понять, что они только читают
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
 
-db_connector = DBConnector(url=db_settings.url, echo=db_settings.echo)
+db_connector = DBConnector()
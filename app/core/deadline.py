@@ -0,0 +1,90 @@
+"""
+Крайний срок обработки текущего запроса. Срок хранится в contextvar, поэтому его видят все слои запроса
+до драйвера БД без передачи параметром: транзакция получает statement_timeout из оставшегося времени
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+
+# Задача запроса отменяется немного позже срока. Запрос к БД к этому времени уже прерван statement_timeout,
+# после которого соединение остается рабочим, а отмена задачи посреди запроса asyncpg закрывает соединение
+CANCEL_GRACE = 0.05
+
+# SQLSTATE query_canceled: PostgreSQL прервал запрос по statement_timeout
+QUERY_CANCELED = "57014"
+
+
+class Deadline:
+    """Срок по часам event loop, вскоре после него задача запроса отменяется и получает TimeoutError"""
+
+    def __init__(self, at: float) -> None:
+        """
+        :param at: Крайний срок
+        """
+        self.at = at
+
+    def remaining(self) -> float:
+        return self.at - asyncio.get_running_loop().time()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """
+    :return: Сколько секунд осталось до срока текущего запроса, None вне запроса (скрипты, фоновые задачи)
+    """
+    deadline = _deadline.get()
+
+    return deadline.remaining() if deadline is not None else None
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+
+    return deadline is not None and deadline.expired()
+
+
+def canceled_by_statement_timeout(exc: BaseException) -> bool:
+    """
+    :param exc: Исключение, в том числе DatabaseError репозитория
+    :return: Причина исключения - запрос, прерванный PostgreSQL
+    """
+    while exc is not None:
+        if getattr(exc, "sqlstate", None) == QUERY_CANCELED:
+            return True
+
+        exc = exc.__cause__
+
+    return False
+
+
+@asynccontextmanager
+async def deadline_scope(timeout: float) -> AsyncIterator[Deadline]:
+    """
+    Устанавливает срок для блока, вскоре после него блок прерывается с TimeoutError.
+    Срок не переносится: statement_timeout уже открытых транзакций выставлен по нему
+    :param timeout: Время на выполнение блока в секундах
+    :return: Срок
+    """
+    at = asyncio.get_running_loop().time() + timeout
+
+    async with asyncio.timeout_at(at + CANCEL_GRACE):
+        deadline = Deadline(at=at)
+        token = _deadline.set(deadline)
+
+        try:
+            yield deadline
+
+        finally:
+            _deadline.reset(token)
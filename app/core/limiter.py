@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Optional
+
+from prometheus_client import Counter
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
+
+from app.core.config import rate_limit_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+RATE_LIMIT_REQUESTS = Counter(
+    "rate_limit_requests_total",
+    "Requests checked by rate limiters",
+    ["rule", "result"],
+)
+
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    "rate_limit_backend_errors_total",
+    "Redis errors after which the in-memory counters were used",
+)
+
+
+# Проверка и увеличение счетчиков окна одним атомарным вызовом.
+# KEYS[1] - счетчик текущего окна, KEYS[2] - предыдущего, ARGV[1] - вес предыдущего окна,
+# ARGV[2] - лимит, ARGV[3] - время жизни счетчика. Отклоненная попытка счетчик не увеличивает
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+
+if previous * tonumber(ARGV[1]) + current + 1 > tonumber(ARGV[2]) then
+    return {0, previous, current}
+end
+
+current = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+
+return {1, previous, current}
+"""
+
+
+def retry_after(previous: int, current: int, limit: int, window: int, elapsed: float) -> int:
+    """
+    Вычисляет, через сколько секунд оценка скользящего окна опустится настолько, что попытка будет принята
+    :param previous: Попыток в предыдущем окне
+    :param current: Попыток в текущем окне
+    :param limit: Лимит попыток за окно
+    :param window: Длина окна в секундах
+    :param elapsed: Сколько секунд прошло от начала текущего окна
+    :return: Секунды, не меньше 1
+    """
+    if current < limit and previous:
+        # Вклад предыдущего окна убывает линейно до конца текущего окна
+        wait = (1 - (limit - 1 - current) / previous) * window - elapsed
+
+    else:
+        # Текущее окно заполнено, в следующем оно станет предыдущим и его вклад начнет убывать
+        wait = window - elapsed
+
+        if current:
+            wait += (1 - (limit - 1) / current) * window
+
+    return max(1, math.ceil(wait))
+
+
+class MemoryWindows:
+    """Счетчики скользящих окон в памяти процесса, используются без Redis и при его недоступности"""
+
+    # При превышении числа ключей удаляются счетчики, окна которых уже не влияют на оценку
+    max_keys = 100_000
+
+    def __init__(self) -> None:
+        self._windows: dict[str, tuple[int, int, int]] = {}
+
+    def hit(self, key: str, number: int, weight: float, limit: int) -> tuple[bool, int, int]:
+        """
+        Проверяет попытку и, если она принята, учитывает ее в текущем окне
+        :param key: Ключ лимита
+        :param number: Номер текущего окна
+        :param weight: Вес предыдущего окна в оценке
+        :param limit: Лимит попыток за окно
+        :return: (принята ли попытка, попыток в предыдущем окне, попыток в текущем окне)
+        """
+        stored_number, previous, current = self._windows.get(key, (number, 0, 0))
+
+        if stored_number != number:
+            previous = current if stored_number == number - 1 else 0
+            current = 0
+
+        if previous * weight + current + 1 > limit:
+            self._windows[key] = (number, previous, current)
+            return False, previous, current
+
+        self._windows[key] = (number, previous, current + 1)
+
+        if len(self._windows) > self.max_keys:
+            self._windows = {k: w for k, w in self._windows.items() if w[0] >= number - 1}
+
+        return True, previous, current + 1
+
+
+class SlidingWindowLimiter:
+    """
+    Лимит попыток за скользящее окно: оценка равна попыткам текущего окна фиксированной длины
+    плюс попыткам предыдущего окна с весом, убывающим по мере прохождения текущего.
+    Счетчики хранятся в Redis, если задан redis_url, поэтому лимит общий для всех процессов uvicorn,
+    при ошибке Redis попытка проверяется по счетчикам в памяти процесса
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        redis_url: Optional[str] = None,
+        timeout: float = 0.1,
+        cooldown: float = 5.0,
+    ) -> None:
+        """
+        :param name: Название лимитера, префикс ключей
+        :param window: Длина окна в секундах
+        :param redis_url: Адрес Redis, без него счетчики только в памяти
+        :param timeout: Сколько секунд ждать подключения и ответа Redis
+        :param cooldown: Сколько секунд после ошибки Redis не обращаться к нему
+        """
+        self.name = name
+        self.window = window
+        self.redis = None
+
+        if redis_url:
+            # Без повторов клиента: при недоступном Redis попытка сразу проверяется по счетчикам в памяти
+            self.redis = Redis.from_url(
+                redis_url,
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout,
+                retry=Retry(NoBackoff(), 0),
+            )
+
+        self.memory = MemoryWindows()
+        self.cooldown = cooldown
+        self._script = self.redis.register_script(SLIDING_WINDOW_SCRIPT) if self.redis else None
+        self._redis_down_until = 0.0
+
+    async def acquire(self, rule: str, key: str, limit: int) -> Optional[int]:
+        """
+        Учитывает попытку по правилу лимита
+        :param rule: Название правила, например ip или login
+        :param key: Значение, по которому считаются попытки
+        :param limit: Лимит попыток за окно
+        :return: None, если попытка разрешена, иначе через сколько секунд повторить
+        """
+        now = time.time()
+        number, elapsed = divmod(now, self.window)
+        number = int(number)
+        weight = 1 - elapsed / self.window
+        # Ключ фиксированной длины при любом размере значения
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        key = f"{self.name}:{rule}:{digest}"
+
+        # После ошибки Redis не опрашивается cooldown секунд, чтобы каждая попытка не ждала таймаут
+        if self._script is None or time.monotonic() < self._redis_down_until:
+            allowed, previous, current = self.memory.hit(key, number, weight, limit)
+
+        else:
+            try:
+                allowed, previous, current = await self._script(
+                    keys=[f"{key}:{number}", f"{key}:{number - 1}"],
+                    args=[weight, limit, self.window * 2],
+                )
+
+            except RedisError:
+                self._redis_down_until = time.monotonic() + self.cooldown
+                RATE_LIMIT_BACKEND_ERRORS.inc()
+                logger.warning(
+                    "Rate limiter %s: Redis is unavailable, using in-memory counters for %s s",
+                    self.name,
+                    self.cooldown,
+                )
+                allowed, previous, current = self.memory.hit(key, number, weight, limit)
+
+        RATE_LIMIT_REQUESTS.labels(rule=f"{self.name}:{rule}", result="allowed" if allowed else "rejected").inc()
+
+        if allowed:
+            return None
+
+        return retry_after(int(previous), int(current), limit, self.window, elapsed)
+
+
+login_limiter = SlidingWindowLimiter(
+    name="login",
+    window=rate_limit_settings.window,
+    redis_url=rate_limit_settings.redis_url,
+    timeout=rate_limit_settings.redis_timeout,
+    cooldown=rate_limit_settings.redis_cooldown,
+)
@@ -0,0 +1,103 @@
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, make_asgi_app, multiprocess
+from starlette.types import ASGIApp
+
+
+DB_CONNECTION_HOLD = Histogram(
+    "db_connection_hold_seconds",
+    "Time a session kept a pooled connection, from the start of a transaction to its end",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REQUESTS_ABANDONED = Counter(
+    "http_requests_abandoned_total",
+    "Requests stopped before completion because the deadline passed or the client disconnected",
+    ["route", "reason"],
+)
+
+DB_RETRIES = Counter(
+    "db_retries_total",
+    "Units of work retried after a transient database error",
+    ["operation", "reason"],
+)
+
+DB_RETRIES_EXHAUSTED = Counter(
+    "db_retries_exhausted_total",
+    "Units of work that failed with a transient database error after the last attempt",
+    ["operation", "reason"],
+)
+
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Adaptive limit of concurrent requests of a route group",
+    ["group"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests",
+    "Requests of a route group being processed",
+    ["group"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests rejected with 503 because the route group was at its concurrency limit",
+    ["group"],
+)
+
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, waiting for a free one or opening a new one",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after the pool timeout",
+    ["pool"],
+)
+
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections checked out from the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Pool size plus max overflow",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+def metrics_app() -> ASGIApp:
+    """
+    ASGI приложение, отдающее метрики в формате Prometheus.
+    При нескольких процессах uvicorn метрики каждого процесса пишутся в файлы каталога PROMETHEUS_MULTIPROC_DIR
+    и собираются MultiProcessCollector, иначе каждый запрос к /metrics видел бы счетчики только одного процесса
+    :return: ASGI приложение
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return make_asgi_app(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return make_asgi_app(registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Удаляет файлы gauge livesum завершившегося процесса uvicorn, иначе его последние значения
+    остаются в сумме процессов. Вызывается родительским процессом после os.wait
+    :param pid: Процесс-обработчик
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
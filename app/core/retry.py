@@ -0,0 +1,170 @@
+"""
+Повтор единиц работы после временных ошибок БД: взаимоблокировки, ошибки сериализации, потерянного соединения.
+Повторяется вся единица работы на новой транзакции, а не отдельный запрос: после такой ошибки PostgreSQL
+откатывает транзакцию целиком и продолжить ее нельзя
+"""
+
+import asyncio
+import random
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import db_settings
+from app.core.deadline import remaining
+from app.core.metrics import DB_RETRIES, DB_RETRIES_EXHAUSTED
+
+
+T = TypeVar("T")
+
+# SQLSTATE ошибок, после которых PostgreSQL откатил транзакцию и ее можно выполнить заново
+ROLLED_BACK = {
+    "40001": "serialization",
+    "40P01": "deadlock",
+    "55P03": "lock_timeout",
+}
+
+# Класс 08 - ошибки соединения, 57P01-57P03 - остановка или перезапуск сервера (failover)
+CONNECTION_SQLSTATES = ("08", "57P01", "57P02", "57P03")
+
+# Атрибут request.state со стеком контекстов текущей попытки повторяемого запроса
+ATTEMPT_STACK = "retry_attempt_stack"
+
+
+def transient_reason(exc: BaseException) -> Optional[str]:
+    """
+    Классифицирует ошибку по цепочке причин, в том числе DatabaseError репозитория
+    :param exc: Исключение
+    :return: "serialization" | "deadlock" | "lock_timeout" | "connection" | None, если ошибка не временная
+    """
+    while exc is not None:
+        sqlstate = getattr(exc, "sqlstate", None)
+
+        if sqlstate in ROLLED_BACK:
+            return ROLLED_BACK[sqlstate]
+
+        if isinstance(sqlstate, str) and sqlstate.startswith(CONNECTION_SQLSTATES):
+            return "connection"
+
+        # SQLAlchemy помечает так ошибки, после которых соединение закрыто (сброс соединения, остановка сервера)
+        if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+            return "connection"
+
+        exc = exc.__cause__
+
+    return None
+
+
+class Attempt:
+    """Попытка единицы работы. Перед commit единица работы отмечает committing"""
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.committing = False
+
+
+class RetryPolicy:
+    """
+    Повтор с экспоненциальной задержкой и полным разбросом (full jitter): задержка выбирается случайно
+    от 0 до base_delay * 2 ** попытка, поэтому запросы, столкнувшиеся на одних строках, повторяются в разное время
+    """
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float) -> None:
+        """
+        :param attempts: Всего попыток, включая первую
+        :param base_delay: Верхняя граница задержки перед первым повтором в секундах
+        :param max_delay: Наибольшая задержка в секундах
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(
+        self,
+        work: Callable[[Attempt], Awaitable[T]],
+        operation: str,
+        idempotent: bool = False,
+    ) -> T:
+        """
+        Выполняет work и повторяет его после временных ошибок, пока есть попытки и не истек срок запроса
+        :param work: Единица работы, каждый вызов - новая транзакция
+        :param operation: Имя операции для метрик
+        :param idempotent: Повторное выполнение безопасно, даже если предыдущая попытка была зафиксирована.
+               Соединение, потерянное во время commit, не говорит, зафиксирована ли транзакция,
+               поэтому неидемпотентная запись после такой ошибки не повторяется
+        :return: Результат work
+        """
+        number = 0
+
+        while True:
+            attempt = Attempt(number)
+
+            try:
+                return await work(attempt)
+
+            except Exception as e:
+                reason = transient_reason(e)
+
+                if reason is None or (reason == "connection" and attempt.committing and not idempotent):
+                    raise
+
+                delay = self.backoff(number)
+                left = remaining()
+                number += 1
+
+                if number >= self.attempts or (left is not None and delay >= left):
+                    DB_RETRIES_EXHAUSTED.labels(operation=operation, reason=reason).inc()
+                    raise
+
+                DB_RETRIES.labels(operation=operation, reason=reason).inc()
+                await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def attempt_scope(request: Request) -> AsyncIterator[None]:
+    """
+    Попытка повторяемого запроса: контексты, вошедшие через attempt_scoped, закрываются при выходе из нее,
+    поэтому сессия неудачной попытки откатывается и возвращает соединение до начала следующей
+    :param request: Запрос
+    """
+    async with AsyncExitStack() as stack:
+        setattr(request.state, ATTEMPT_STACK, stack)
+
+        try:
+            yield
+
+        finally:
+            setattr(request.state, ATTEMPT_STACK, None)
+
+
+@asynccontextmanager
+async def attempt_scoped(request: Request, context: AsyncContextManager[T]) -> AsyncIterator[T]:
+    """
+    Входит в контекст зависимости на время текущей попытки запроса, а если запрос не повторяется -
+    на время самой зависимости
+    :param request: Запрос
+    :param context: Контекст, например единица работы сессии
+    :return: Значение контекста
+    """
+    stack: Optional[AsyncExitStack] = getattr(request.state, ATTEMPT_STACK, None)
+
+    if stack is None:
+        async with context as value:
+            yield value
+
+        return
+
+    yield await stack.enter_async_context(context)
+
+
+def retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        attempts=db_settings.retry_attempts,
+        base_delay=db_settings.retry_base_delay,
+        max_delay=db_settings.retry_max_delay,
+    )
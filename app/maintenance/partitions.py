@@ -0,0 +1,54 @@
+"""
+Обслуживание месячных секций orders и order_products, запускается по расписанию (cron, systemd timer):
+
+    python -m app.maintenance.partitions create --months-ahead 3
+    python -m app.maintenance.partitions detach --before 2024-01-01
+
+create создает секции на months-ahead месяцев вперед, строки вне созданных секций попадают в *_default.
+detach отсоединяет секции месяцев раньше before, они остаются отдельными таблицами (orders_p202312, ...),
+которые выгружаются в архив (pg_dump -t) и удаляются DROP TABLE без массового DELETE
+"""
+
+import argparse
+import asyncio
+from datetime import date
+
+from app.core.connector import db_connector
+from app.service import PartitionService
+
+
+async def run(args: argparse.Namespace) -> list[str]:
+    try:
+        if args.command == "create":
+            return await PartitionService.ensure_partitions(
+                connector=db_connector,
+                months_ahead=args.months_ahead,
+            )
+
+        return await PartitionService.detach_partitions(
+            before=args.before,
+            connector=db_connector,
+        )
+
+    finally:
+        await db_connector.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance.partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="create future monthly partitions")
+    create.add_argument("--months-ahead", type=int, default=3)
+
+    detach = commands.add_parser("detach", help="detach partitions older than a month")
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+
+    args = parser.parse_args()
+
+    for name in asyncio.run(run(args)):
+        print(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Пересчет дневных итогов продаж sales_daily и sales_daily_products из заказов (backfill):
+
+    python -m app.maintenance.sales rebuild --start 2024-01-01 --end 2024-12-31
+
+Итоги интервала удаляются и собираются заново помесячно, каждый месяц отдельной транзакцией.
+Нужен после загрузки исторических заказов, правки заказов вручную или изменения правил подсчета.
+Заказы из отсоединенных в архив секций не учитываются, поэтому интервал не должен захватывать архивные месяцы
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+
+from app.core.connector import db_connector
+from app.service import SalesService
+
+
+async def run(args: argparse.Namespace) -> list[tuple[date, date]]:
+    try:
+        return await SalesService.rebuild(dates=(args.start, args.end), connector=db_connector)
+
+    finally:
+        await db_connector.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance.sales")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild", help="rebuild daily sales rollups")
+    rebuild.add_argument("--start", type=date.fromisoformat, required=True)
+    rebuild.add_argument("--end", type=date.fromisoformat, default=datetime.now(timezone.utc).date())
+
+    args = parser.parse_args()
+
+    if args.start > args.end:
+        parser.error("--start must not be greater than --end")
+
+    for start, end in asyncio.run(run(args)):
+        print(f"{start} - {end}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ __all__ = [
     "CartProduct",
     "RefreshToken",
     "OrderProducts",
+    "SalesDaily",
+    "SalesDailyProduct",
 ]
 
 from app.models.base import Base
@@ -21,3 +23,4 @@ from app.models.profile import Profile
 from app.models.token import RefreshToken
 from app.models.cart_product import CartProduct
 from app.models.order_product import OrderProducts
+from app.models.sales import SalesDaily, SalesDailyProduct
@@ -4,7 +4,7 @@ from sqlalchemy import ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
 
 if TYPE_CHECKING:
     from app.models import User, CartProduct
@@ -13,10 +13,15 @@ if TYPE_CHECKING:
 class Cart(Base, TimestampMixin):
     __tablename__ = "carts"
 
+    __table_args__ = (
+        created_at_brin_index("carts"),
+    )
+
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
     )
 
     user: Mapped["User"] = relationship(
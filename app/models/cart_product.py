@@ -31,6 +31,7 @@ class CartProduct(Base, TimestampMixin):
         Integer,
         ForeignKey("products.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     quantity: Mapped[int] = mapped_column(
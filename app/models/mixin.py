@@ -1,9 +1,29 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, Integer, func
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
 
+# Страниц таблицы на один диапазон BRIN индекса. Значение по умолчанию (128 страниц, 1 МБ) слишком грубое:
+# таблица в несколько тысяч строк целиком попадает в один диапазон и индекс не отсекает ничего.
+# При 16 страницах индекс таблицы в миллион строк по-прежнему занимает единицы страниц
+BRIN_PAGES_PER_RANGE = 16
+
+def created_at_brin_index(table_name: str) -> Index:
+    """
+    Создает BRIN индекс по created_at для __table_args__ модели.
+    created_at заполняется только при вставке и растет вместе с физическим порядком строк,
+    поэтому компактного BRIN индекса (несколько страниц на всю таблицу) достаточно для выборок по интервалу дат
+    :param table_name: Название таблицы модели
+    :return: Индекс
+    """
+    return Index(
+        f"ix_{table_name}_created_at_brin",
+        "created_at",
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": BRIN_PAGES_PER_RANGE},
+    )
+
 
 class TimestampMixin:
 
@@ -12,7 +32,33 @@ class TimestampMixin:
         server_default=func.now(),
     )
 
+    # onupdate добавляет updated_at = now() в каждый UPDATE, выполняемый через ORM или update() без явного значения.
+    # Запросы INSERT ... ON CONFLICT DO UPDATE и сырой SQL должны выставлять updated_at сами
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
-    )
\ No newline at end of file
+        onupdate=func.now(),
+    )
+
+    # Номер версии строки для оптимистичной блокировки: SQLAlchemy увеличивает его при каждом UPDATE через ORM
+    # и добавляет в запрос условие WHERE version = <прочитанная версия>. Если строку успел изменить другой запрос,
+    # UPDATE не затрагивает ни одной строки и flush выбрасывает StaleDataError вместо молчаливой перезаписи
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default="1",
+    )
+
+    # Колонки, которые есть только в таблице и не отображаются на атрибуты модели
+    __table_only_columns__: tuple[str, ...] = ()
+
+    # eager_defaults: значения, вычисляемые в БД (id, created_at, updated_at), возвращаются тем же INSERT/UPDATE
+    # через RETURNING, поэтому после записи модель не нужно перечитывать отдельным SELECT.
+    # Колонки __table_only_columns__ исключены из модели, поэтому в RETURNING не попадают
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {
+            "version_id_col": cls.version,
+            "eager_defaults": True,
+            "exclude_properties": cls.__table_only_columns__,
+        }
\ No newline at end of file
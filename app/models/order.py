@@ -1,15 +1,21 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy import (
     String,
     Integer,
     CheckConstraint,
+    DateTime,
     ForeignKey,
+    Index,
+    func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
+from app.models.partition import add_default_partition
 
 
 if TYPE_CHECKING:
@@ -26,6 +32,25 @@ class Order(Base, TimestampMixin):
             "promo_code IS NULL OR char_length(promo_code) = 10",
             name="err_promo_code_length",
         ),
+        # Обслуживает историю заказов пользователя с keyset пагинацией от новых к старым
+        Index(
+            "ix_orders_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        created_at_brin_index("orders"),
+        # Таблица секционирована по месяцам, секции создает и отсоединяет app.maintenance.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Первичный ключ секционированной таблицы обязан включать ключ секционирования: (id, created_at).
+    # sort_order ставит колонку после id, порядок колонок задает порядок в индексе первичного ключа
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        primary_key=True,
+        sort_order=1,
     )
 
     user_id: Mapped[int] = mapped_column(
@@ -36,7 +61,6 @@ class Order(Base, TimestampMixin):
 
     promo_code: Mapped[str | None] = mapped_column(
         String(10),
-        unique=True,
         nullable=True,
     )
 
@@ -77,3 +101,6 @@ class Order(Base, TimestampMixin):
         cascade="all, delete-orphan",
         uselist=True,
     )
+
+
+add_default_partition(Order.__table__)
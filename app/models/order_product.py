@@ -1,10 +1,20 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, UniqueConstraint, Integer, String
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    ForeignKeyConstraint,
+    UniqueConstraint,
+    Integer,
+    String,
+    func,
+)
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
 from app.models.mixin import TimestampMixin
+from app.models.partition import add_default_partition
 
 
 if TYPE_CHECKING:
@@ -22,20 +32,39 @@ class OrderProducts(Base, TimestampMixin):
         UniqueConstraint(
             "order_id",
             "product_id",
+            "created_at",
             name="idx_unique_order_product",
         ),
+        # Внешний ключ на секционированную таблицу ссылается на ее первичный ключ целиком
+        ForeignKeyConstraint(
+            ["order_id", "created_at"],
+            ["orders.id", "orders.created_at"],
+            ondelete="CASCADE",
+        ),
+        # Секционирована по тем же месяцам, что и orders, поэтому секции заказов и их позиций
+        # отсоединяются в архив парами без DELETE
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
     # Описание мета информации таблицы
     order_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey("orders.id", ondelete="CASCADE"),
         nullable=False,
     )
 
+    # Не время добавления позиции, а created_at ее заказа: ORM копирует его через внешний ключ вместе с order_id
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        primary_key=True,
+        sort_order=1,
+    )
+
     product_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("products.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     quantity: Mapped[int] = mapped_column(
         Integer,
@@ -58,6 +87,9 @@ class OrderProducts(Base, TimestampMixin):
     )
 
 
+add_default_partition(OrderProducts.__table__)
+
+
 # UniqueConstraint Гарантирует что order_id и product_id в таблице в одной строке будут уникальны,
 # другими словами в одном заказе не может быть одинаковых продуктов, добавленных разными строками,
 # будет только одна позиция одного товара, но количество его может быть любым.
@@ -0,0 +1,60 @@
+import re
+from datetime import date
+
+from sqlalchemy import DDL, Table, event
+
+
+# Таблицы, секционированные по месяцам created_at. Порядок важен: order_products ссылается на orders,
+# поэтому секции создаются в прямом порядке, а отсоединяются в обратном
+PARTITIONED_TABLES = ("orders", "order_products")
+
+# Имена секций: orders_p202610 - месяц, orders_default - секция для строк вне созданных месяцев
+PARTITION_NAME_PATTERN = re.compile(
+    rf"^({'|'.join(PARTITIONED_TABLES)})_(p\d{{6}}|default)$"
+)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """
+    Возвращает имя месячной секции таблицы
+    :param table_name: Название секционированной таблицы
+    :param month: Любая дата месяца секции
+    :return: Имя секции
+    """
+    return f"{table_name}_p{month:%Y%m}"
+
+
+def default_partition_name(table_name: str) -> str:
+    """
+    Возвращает имя секции по умолчанию
+    :param table_name: Название секционированной таблицы
+    :return: Имя секции
+    """
+    return f"{table_name}_default"
+
+
+def is_partition_name(name: str) -> bool:
+    """
+    Проверяет, является ли таблица секцией (в том числе отсоединенной в архив).
+    Секции не описаны в моделях, поэтому autogenerate alembic должен их пропускать
+    :param name: Название таблицы
+    :return: True, если это секция
+    """
+    return PARTITION_NAME_PATTERN.match(name) is not None
+
+
+def add_default_partition(table: Table) -> None:
+    """
+    Создает вместе с таблицей секцию по умолчанию, чтобы Base.metadata.create_all давал рабочую схему.
+    Месячные секции создает app.maintenance.partitions
+    :param table: Секционированная таблица
+    :return: None
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE {default_partition_name(table.name)} "
+            f"PARTITION OF {table.name} DEFAULT"
+        ).execute_if(dialect="postgresql"),
+    )
@@ -1,25 +1,48 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
 
 
 if TYPE_CHECKING:
     from app.models import User
 
 
+# Конфигурация полнотекстового поиска: без стемминга и стоп-слов, посты пишутся на разных языках
+SEARCH_CONFIG = "simple"
+
+
 class Post(Base, TimestampMixin):
     """Класс, описывающий мета информацию таблицы Post"""
 
     __tablename__ = "posts"
 
+    __table_only_columns__ = ("search_vector",)
+
+    __table_args__ = (
+        # Обслуживает ленту постов с keyset пагинацией от новых к старым
+        Index(
+            "ix_posts_created_at_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        created_at_brin_index("posts"),
+        Index(
+            "ix_posts_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
+
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     title: Mapped[str] = mapped_column(
@@ -32,6 +55,19 @@ class Post(Base, TimestampMixin):
         nullable=False,
     )
 
+    # Вычисляется БД при вставке и изменении title или body, GIN индекс обновляется вместе со строкой.
+    # Вектор нужен только условию поиска, поэтому колонка не отображается на атрибут модели
+    # и не возвращается RETURNING при записи поста, в запросах используется Post.__table__.c.search_vector
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', body), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    )
+
     user: Mapped["User"] = relationship(
         back_populates="posts",
         lazy="select",
@@ -4,7 +4,7 @@ from sqlalchemy import String, Text, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
 
 
 if TYPE_CHECKING:
@@ -16,6 +16,10 @@ class Product(Base, TimestampMixin):
 
     __tablename__ = "products"
 
+    __table_args__ = (
+        created_at_brin_index("products"),
+    )
+
     name: Mapped[str] = mapped_column(
         String(255),
         nullable=False,
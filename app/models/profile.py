@@ -4,7 +4,7 @@ from sqlalchemy import String, Integer, ForeignKey, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
 
 
 if TYPE_CHECKING:
@@ -16,10 +16,15 @@ class Profile(Base, TimestampMixin):
 
     __tablename__ = "profiles"
 
+    __table_args__ = (
+        created_at_brin_index("profiles"),
+    )
+
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     name: Mapped[str] = mapped_column(
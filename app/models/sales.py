@@ -0,0 +1,94 @@
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import Base
+
+if TYPE_CHECKING:
+    from app.models import Product
+
+
+class SalesDaily(Base):
+    """Класс, описывающий мета информацию таблицы SalesDaily.
+    Дневной итог продаж (день по UTC), пополняется при создании заказа и пересчитывается app.maintenance.sales
+    """
+
+    __tablename__ = "sales_daily"
+
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            name="idx_unique_sales_day",
+        ),
+    )
+
+    day: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+
+    orders_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    revenue: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+    units: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+
+class SalesDailyProduct(Base):
+    """Класс, описывающий мета информацию таблицы SalesDailyProduct.
+    Дневной итог продаж одного продукта, выручка считается по цене позиции в заказе
+    """
+
+    __tablename__ = "sales_daily_products"
+
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "product_id",
+            name="idx_unique_sales_day_product",
+        ),
+    )
+
+    day: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+
+    product_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    orders_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    revenue: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+    units: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+
+    product: Mapped["Product"] = relationship(lazy="select")
+
+
+# UniqueConstraint по дню (и продукту) является целью для INSERT ... ON CONFLICT DO UPDATE,
+# которым заказ прибавляется к итогам своего дня, и обслуживает выборки отчетов по интервалу дней
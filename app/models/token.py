@@ -1,34 +1,55 @@
-from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Text, ForeignKey, DateTime
+from sqlalchemy import ForeignKey, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 from app.models.mixin import TimestampMixin
+from app.tools.types import DEFAULT_DEVICE_ID
 
 if TYPE_CHECKING:
     from app.models import User
 
 
 class RefreshToken(Base, TimestampMixin):
+    """Класс, описывающий мета информацию таблицы RefreshToken.
+    Хранит не сам токен, а его SHA-256 хэш фиксированной длины, по одной записи на устройство пользователя
+    """
 
     __tablename__ = "refresh_tokens"
 
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "device_id",
+            name="idx_unique_user_device",
+        ),
+    )
+
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
-    token: Mapped[str] = mapped_column(
-        Text,
+    device_id: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        default=DEFAULT_DEVICE_ID,
+        server_default=DEFAULT_DEVICE_ID,
+    )
+
+    token_hash: Mapped[bytes] = mapped_column(
+        LargeBinary(32),
         nullable=False,
         unique=True,
     )
 
     user: Mapped["User"] = relationship(
-        back_populates="refresh_token",
+        back_populates="refresh_tokens",
         lazy="select",
         uselist=False,
     )
+
+
+# UniqueConstraint по (user_id, device_id) является целью для INSERT ... ON CONFLICT,
+# благодаря ему ротация токена выполняется одним запросом, а его ведущая колонка user_id заменяет отдельный индекс
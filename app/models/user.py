@@ -1,11 +1,10 @@
 from typing import TYPE_CHECKING
 
-from pydantic import EmailStr
 from sqlalchemy import Boolean, Enum, String, true, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
-from app.models.mixin import TimestampMixin
+from app.models.mixin import TimestampMixin, created_at_brin_index
 from app.tools.types import UserRole
 
 if TYPE_CHECKING:
@@ -17,7 +16,11 @@ class User(Base, TimestampMixin):
 
     __tablename__ = "users"
 
-    login: Mapped[EmailStr] = mapped_column(
+    __table_args__ = (
+        created_at_brin_index("users"),
+    )
+
+    login: Mapped[str] = mapped_column(
         String,
         nullable=False,
         unique=True,
@@ -70,9 +73,9 @@ class User(Base, TimestampMixin):
         uselist=False,
     )
 
-    refresh_token: Mapped["RefreshToken"] = relationship(
+    refresh_tokens: Mapped[list["RefreshToken"]] = relationship(
         back_populates="user",
-        cascade="all, delete",
+        cascade="all, delete-orphan",
         lazy="select",
-        uselist=False,
+        uselist=True,
     )
\ No newline at end of file
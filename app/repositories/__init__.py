@@ -6,6 +6,8 @@ __all__ = [
     "PostRepo",
     "OrderRepo",
     "TokenRepo",
+    "PartitionRepo",
+    "SalesRepo",
 ]
 
 from .base import BaseRepo
@@ -15,3 +17,5 @@ from .profile import ProfileRepo
 from .user import UserRepo
 from .order import OrderRepo
 from .token import TokenRepo
+from .partition import PartitionRepo
+from .sales import SalesRepo
@@ -1,23 +1,30 @@
 from datetime import datetime
 from typing import Optional, Type, Generic, cast
 
-from sqlalchemy import select, text, delete, Table
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, text, delete, tuple_, Table
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.interface import ARepo
-from app.tools.exeptions import DatabaseError
+from app.tools.exeptions import ConflictError, DatabaseError
 from app.tools.types import DBModel
 
 
 # DBModel - будет подставляться конкретная ORM модель, наследуемая от Base напрямую или через других предков
 # PDScheme - будет подставляться конкретная Pydantic схема, наследуемая от BaseModel напрямую или через других предков
 
+# Моделей в одном DELETE ... WHERE pk IN (...) при удалении списка моделей
+DELETE_BATCH_SIZE = 1000
+
 
 class BaseRepo(Generic[DBModel], ARepo):
     """
     Базовый CRUD.
     model должен быть определён в наследнике.
+    Методы не фиксируют транзакцию: изменения отправляются в БД через flush,
+    commit или откат выполняет единица работы вызывающего (db_connector.unit_of_work)
     """
 
     # Optional нужен для типовой корректности и работы статического анализа
@@ -172,15 +179,12 @@ class BaseRepo(Generic[DBModel], ARepo):
         """
         try:
             session.add(model)
-            await session.commit()
-            await session.refresh(
-                model
-            )  # После commit SQLAlchemy не всегда подгружает свежие данные из базы (например, если БД автоматически меняет created_at или триггеры что-то обновляют).
-            # refresh гарантирует, что User_model содержит актуальное состояние из базы.
+            # Значения по умолчанию из БД (id, created_at, updated_at) приходят в RETURNING этого же INSERT
+            # (eager_defaults в TimestampMixin), отдельный refresh не нужен
+            await session.flush()
             return model
 
         except SQLAlchemyError as e:
-            await session.rollback()
             raise DatabaseError(f"Error when adding {cls.model.__name__}") from e
 
     @classmethod
@@ -189,6 +193,7 @@ class BaseRepo(Generic[DBModel], ARepo):
         new_data: dict,
         update_model: DBModel,
         session: AsyncSession,
+        version: Optional[int] = None,
     ) -> DBModel:
         """
         Обновляет данные модели пользователя в БД полностью или частично
@@ -201,21 +206,57 @@ class BaseRepo(Generic[DBModel], ARepo):
                по умолчанию partial = False, то есть заменяются все данные объекта в БД, если partial = True,
                то заменятся только переданные данные объекта. То есть если переданы не все поля объекта UserInput,
                то заменить в базе только переданные, не переданные пропустить
+        :param version: Версия модели, которую видел клиент. UPDATE выполняется с условием WHERE version = <версия>,
+               поэтому изменение, сделанное другим запросом после чтения модели, не перезаписывается
         :return: Модель пользователя, обновленную в БД
+        :raises ConflictError: Модель изменена или удалена другим запросом, в ошибке текущее состояние модели
         """
+        if version is not None and version != update_model.version:
+            raise ConflictError(
+                f"{cls.model.__name__} version {version} is outdated",
+                current=update_model,
+            )
+
         try:
             for key, value in new_data.items():
                 if value is not None:
                     setattr(update_model, key, value)
 
-            await session.commit()
-            await session.refresh(update_model)
+            # Новое updated_at приходит в RETURNING этого же UPDATE
+            await session.flush()
             return update_model
 
-        except SQLAlchemyError as e:
+        except StaleDataError as e:
+            # После неудачного flush сессия непригодна до отката, запрос все равно завершается ошибкой 409
             await session.rollback()
+            raise ConflictError(
+                f"{cls.model.__name__} was changed by another request",
+                current=await cls._reload(update_model, session),
+            ) from e
+
+        except SQLAlchemyError as e:
             raise DatabaseError(f"Error when updating {cls.model.__name__}") from e
 
+    @classmethod
+    async def _reload(
+        cls,
+        model: DBModel,
+        session: AsyncSession,
+    ) -> Optional[DBModel]:
+        """
+        Перечитывает модель из БД после конфликта версий
+        :param model: ORM Модель с устаревшими данными
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель в текущем состоянии или None, если строка удалена
+        """
+        try:
+            await session.refresh(model)
+            return model
+
+        except InvalidRequestError:
+            # refresh не находит строку, удаленную другим запросом
+            return None
+
     @classmethod
     async def delete(
         cls,
@@ -230,11 +271,10 @@ class BaseRepo(Generic[DBModel], ARepo):
         """
         try:
             await session.delete(del_model)
-            await session.commit()
+            await session.flush()
             return del_model
 
         except SQLAlchemyError as e:
-            await session.rollback()
             raise DatabaseError(f"Error when deleting {cls.model.__name__}") from e
 
     @classmethod
@@ -244,20 +284,37 @@ class BaseRepo(Generic[DBModel], ARepo):
         session: AsyncSession,
     ) -> list:
         """
-
-        :param user_id:
-        :param post_in:
-        :param session:
-        :return:
+        Удаляет модели по первичному ключу запросами DELETE ... WHERE pk IN (...), а не session.delete для каждой модели:
+        session.delete загружает каскадные связи каждой модели отдельным запросом.
+        Зависимые строки удаляет БД по ON DELETE CASCADE внешних ключей
+        :param list_models: Список ORM моделей для удаления
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Пустой список
         """
+        primary_key = sa_inspect(cls.model).primary_key
+        identities = [sa_inspect(model).identity for model in list_models]
+
         try:
+            # Размер пачки держит число параметров запроса ниже предела драйвера
+            for start in range(0, len(identities), DELETE_BATCH_SIZE):
+                batch = identities[start:start + DELETE_BATCH_SIZE]
+
+                if len(primary_key) == 1:
+                    condition = primary_key[0].in_([identity[0] for identity in batch])
+                else:
+                    condition = tuple_(*primary_key).in_(batch)
+
+                await session.execute(
+                    delete(cls.model).where(condition),
+                    execution_options={"synchronize_session": False},
+                )
+
             for model in list_models:
-                await session.delete(model)
-            await session.commit()
+                session.expunge(model)
+
             return []
 
         except SQLAlchemyError as e:
-            await session.rollback()
             raise DatabaseError(f"Error when deleting list {cls.model.__name__}") from e
 
     @classmethod
@@ -280,11 +337,9 @@ class BaseRepo(Generic[DBModel], ARepo):
         try:
             await session.execute(delete(cls.model))
             await session.execute(text(f'ALTER SEQUENCE "{seq_name}" RESTART WITH 1'))
-            await session.commit()
             return []
 
         except SQLAlchemyError as e:
-            await session.rollback()
             raise DatabaseError(
                 f"Error when clearing table {cls.model.__name__}"
             ) from e
@@ -1,6 +1,7 @@
 from typing import Optional
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -62,7 +63,7 @@ class CartRepo(BaseRepo[Cart_model]):
         try:
             stmt = (
                 select(cls.model)
-                .where(cls.model.created_at.between(**dates))
+                .where(cls.model.created_at.between(*dates))
                 .options(
                     selectinload(cls.model.products)
                     .selectinload(Cart_Product_model.product)
@@ -157,6 +158,24 @@ class CartRepo(BaseRepo[Cart_model]):
             raise DatabaseError(f"Error when receiving {cls.model.__name__}") from e
 
 
+    @classmethod
+    def _expire_products(
+        cls,
+        cart_model: Cart_model,
+        session: AsyncSession,
+    ) -> None:
+        """
+        Помечает устаревшими позиции корзины, измененные запросом в обход ORM,
+        следующий запрос корзины с selectinload перечитывает их из БД
+        :param cart_model: ORM модель корзины
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
+        """
+        for assoc in cart_model.products:
+            session.expire(assoc)
+
+        session.expire(cart_model, ["products"])
+
     @classmethod
     async def add_product(
         cls,
@@ -164,25 +183,34 @@ class CartRepo(BaseRepo[Cart_model]):
         product_model: Product_model,
         cart_model: Cart_model,
         session: AsyncSession,
-    ) -> Cart_Product_model:
+    ) -> None:
         """
-
-        :param quantity:
-        :param product_in:
-        :param cart_in:
-        :param session:
-        :return:
+        Добавляет продукт в корзину одним INSERT ... ON CONFLICT DO UPDATE: если тот же продукт параллельно
+        добавил другой запрос, количество увеличивается в БД вместо ошибки уникальности idx_unique_cart_product
+        :param quantity: Количество продукта
+        :param product_model: ORM модель продукта
+        :param cart_model: ORM модель корзины
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
         """
         try:
-            assoc = Cart_Product_model(
+            stmt = insert(Cart_Product_model).values(
                 cart_id=cart_model.id,
                 product_id=product_model.id,
                 quantity=quantity,
                 current_price=product_model.price,
             )
+            stmt = stmt.on_conflict_do_update(
+                constraint="idx_unique_cart_product",
+                set_={
+                    "quantity": Cart_Product_model.quantity + stmt.excluded.quantity,
+                    "updated_at": func.now(),
+                    "version": Cart_Product_model.version + 1,
+                },
+            )
 
-            session.add(assoc)
-            await session.commit()
+            await session.execute(stmt)
+            cls._expire_products(cart_model=cart_model, session=session)
 
         except SQLAlchemyError as e:
             raise DatabaseError(f"Error adding product in {cls.model.__name__}") from e
@@ -195,19 +223,30 @@ class CartRepo(BaseRepo[Cart_model]):
         session: AsyncSession,
     ) -> None:
         """
-
-        :param product_scheme:
-        :param cart_in:
-        :param session:
-        :return:
+        Увеличивает количество продукта в корзине на стороне БД: UPDATE ... SET quantity = quantity + :n.
+        Прочитанное ранее количество не используется, поэтому параллельные изменения одной корзины
+        из разных вкладок складываются, а строка блокируется только на время одного UPDATE
+        :param product_scheme: Pydantic схема с id продукта и количеством, на которое оно увеличивается
+        :param cart_model: ORM модель корзины
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
         """
         try:
-            for assoc in cart_model.products:
-                if assoc.product_id == product_scheme.product_id:
-                    assoc.quantity += product_scheme.quantity
-
-            await session.commit()
+            stmt = (
+                update(Cart_Product_model)
+                .where(
+                    Cart_Product_model.cart_id == cart_model.id,
+                    Cart_Product_model.product_id == product_scheme.product_id,
+                )
+                .values(
+                    quantity=Cart_Product_model.quantity + product_scheme.quantity,
+                    version=Cart_Product_model.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
 
+            await session.execute(stmt)
+            cls._expire_products(cart_model=cart_model, session=session)
 
         except SQLAlchemyError as e:
             raise DatabaseError(
@@ -222,18 +261,23 @@ class CartRepo(BaseRepo[Cart_model]):
         session: AsyncSession,
     ) -> None:
         """
-
-        :param product_id:
-        :param cart_in:
-        :param session:
-        :return:
+        Удаляет продукт из корзины по cart_id и product_id, без сравнения версии позиции:
+        удаление не зависит от количества, которое могли изменить параллельные запросы
+        :param product_id: id продукта
+        :param cart_model: ORM модель корзины
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
         """
         try:
-            for assoc in cart_model.products:
-                if assoc.product_id == product_id:
-                    await session.delete(assoc)
-
-            await session.commit()
+            await session.execute(
+                delete(Cart_Product_model)
+                .where(
+                    Cart_Product_model.cart_id == cart_model.id,
+                    Cart_Product_model.product_id == product_id,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            cls._expire_products(cart_model=cart_model, session=session)
 
         except SQLAlchemyError as e:
             raise DatabaseError(
@@ -251,10 +295,12 @@ class CartRepo(BaseRepo[Cart_model]):
         но сохраняя саму корзину.
         """
         try:
-            for assoc in cart_model.products:
-                await session.delete(assoc)
-
-            await session.commit()
+            await session.execute(
+                delete(Cart_Product_model)
+                .where(Cart_Product_model.cart_id == cart_model.id)
+                .execution_options(synchronize_session=False)
+            )
+            cls._expire_products(cart_model=cart_model, session=session)
 
         except SQLAlchemyError as e:
             raise DatabaseError(f"Error clearing cart in {cls.model.__name__}") from e
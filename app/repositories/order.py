@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import selectinload, raiseload
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,7 +16,7 @@ from app.tools import DatabaseError
 
 class OrderRepo(BaseRepo[Order_model]):
 
-    model: Order_model
+    model = Order_model
 
     @classmethod
     async def get_all_orders(
@@ -79,6 +79,45 @@ class OrderRepo(BaseRepo[Order_model]):
             ) from e
 
 
+    @classmethod
+    async def get_order_summaries_by_user_id(
+        cls,
+        user_id: int,
+        limit: int,
+        session: AsyncSession,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[Order_model]:
+        """
+        Возвращает страницу заказов пользователя без позиций заказа, от новых к старым.
+        Keyset пагинация по (created_at, id) обслуживается индексом (user_id, created_at DESC, id DESC)
+        :param user_id: id пользователя
+        :param limit: Максимальное количество заказов на странице
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param after: (created_at, id) последнего заказа предыдущей страницы
+        :return: Список заказов без загруженных позиций
+        """
+        try:
+            stmt = (
+                select(cls.model)
+                .where(cls.model.user_id == user_id)
+                .options(raiseload("*"))
+                .order_by(cls.model.created_at.desc(), cls.model.id.desc())
+                .limit(limit)
+            )
+
+            if after is not None:
+                stmt = stmt.where(
+                    tuple_(cls.model.created_at, cls.model.id) < tuple_(*after)
+                )
+
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when receiving {cls.model.__name__} summary list"
+            ) from e
+
     @classmethod
     async def get_orders_by_date(
         cls,
@@ -161,6 +200,49 @@ class OrderRepo(BaseRepo[Order_model]):
         except SQLAlchemyError as e:
             raise DatabaseError(f"Error when receiving {cls.model.__name__}") from e
 
+    @classmethod
+    async def _reload(
+        cls,
+        model: Order_model,
+        session: AsyncSession,
+    ) -> Optional[Order_model]:
+        """
+        Перечитывает заказ после конфликта версий вместе с позициями: после отката они выгружены,
+        а ответ 409 содержит заказ целиком
+        :param model: ORM Модель с устаревшими данными
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Заказ в текущем состоянии или None, если он удален
+        """
+        current = await super()._reload(model, session)
+
+        if current is None:
+            return None
+
+        return await cls.get_by_order_id(order_id=current.id, session=session)
+
+    @classmethod
+    async def get_by_id(
+        cls,
+        model_id: int,
+        session: AsyncSession,
+    ) -> Optional[Order_model]:
+        """
+        Возвращает заказ по id без позиций заказа.
+        Первичный ключ секционированной таблицы составной (id, created_at), поэтому session.get по одному id не подходит
+        :param model_id: id заказа
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель заказа | None
+        """
+        try:
+            stmt = select(cls.model).where(cls.model.id == model_id)
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when receiving {cls.model.__name__} by id"
+            ) from e
+
     @classmethod
     async def create_order(
         cls,
@@ -182,14 +264,15 @@ class OrderRepo(BaseRepo[Order_model]):
                 user_id=user_id,
                 comment=comment,
                 promo_code=promo_code,
+                original_price=total_price,
                 total_price=total_price,
                 total_quantity=total_quantity,
             )
 
             session.add(order_model)
 
+            # id и created_at приходят в RETURNING этого же INSERT
             await session.flush()
-            await session.refresh(order_model)
 
             return order_model
 
@@ -214,16 +297,19 @@ class OrderRepo(BaseRepo[Order_model]):
         """
 
         try:
-            for cart_product in cart_model.products:
-
-                order_product = OrderProducts_model(
+            session.add_all(
+                OrderProducts_model(
                     order_id=order_model.id,
+                    created_at=order_model.created_at,
                     product_id=cart_product.product_id,
                     quantity=cart_product.quantity,
                     current_price=cart_product.current_price,
                 )
+                for cart_product in cart_model.products
+            )
 
-                session.add(order_product)
+            # Позиции отправляются одним INSERT, чтобы перечитывание заказа в той же транзакции их видело
+            await session.flush()
 
         except SQLAlchemyError as e:
             raise DatabaseError(
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.partition import PARTITIONED_TABLES, default_partition_name, is_partition_name
+from app.tools.exeptions import DatabaseError
+
+
+class PartitionRepo:
+    """
+    DDL операции над секциями таблиц, секционированных по месяцам (app.models.partition.PARTITIONED_TABLES).
+    Имена таблиц и границы секций не передаются параметрами запроса, поэтому подставляются в текст DDL
+    только после проверки имени секции
+    """
+
+    @classmethod
+    async def get_partitions(
+        cls,
+        table_name: str,
+        session: AsyncSession,
+    ) -> list[str]:
+        """
+        Возвращает имена секций, присоединенных к таблице
+        :param table_name: Название секционированной таблицы
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список имен секций
+        """
+        try:
+            result = await session.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = CAST(:table_name AS regclass) "
+                    "ORDER BY child.relname"
+                ),
+                {"table_name": table_name},
+            )
+            return list(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error when receiving partitions of {table_name}") from e
+
+    @classmethod
+    async def create_partitions(
+        cls,
+        partitions: list[tuple[str, str, datetime, datetime]],
+        session: AsyncSession,
+    ) -> list[str]:
+        """
+        Создает секции одного месяца, все изменения в транзакции сессии (commit выполняет вызывающий).
+        PostgreSQL не создает секцию, если в секции по умолчанию уже есть строки ее диапазона (задание секций
+        запоздало), поэтому такие строки переносятся: удаляются из секции по умолчанию во временную таблицу
+        и после создания секции вставляются обратно, попадая уже в нее. Секции по умолчанию блокируются
+        до конца транзакции, новые строки месяца ждут commit и попадают в созданную секцию
+        :param partitions: Список (таблица, имя секции, начало диапазона, конец диапазона не включительно)
+               в порядке PARTITIONED_TABLES
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список имен секций
+        """
+        try:
+            for table_name, name, _, _ in partitions:
+                cls._check_name(table_name, name)
+                await session.execute(
+                    text(f"LOCK TABLE {default_partition_name(table_name)} IN ACCESS EXCLUSIVE MODE")
+                )
+
+            # Позиции ссылаются на заказы, поэтому удаляются из секции по умолчанию раньше заказов,
+            # а вставляются после них
+            for table_name, name, start, end in reversed(partitions):
+                default = default_partition_name(table_name)
+                bounds = {"start": start, "end": end}
+
+                await session.execute(
+                    text(
+                        f"CREATE TEMPORARY TABLE moved_{name} ON COMMIT DROP AS "
+                        f"SELECT * FROM {default} WHERE created_at >= :start AND created_at < :end"
+                    ),
+                    bounds,
+                )
+                await session.execute(
+                    text(f"DELETE FROM {default} WHERE created_at >= :start AND created_at < :end"),
+                    bounds,
+                )
+
+            for table_name, name, start, end in partitions:
+                await session.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF {table_name} "
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                    )
+                )
+                await session.execute(
+                    text(f"INSERT INTO {table_name} SELECT * FROM moved_{name}")
+                )
+
+            return [name for _, name, _, _ in partitions]
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when creating partitions {', '.join(name for _, name, _, _ in partitions)}"
+            ) from e
+
+    @classmethod
+    async def detach_partitions(
+        cls,
+        partitions: list[tuple[str, str]],
+        session: AsyncSession,
+    ) -> list[str]:
+        """
+        Отсоединяет секции и снимает с них внешние ключи в транзакции сессии (commit выполняет вызывающий).
+        Отсоединенная секция остается обычной таблицей с тем же именем: ее можно выгрузить (pg_dump -t) и удалить.
+        Внешние ключи снимаются, потому что архив не должен блокировать отсоединение секций заказов
+        и удаление пользователей и продуктов
+        :param partitions: Список (таблица, имя секции), ссылающиеся таблицы должны идти раньше
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список имен отсоединенных секций
+        """
+        try:
+            for table_name, name in partitions:
+                cls._check_name(table_name, name)
+                await session.execute(
+                    text(f"ALTER TABLE {table_name} DETACH PARTITION {name}")
+                )
+
+                result = await session.execute(
+                    text(
+                        "SELECT conname FROM pg_constraint "
+                        "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+                    ),
+                    {"name": name},
+                )
+                for constraint in result.scalars().all():
+                    await session.execute(
+                        text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+                    )
+
+            return [name for _, name in partitions]
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when detaching partitions") from e
+
+    @staticmethod
+    def _check_name(table_name: str, name: str) -> None:
+        if table_name not in PARTITIONED_TABLES or not (
+            is_partition_name(name) and name.startswith(f"{table_name}_")
+        ):
+            raise DatabaseError(f"Invalid partition name {name!r}")
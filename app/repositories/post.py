@@ -1,8 +1,122 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Row, func, select, tuple_
+from sqlalchemy.orm import raiseload
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.repositories import BaseRepo
 from app.models import Post as Post_model
+from app.models.post import SEARCH_CONFIG
+from app.tools.exeptions import DatabaseError
+
+
+# Параметры фрагментов с подсвеченными совпадениями, которые возвращает ts_headline
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5, FragmentDelimiter= ... "
 
 
 class PostRepo(BaseRepo[Post_model]):
 
     model = Post_model
 
+    @classmethod
+    async def get_feed(
+        cls,
+        limit: int,
+        session: AsyncSession,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[Post_model]:
+        """
+        Возвращает страницу ленты постов всех пользователей, от новых к старым.
+        Keyset пагинация по (created_at, id) обслуживается индексом (created_at DESC, id DESC)
+        :param limit: Максимальное количество постов на странице
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param after: (created_at, id) последнего поста предыдущей страницы
+        :return: Список постов
+        """
+        try:
+            stmt = (
+                select(cls.model)
+                .options(raiseload("*"))
+                .order_by(cls.model.created_at.desc(), cls.model.id.desc())
+                .limit(limit)
+            )
+
+            if after is not None:
+                stmt = stmt.where(
+                    tuple_(cls.model.created_at, cls.model.id) < tuple_(*after)
+                )
+
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when receiving {cls.model.__name__} feed"
+            ) from e
+
+    @classmethod
+    async def search(
+        cls,
+        query: str,
+        limit: int,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        dates: tuple[Optional[datetime], Optional[datetime]] = (None, None),
+        after: Optional[tuple[float, int]] = None,
+    ) -> list[Row]:
+        """
+        Возвращает страницу результатов полнотекстового поиска по заголовку и тексту постов, от более релевантных к менее.
+        Совпадения находятся по GIN индексу search_vector, ранг считается по сохраненному вектору.
+        Фрагменты ts_headline строятся во внешнем запросе только для постов страницы, а не для всех совпадений
+        :param query: Строка поиска в синтаксисе websearch_to_tsquery: слова, "фраза", or, -исключение
+        :param limit: Максимальное количество постов на странице
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: Искать только среди постов пользователя
+        :param dates: Начало и конец интервала даты создания поста, любая граница может быть None
+        :param after: (rank, id) последнего поста предыдущей страницы
+        :return: Список строк (Post, rank, headline)
+        """
+        try:
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            rank = func.ts_rank_cd(cls.model.__table__.c.search_vector, tsquery)
+            date_start, date_end = dates
+
+            ranked = (
+                select(cls.model.id, rank.label("rank"))
+                .where(cls.model.__table__.c.search_vector.bool_op("@@")(tsquery))
+                .order_by(rank.desc(), cls.model.id.desc())
+                .limit(limit)
+            )
+
+            if user_id is not None:
+                ranked = ranked.where(cls.model.user_id == user_id)
+
+            if date_start is not None:
+                ranked = ranked.where(cls.model.created_at >= date_start)
+
+            if date_end is not None:
+                ranked = ranked.where(cls.model.created_at < date_end)
+
+            if after is not None:
+                ranked = ranked.where(tuple_(rank, cls.model.id) < tuple_(*after))
+
+            ranked = ranked.subquery("ranked")
+
+            stmt = (
+                select(
+                    cls.model,
+                    ranked.c.rank,
+                    func.ts_headline(SEARCH_CONFIG, cls.model.body, tsquery, HEADLINE_OPTIONS).label("headline"),
+                )
+                .join(ranked, ranked.c.id == cls.model.id)
+                .options(raiseload("*"))
+                .order_by(ranked.c.rank.desc(), cls.model.id.desc())
+            )
+            result = await session.execute(stmt)
+            return list(result.all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when searching {cls.model.__name__}"
+            ) from e
@@ -0,0 +1,369 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, Integer, RowMapping, and_, any_, cast, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Order as Order_model,
+    OrderProducts as OrderProducts_model,
+    SalesDaily as SalesDaily_model,
+    SalesDailyProduct as SalesDailyProduct_model,
+)
+from app.tools import DatabaseError, SalesPeriod
+
+
+def utc_day(column):
+    """
+    Выражение дня по UTC для колонки created_at, дни итогов не зависят от часового пояса сессии
+    :param column: Колонка timestamptz
+    :return: SQL выражение типа date
+    """
+    return cast(func.timezone("UTC", column), Date)
+
+
+class SalesRepo:
+    """
+    Дневные итоги продаж sales_daily и sales_daily_products.
+    Отчеты читают только итоги, заказы и их позиции при построении отчета не загружаются
+    """
+
+    @classmethod
+    async def record_order(
+        cls,
+        order_model: Order_model,
+        session: AsyncSession,
+    ) -> None:
+        """
+        Прибавляет заказ к итогам его дня в той же транзакции, в которой создается заказ (commit выполняет вызывающий).
+        Строка итогов дня общая для всех заказов дня и остается заблокированной до commit, поэтому вызывается
+        последним запросом транзакции. Строки итогов продуктов блокируются в порядке product_id,
+        чтобы параллельные заказы не взаимоблокировались
+        :param order_model: Созданный заказ с загруженными позициями
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
+        """
+        day = order_model.created_at.astimezone(timezone.utc).date()
+
+        try:
+            stmt = insert(SalesDaily_model).values(
+                day=day,
+                orders_count=1,
+                revenue=order_model.total_price,
+                units=order_model.total_quantity,
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[SalesDaily_model.day],
+                    set_={
+                        "orders_count": SalesDaily_model.orders_count + 1,
+                        "revenue": SalesDaily_model.revenue + stmt.excluded.revenue,
+                        "units": SalesDaily_model.units + stmt.excluded.units,
+                    },
+                )
+            )
+
+            lines = sorted(order_model.products, key=lambda op: op.product_id)
+
+            if not lines:
+                return
+
+            stmt = insert(SalesDailyProduct_model).values(
+                [
+                    {
+                        "day": day,
+                        "product_id": op.product_id,
+                        "orders_count": 1,
+                        "revenue": op.quantity * op.current_price,
+                        "units": op.quantity,
+                    }
+                    for op in lines
+                ]
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[
+                        SalesDailyProduct_model.day,
+                        SalesDailyProduct_model.product_id,
+                    ],
+                    set_={
+                        "orders_count": SalesDailyProduct_model.orders_count + 1,
+                        "revenue": SalesDailyProduct_model.revenue
+                        + stmt.excluded.revenue,
+                        "units": SalesDailyProduct_model.units + stmt.excluded.units,
+                    },
+                )
+            )
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when recording order in sales rollups") from e
+
+    @classmethod
+    async def subtract_orders(
+        cls,
+        order_ids: list[int],
+        session: AsyncSession,
+    ) -> None:
+        """
+        Вычитает заказы из итогов их дней в той же транзакции, в которой они удаляются (вызывается до удаления,
+        commit выполняет вызывающий). Заказы блокируются, поэтому заказ, удаленный параллельным запросом,
+        не вычитается дважды. Строки итогов блокируются в порядке дня и продукта, как при создании заказа,
+        итоги, в которых не осталось заказов, удаляются, как при пересчете
+        :param order_ids: id удаляемых заказов
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
+        """
+        if not order_ids:
+            return
+
+        try:
+            # Список id передается одним параметром-массивом, а не параметром на каждый заказ
+            locked = await session.execute(
+                select(Order_model.id)
+                .where(Order_model.id == any_(literal(order_ids, ARRAY(Integer))))
+                .order_by(Order_model.id)
+                .with_for_update()
+            )
+            ids = literal(list(locked.scalars().all()), ARRAY(Integer))
+
+            order_day = utc_day(Order_model.created_at)
+            line_day = utc_day(OrderProducts_model.created_at)
+
+            days = (
+                select(
+                    order_day.label("day"),
+                    func.count().label("orders_count"),
+                    func.sum(Order_model.total_price).label("revenue"),
+                    func.sum(Order_model.total_quantity).label("units"),
+                )
+                .where(Order_model.id == any_(ids))
+                .group_by(order_day)
+                .subquery()
+            )
+            products = (
+                select(
+                    line_day.label("day"),
+                    OrderProducts_model.product_id,
+                    func.count(OrderProducts_model.order_id.distinct()).label("orders_count"),
+                    func.sum(
+                        OrderProducts_model.quantity * OrderProducts_model.current_price
+                    ).label("revenue"),
+                    func.sum(OrderProducts_model.quantity).label("units"),
+                )
+                .where(OrderProducts_model.order_id == any_(ids))
+                .group_by(line_day, OrderProducts_model.product_id)
+                .subquery()
+            )
+            product_row = and_(
+                SalesDailyProduct_model.day == products.c.day,
+                SalesDailyProduct_model.product_id == products.c.product_id,
+            )
+
+            await session.execute(
+                select(SalesDaily_model.id)
+                .join(days, SalesDaily_model.day == days.c.day)
+                .order_by(SalesDaily_model.day)
+                .with_for_update(of=SalesDaily_model)
+            )
+            await session.execute(
+                select(SalesDailyProduct_model.id)
+                .join(products, product_row)
+                .order_by(SalesDailyProduct_model.day, SalesDailyProduct_model.product_id)
+                .with_for_update(of=SalesDailyProduct_model)
+            )
+
+            await session.execute(
+                update(SalesDaily_model)
+                .where(SalesDaily_model.day == days.c.day)
+                .values(
+                    orders_count=SalesDaily_model.orders_count - days.c.orders_count,
+                    revenue=SalesDaily_model.revenue - days.c.revenue,
+                    units=SalesDaily_model.units - days.c.units,
+                )
+            )
+            await session.execute(
+                update(SalesDailyProduct_model)
+                .where(product_row)
+                .values(
+                    orders_count=SalesDailyProduct_model.orders_count - products.c.orders_count,
+                    revenue=SalesDailyProduct_model.revenue - products.c.revenue,
+                    units=SalesDailyProduct_model.units - products.c.units,
+                )
+            )
+
+            await session.execute(
+                delete(SalesDaily_model).where(
+                    SalesDaily_model.day.in_(select(days.c.day)),
+                    SalesDaily_model.orders_count <= 0,
+                )
+            )
+            await session.execute(
+                delete(SalesDailyProduct_model).where(
+                    SalesDailyProduct_model.day.in_(select(products.c.day)),
+                    SalesDailyProduct_model.orders_count <= 0,
+                )
+            )
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when subtracting orders from sales rollups") from e
+
+    @classmethod
+    async def clear(
+        cls,
+        session: AsyncSession,
+    ) -> None:
+        """
+        Удаляет все итоги продаж, вызывается вместе с очисткой таблицы заказов (commit выполняет вызывающий)
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
+        """
+        try:
+            await session.execute(delete(SalesDaily_model))
+            await session.execute(delete(SalesDailyProduct_model))
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when clearing sales rollups") from e
+
+    @classmethod
+    async def get_sales(
+        cls,
+        dates: tuple[date, date],
+        period: SalesPeriod,
+        session: AsyncSession,
+    ) -> list[RowMapping]:
+        """
+        Возвращает итоги продаж за интервал дней, сгруппированные по дням, месяцам или годам
+        :param dates: Первый и последний день интервала включительно
+        :param period: Период группировки
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список строк с ключами period, orders_count, revenue, units
+        """
+        period_start = cast(
+            func.date_trunc(period.value, SalesDaily_model.day), Date
+        ).label("period")
+
+        try:
+            stmt = (
+                select(
+                    period_start,
+                    func.sum(SalesDaily_model.orders_count).label("orders_count"),
+                    func.sum(SalesDaily_model.revenue).label("revenue"),
+                    func.sum(SalesDaily_model.units).label("units"),
+                )
+                .where(SalesDaily_model.day.between(*dates))
+                .group_by(period_start)
+                .order_by(period_start)
+            )
+            result = await session.execute(stmt)
+            return list(result.mappings().all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when receiving sales report") from e
+
+    @classmethod
+    async def get_product_sales(
+        cls,
+        dates: tuple[date, date],
+        limit: int,
+        session: AsyncSession,
+    ) -> list[RowMapping]:
+        """
+        Возвращает продукты с наибольшей выручкой за интервал дней
+        :param dates: Первый и последний день интервала включительно
+        :param limit: Количество продуктов
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список строк с ключами product_id, orders_count, revenue, units
+        """
+        revenue = func.sum(SalesDailyProduct_model.revenue).label("revenue")
+
+        try:
+            stmt = (
+                select(
+                    SalesDailyProduct_model.product_id,
+                    func.sum(SalesDailyProduct_model.orders_count).label("orders_count"),
+                    revenue,
+                    func.sum(SalesDailyProduct_model.units).label("units"),
+                )
+                .where(SalesDailyProduct_model.day.between(*dates))
+                .group_by(SalesDailyProduct_model.product_id)
+                .order_by(revenue.desc(), SalesDailyProduct_model.product_id)
+                .limit(limit)
+            )
+            result = await session.execute(stmt)
+            return list(result.mappings().all())
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when receiving product sales report") from e
+
+    @classmethod
+    async def rebuild(
+        cls,
+        dates: tuple[date, date],
+        session: AsyncSession,
+    ) -> None:
+        """
+        Пересчитывает итоги интервала дней из заказов в транзакции сессии (commit выполняет вызывающий):
+        итоги интервала удаляются и собираются заново.
+        Условие по created_at задано полуинтервалом, поэтому читаются только секции заказов этого интервала
+        :param dates: Первый и последний день интервала включительно
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: None
+        """
+        start = datetime.combine(dates[0], time(), tzinfo=timezone.utc)
+        end = datetime.combine(dates[1] + timedelta(days=1), time(), tzinfo=timezone.utc)
+
+        order_day = utc_day(Order_model.created_at)
+        line_day = utc_day(OrderProducts_model.created_at)
+
+        try:
+            await session.execute(
+                delete(SalesDaily_model).where(SalesDaily_model.day.between(*dates))
+            )
+            await session.execute(
+                delete(SalesDailyProduct_model).where(
+                    SalesDailyProduct_model.day.between(*dates)
+                )
+            )
+
+            await session.execute(
+                insert(SalesDaily_model).from_select(
+                    ["day", "orders_count", "revenue", "units"],
+                    select(
+                        order_day,
+                        func.count(),
+                        func.sum(Order_model.total_price),
+                        func.sum(Order_model.total_quantity),
+                    )
+                    .where(
+                        Order_model.created_at >= start,
+                        Order_model.created_at < end,
+                    )
+                    .group_by(order_day),
+                )
+            )
+
+            # created_at позиции совпадает с created_at ее заказа
+            await session.execute(
+                insert(SalesDailyProduct_model).from_select(
+                    ["day", "product_id", "orders_count", "revenue", "units"],
+                    select(
+                        line_day,
+                        OrderProducts_model.product_id,
+                        func.count(OrderProducts_model.order_id.distinct()),
+                        func.sum(
+                            OrderProducts_model.quantity
+                            * OrderProducts_model.current_price
+                        ),
+                        func.sum(OrderProducts_model.quantity),
+                    )
+                    .where(
+                        OrderProducts_model.created_at >= start,
+                        OrderProducts_model.created_at < end,
+                    )
+                    .group_by(line_day, OrderProducts_model.product_id),
+                )
+            )
+
+        except SQLAlchemyError as e:
+            raise DatabaseError("Error when rebuilding sales rollups") from e
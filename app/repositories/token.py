@@ -1,9 +1,50 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories import BaseRepo
 from app.models import RefreshToken as Refresh_model
-
+from app.schemas import RefreshCreate
+from app.tools.exeptions import DatabaseError
 
 
 class TokenRepo(BaseRepo[Refresh_model]):
 
-    model = Refresh_model
\ No newline at end of file
+    model = Refresh_model
+
+    @classmethod
+    async def upsert(
+        cls,
+        refresh_scheme: RefreshCreate,
+        session: AsyncSession,
+    ) -> Refresh_model:
+        """
+        Записывает хэш refresh токена для устройства пользователя одним запросом
+        INSERT ... ON CONFLICT (user_id, device_id) DO UPDATE ... RETURNING,
+        старый токен этого устройства при этом перезаписывается (ротация)
+        :param refresh_scheme: Pydantic Схема - объект, содержащий user_id, device_id и хэш токена
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель refresh токена, записанную в БД
+        """
+        try:
+            stmt = insert(cls.model).values(**refresh_scheme.model_dump())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cls.model.user_id, cls.model.device_id],
+                set_={
+                    "token_hash": stmt.excluded.token_hash,
+                    "updated_at": func.now(),
+                    "version": cls.model.version + 1,
+                },
+            ).returning(cls.model)
+
+            result = await session.execute(
+                stmt,
+                execution_options={"populate_existing": True},
+            )
+            refresh_model = result.scalar_one()
+
+            return refresh_model
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error when rotating {cls.model.__name__}") from e
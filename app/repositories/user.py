@@ -1,12 +1,18 @@
 from typing import Optional
 
 from pydantic import EmailStr
-from sqlalchemy import select
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import joinedload, raiseload
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories import BaseRepo
-from app.models import User as User_model
+from app.models import (
+    User as User_model,
+    RefreshToken as Refresh_model,
+    Cart as Cart_model,
+    CartProduct as CartProduct_model,
+)
 from app.schemas.user import UserCreate
 from app.tools.exeptions import DatabaseError
 
@@ -37,3 +43,88 @@ class UserRepo(BaseRepo[User_model]):
             raise DatabaseError(
                 f"Error when receiving {cls.model.__name__} by login"
             ) from e
+
+    @classmethod
+    async def get_by_refresh(
+        cls,
+        user_id: int,
+        device_id: str,
+        token_hash: bytes,
+        session: AsyncSession,
+    ) -> Optional[User_model]:
+        """
+        Возвращает модель пользователя, которому принадлежит refresh токен устройства,
+        проверка токена и загрузка пользователя выполняются одним запросом с JOIN
+        :param user_id: id пользователя из payload токена
+        :param device_id: id устройства из payload токена
+        :param token_hash: SHA-256 хэш полученного токена
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель пользователя | None
+        """
+        try:
+            stmt = (
+                select(cls.model)
+                .join(Refresh_model, Refresh_model.user_id == cls.model.id)
+                .where(
+                    Refresh_model.user_id == user_id,
+                    Refresh_model.device_id == device_id,
+                    Refresh_model.token_hash == token_hash,
+                )
+            )
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when receiving {cls.model.__name__} by refresh token"
+            ) from e
+
+    @classmethod
+    async def get_me(
+        cls,
+        user_id: int,
+        session: AsyncSession,
+    ) -> Optional[Row]:
+        """
+        Возвращает пользователя с профилем и итогами его корзины одним запросом:
+        профиль загружается LEFT JOIN через joinedload, итоги корзины - LEFT JOIN с подзапросом,
+        агрегирующим позиции корзины, остальные связи пользователя не загружаются
+        :param user_id: id пользователя
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Строка (User, cart_id, total_price, total_quantity) | None,
+        cart_id равен None, если корзина еще не создана
+        """
+        try:
+            cart_summary = (
+                select(
+                    Cart_model.user_id,
+                    Cart_model.id.label("cart_id"),
+                    func.coalesce(
+                        func.sum(CartProduct_model.quantity * CartProduct_model.current_price), 0
+                    ).label("total_price"),
+                    func.coalesce(func.sum(CartProduct_model.quantity), 0).label("total_quantity"),
+                )
+                .outerjoin(CartProduct_model, CartProduct_model.cart_id == Cart_model.id)
+                .where(Cart_model.user_id == user_id)
+                .group_by(Cart_model.id)
+                .subquery()
+            )
+
+            stmt = (
+                select(
+                    cls.model,
+                    cart_summary.c.cart_id,
+                    cart_summary.c.total_price,
+                    cart_summary.c.total_quantity,
+                )
+                .outerjoin(cart_summary, cart_summary.c.user_id == cls.model.id)
+                .where(cls.model.id == user_id)
+                .options(joinedload(cls.model.profile), raiseload("*"))
+            )
+            result = await session.execute(stmt)
+            return result.one_or_none()
+
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                f"Error when receiving {cls.model.__name__} with profile and cart"
+            ) from e
@@ -5,27 +5,50 @@ __all__ = [
     "UserUpdate",
     "UserResponse",
     "UserUpdateForAdmin",
+    "UserMeResponse",
     "PostCreate",
     "PostUpdate",
     "PostResponse",
+    "PostPageResponse",
+    "PostSearchHit",
+    "PostSearchPageResponse",
     "ProfileCreate",
     "ProfileUpdate",
     "ProfileResponse",
     "OrderCreate",
     "OrderUpdate",
     "CartResponse",
+    "CartSummaryResponse",
     "OrderResponse",
+    "OrderPageResponse",
+    "OrderSummaryResponse",
     "ProductCreate",
     "ProductUpdate",
     "ProductInCart",
     "ProductResponse",
     "ProductAddOrUpdate",
+    "SalesReportResponse",
+    "ProductSalesResponse",
 ]
 
 from app.schemas.token import TokenResponse, RefreshCreate
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserUpdateForAdmin
-from app.schemas.post import PostCreate, PostUpdate, PostResponse
-from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse
-from app.schemas.cart import ProductAddOrUpdate, CartResponse, ProductInCart
+from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserUpdateForAdmin, UserMeResponse
+from app.schemas.post import (
+    PostCreate,
+    PostUpdate,
+    PostResponse,
+    PostPageResponse,
+    PostSearchHit,
+    PostSearchPageResponse,
+)
+from app.schemas.order import (
+    OrderCreate,
+    OrderUpdate,
+    OrderResponse,
+    OrderPageResponse,
+    OrderSummaryResponse,
+)
+from app.schemas.cart import ProductAddOrUpdate, CartResponse, CartSummaryResponse, ProductInCart
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
 from app.schemas.profile import ProfileResponse, ProfileCreate, ProfileUpdate
+from app.schemas.report import SalesReportResponse, ProductSalesResponse
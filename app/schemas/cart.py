@@ -1,7 +1,7 @@
 from typing import Annotated
 from datetime import datetime
 from annotated_types import Ge
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field, computed_field
 
 
 
@@ -12,11 +12,15 @@ class ProductAddOrUpdate(BaseModel):
 
 class ProductInCart(BaseModel):
     model_config = ConfigDict(from_attributes=True)
-    
-    id: Annotated[int, Ge(1)]
-    name: str
-    description: str
-    price: int
+
+    # Псевдонимы позволяют валидировать позицию корзины CartProduct напрямую,
+    # без промежуточного построения схемы для каждой позиции
+    id: Annotated[int, Ge(1)] = Field(validation_alias=AliasChoices("product_id", "id"))
+    name: str = Field(validation_alias=AliasChoices(AliasPath("product", "name"), "name"))
+    description: str = Field(
+        validation_alias=AliasChoices(AliasPath("product", "description"), "description")
+    )
+    price: int = Field(validation_alias=AliasChoices("current_price", "price"))
     quantity: Annotated[int, Ge(0)] = 0
 
 
@@ -41,3 +45,14 @@ class CartResponse(BaseModel):
     def total_quantity(self) -> int:
         """ Вычисляет общее количество всех продуктов в корзине """
         return sum(pic.quantity for pic in self.products)
+
+
+class CartSummaryResponse(BaseModel):
+    """Класс описывающий итоги корзины без ее позиций,
+    итоговые цена и количество вычисляются в БД агрегацией позиций корзины"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Annotated[int, Ge(1)]
+    total_price: Annotated[int, Ge(0)] = 0
+    total_quantity: Annotated[int, Ge(0)] = 0
@@ -1,8 +1,8 @@
 from datetime import datetime
 from typing import Optional, Annotated
 
-from annotated_types import MinLen, MaxLen, Ge
-from pydantic import BaseModel, ConfigDict,computed_field
+from annotated_types import MinLen, MaxLen, Ge, Le
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field, computed_field
 from app.schemas.product import ProductResponse
 
 
@@ -15,6 +15,27 @@ class ProductInOrder(ProductResponse):
     этот класс не требует настройки ConfigDict, т.к. его задача это валидация данных,
     полученных от пользователя"""
 
+    # Псевдонимы позволяют валидировать позицию заказа OrderProducts напрямую:
+    # поля продукта берутся из связанного продукта, цена - зафиксированная в позиции
+    id: Annotated[int, Ge(1)] = Field(validation_alias=AliasChoices("product_id", "id"))
+    name: Annotated[str, MinLen(3), MaxLen(30)] = Field(
+        validation_alias=AliasChoices(AliasPath("product", "name"), "name")
+    )
+    description: Annotated[str, MinLen(3), MaxLen(200)] = Field(
+        validation_alias=AliasChoices(AliasPath("product", "description"), "description")
+    )
+    price: Annotated[int, Ge(1), Le(1_000_000)] = Field(
+        validation_alias=AliasChoices("current_price", "price")
+    )
+    created_at: datetime = Field(
+        validation_alias=AliasChoices(AliasPath("product", "created_at"), "created_at")
+    )
+    updated_at: datetime = Field(
+        validation_alias=AliasChoices(AliasPath("product", "updated_at"), "updated_at")
+    )
+    version: Annotated[int, Ge(1)] = Field(
+        validation_alias=AliasChoices(AliasPath("product", "version"), "version")
+    )
     quantity: Annotated[int, Ge(0)] = 0
 
 
@@ -32,7 +53,9 @@ class OrderCreate(BaseModel):
     
 
 class OrderUpdate(OrderCreate):
-    pass
+
+    # Версия заказа из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Annotated[int, Ge(1)]
 
 
 class OrderResponse(OrderCreate):
@@ -52,7 +75,28 @@ class OrderResponse(OrderCreate):
     promo_code: Optional[Annotated[str, MinLen(10), MaxLen(10)]] = None
     total_price: Annotated[int, Ge(0)] = 0
     total_quantity: Annotated[int, Ge(0)] = 0
+    version: Annotated[int, Ge(1)]
     created_at: datetime
     updated_at: datetime
 
 
+class OrderSummaryResponse(OrderCreate):
+    """Класс описывающий краткий объект заказа для списка истории заказов,
+    не содержит позиций заказа, итоговые цена и количество берутся из сохраненных в заказе полей"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Annotated[int, Ge(1)]
+    user_id: Annotated[int, Ge(1)]
+    total_price: Annotated[int, Ge(0)] = 0
+    total_quantity: Annotated[int, Ge(0)] = 0
+    created_at: datetime
+    updated_at: datetime
+
+
+class OrderPageResponse(BaseModel):
+    """Класс описывающий страницу истории заказов,
+    next_cursor передается в следующий запрос для получения следующей страницы, None - страница последняя"""
+
+    items: list[OrderSummaryResponse]
+    next_cursor: Optional[str] = None
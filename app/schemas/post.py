@@ -30,6 +30,9 @@ class PostUpdate(BaseModel):
     title: Optional[Annotated[str, MinLen(3), MaxLen(100)]] = None
     body: Optional[Annotated[str, MinLen(3), MaxLen(700)]] = None
 
+    # Версия модели из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Optional[Annotated[int, Ge(1)]] = None
+
 
 class PostResponse(PostCreate):
     """Класс описывающий объект, возвращаемый пользователю, наследуется от UserInput
@@ -43,4 +46,33 @@ class PostResponse(PostCreate):
     id: Annotated[int, Ge(1)]
     user_id: Annotated[int, Ge(1)]
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+    version: Annotated[int, Ge(1)]
+
+
+class PostPageResponse(BaseModel):
+    """Класс описывающий страницу ленты постов,
+    next_cursor передается в следующий запрос для получения следующей страницы, None - страница последняя"""
+
+    items: list[PostResponse]
+    next_cursor: Optional[str] = None
+
+
+class PostSearchHit(BaseModel):
+    """Класс описывающий результат полнотекстового поиска постов: пост, его ранг
+    и фрагменты текста, в которых совпадения обрамлены <b> и </b>.
+    Остальной текст фрагмента не экранируется, клиент выводит его как текст поста"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    post: PostResponse
+    rank: float
+    headline: str
+
+
+class PostSearchPageResponse(BaseModel):
+    """Класс описывающий страницу результатов поиска постов,
+    next_cursor передается в следующий запрос для получения следующей страницы, None - страница последняя"""
+
+    items: list[PostSearchHit]
+    next_cursor: Optional[str] = None
@@ -32,6 +32,9 @@ class ProductUpdate(BaseModel):
     description: Optional[Annotated[str, MinLen(3), MaxLen(200)]] = None
     price: Optional[Annotated[int, Ge(1), Le(1_000_000)]] = None
 
+    # Версия модели из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Optional[Annotated[int, Ge(1)]] = None
+
 
 class ProductResponse(ProductCreate):
     """Класс описывающий объект, возвращаемый пользователю, наследуется от ProductInput
@@ -46,3 +49,4 @@ class ProductResponse(ProductCreate):
     id: Annotated[int, Ge(1)]
     created_at: datetime
     updated_at: datetime
+    version: Annotated[int, Ge(1)]
@@ -34,6 +34,9 @@ class ProfileUpdate(BaseModel):
     age: Optional[Annotated[int, Ge(7), Le(120)]] = None
     bio: Optional[Annotated[str, MinLen(5), MaxLen(700)]] = None
 
+    # Версия модели из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Optional[Annotated[int, Ge(1)]] = None
+
 
 class ProfileResponse(ProfileCreate):
     """Класс описывающий объект, возвращаемый пользователю, наследуется от ProfileCreate
@@ -48,3 +51,4 @@ class ProfileResponse(ProfileCreate):
     id: Annotated[int, Ge(1)]
     created_at: datetime
     updated_at: datetime
+    version: Annotated[int, Ge(1)]
@@ -0,0 +1,28 @@
+from datetime import date
+from typing import Annotated
+
+from annotated_types import Ge
+from pydantic import BaseModel, ConfigDict
+
+
+class SalesReportResponse(BaseModel):
+    """Класс описывающий итог продаж за период (день, месяц или год),
+    period - первый день периода"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    period: date
+    orders_count: Annotated[int, Ge(0)] = 0
+    revenue: Annotated[int, Ge(0)] = 0
+    units: Annotated[int, Ge(0)] = 0
+
+
+class ProductSalesResponse(BaseModel):
+    """Класс описывающий итог продаж одного продукта за интервал дней"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    product_id: Annotated[int, Ge(1)]
+    orders_count: Annotated[int, Ge(0)] = 0
+    revenue: Annotated[int, Ge(0)] = 0
+    units: Annotated[int, Ge(0)] = 0
@@ -1,10 +1,15 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Annotated
 
+from annotated_types import Ge, MinLen, MaxLen
 
 
 class RefreshCreate(BaseModel):
-    token: str
+    """Данные для записи refresh токена в БД: вместо самого токена хранится его SHA-256 хэш"""
+
+    user_id: Annotated[int, Ge(1)]
+    device_id: Annotated[str, MinLen(1), MaxLen(64)]
+    token_hash: Annotated[bytes, MinLen(32), MaxLen(32)]
 
 
 class TokenResponse(BaseModel):
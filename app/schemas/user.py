@@ -5,6 +5,8 @@ from annotated_types import MaxLen, MinLen, Ge
 from pydantic import BaseModel, EmailStr, ConfigDict, SecretStr
 
 from app.tools.types import UserRole
+from app.schemas.cart import CartSummaryResponse
+from app.schemas.profile import ProfileResponse
 
 
 class UserCreate(BaseModel):
@@ -29,6 +31,9 @@ class UserUpdate(BaseModel):
     login: Optional[Annotated[EmailStr, MinLen(5), MaxLen(30)]]
     password: Optional[Annotated[SecretStr, MinLen(7), MaxLen(120)]]
 
+    # Версия модели из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Optional[Annotated[int, Ge(1)]] = None
+
 
 class UserUpdateForAdmin(BaseModel):
     """Класс описывающий объект, получаемый от пользователя, для изменения логина или пароля
@@ -43,6 +48,9 @@ class UserUpdateForAdmin(BaseModel):
     role: Optional[UserRole]
     is_active: Optional[bool]
 
+    # Версия модели из последнего ответа, при несовпадении с текущей версией в БД изменение отклоняется с кодом 409
+    version: Optional[Annotated[int, Ge(1)]] = None
+
 
 class UserResponse(BaseModel):
     """Класс описывающий объект, возвращаемый администратору, наследуется от UserCreate
@@ -59,3 +67,15 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
     updated_at: datetime
+    version: Annotated[int, Ge(1)]
+
+
+class UserMeResponse(BaseModel):
+    """Класс описывающий данные стартового экрана пользователя: сам пользователь, его профиль
+    и итоги корзины без позиций, profile и cart равны None, если профиль или корзина еще не созданы"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user: UserResponse
+    profile: Optional[ProfileResponse] = None
+    cart: Optional[CartSummaryResponse] = None
@@ -0,0 +1,284 @@
+"""
+Запуск приложения в production:
+
+    python -m app.serve
+    SERVER_WORKERS=8 SERVER_LIMIT_CONCURRENCY=1000 python -m app.serve --port 8080
+
+Параметры сервера задаются переменными окружения SERVER_* (ServerSettings), аргументы командной строки
+переопределяют адрес, порт и число процессов. Для разработки по-прежнему используется python main.py с reload.
+
+С --preload (SERVER_PRELOAD=true) приложение импортируется один раз в родительском процессе, а процессы-обработчики
+создаются fork и разделяют с ним страницы памяти с модулями, схемами, мапперами и маршрутами.
+Без него uvicorn запускает каждый процесс заново и каждый импортирует приложение сам
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+import traceback
+from typing import Any, Optional
+
+import uvicorn
+
+from app.core import server_settings
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def cpu_count() -> int:
+    """Число ядер, доступных процессу: в контейнере с ограничением по cpuset оно меньше os.cpu_count()"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def select_loop(loop: str) -> str:
+    if loop != "auto":
+        return loop
+
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+
+    return "uvloop"
+
+
+def select_http(http: str) -> str:
+    if http != "auto":
+        return http
+
+    try:
+        import httptools  # noqa: F401
+    except ImportError:
+        return "h11"
+
+    return "httptools"
+
+
+def uvicorn_options() -> dict[str, Any]:
+    return {
+        "loop": select_loop(server_settings.loop),
+        "http": select_http(server_settings.http),
+        "backlog": server_settings.backlog,
+        "timeout_keep_alive": server_settings.keep_alive,
+        "limit_concurrency": server_settings.limit_concurrency,
+        "timeout_graceful_shutdown": server_settings.graceful_timeout,
+        "proxy_headers": server_settings.proxy_headers,
+        "forwarded_allow_ips": server_settings.forwarded_allow_ips,
+    }
+
+
+def exit_reason(status: int) -> str:
+    """
+    :param status: Статус завершения процесса из os.wait
+    :return: Код выхода или сигнал, которым процесс был завершен
+    """
+    code = os.waitstatus_to_exitcode(status)
+
+    if code < 0:
+        return f"signal {signal.Signals(-code).name}"
+
+    return f"exit code {code}"
+
+
+class RestartBackoff:
+    """
+    Задержка перезапуска процессов-обработчиков. Процесс, завершившийся быстрее quick_exit секунд после запуска,
+    скорее всего не может запуститься (неверный адрес БД, ошибка импорта после fork): перезапуски таких процессов
+    подряд ждут все дольше, а после max_quick_exits подряд родитель останавливается вместо цикла fork
+    """
+
+    def __init__(
+        self,
+        quick_exit: float = 10.0,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_quick_exits: int = 5,
+    ) -> None:
+        """
+        :param quick_exit: Процесс, проработавший меньше стольких секунд, считается не запустившимся
+        :param base_delay: Задержка перед перезапуском после первого быстрого завершения в секундах
+        :param max_delay: Наибольшая задержка в секундах
+        :param max_quick_exits: Сколько быстрых завершений подряд допускается
+        """
+        self.quick_exit = quick_exit
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_quick_exits = max_quick_exits
+        self.quick_exits = 0
+
+    def exited(self, lifetime: float) -> Optional[float]:
+        """
+        Учитывает завершение процесса
+        :param lifetime: Сколько секунд процесс проработал
+        :return: Задержка перед перезапуском в секундах, None - перезапускать больше не нужно
+        """
+        if lifetime >= self.quick_exit:
+            self.quick_exits = 0
+            return 0.0
+
+        self.quick_exits += 1
+
+        if self.quick_exits >= self.max_quick_exits:
+            return None
+
+        return min(self.max_delay, self.base_delay * 2 ** (self.quick_exits - 1))
+
+
+def prefork(host: str, port: int, workers: int) -> None:
+    """
+    Импортирует и настраивает приложение в родительском процессе и создает процессы-обработчики через fork.
+    Перед fork объекты родителя переносятся gc.freeze() в постоянное поколение: сборщик мусора в процессах
+    не обходит их и не записывает в их заголовки, поэтому страницы с ними остаются общими (copy-on-write).
+    Каждый процесс создает свой движок БД и прогревает его в lifespan. Завершившийся процесс перезапускается
+    с задержкой RestartBackoff, SIGTERM и SIGINT передаются процессам, родитель завершается после них
+    :param host: Адрес
+    :param port: Порт
+    :param workers: Число процессов
+    """
+    # Без сборок мусора во время импорта объекты не перемешиваются с освобожденными и занимают меньше страниц
+    gc.disable()
+
+    from sqlalchemy.orm import configure_mappers
+
+    from app.core import db_connector
+    from app.core.metrics import mark_process_dead
+    from main import app
+
+    configure_mappers()
+
+    config = uvicorn.Config(app, host=host, port=port, **uvicorn_options())
+    config.load()
+    sock = config.bind_socket()
+
+    gc.collect()
+    gc.freeze()
+
+    # Время запуска каждого процесса-обработчика
+    children: dict[int, float] = {}
+    stopping = False
+    backoff = RestartBackoff()
+
+    def spawn() -> None:
+        pid = os.fork()
+
+        if pid:
+            children[pid] = time.monotonic()
+            return
+
+        # Процесс-обработчик не управляет другими процессами
+        children.clear()
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            gc.enable()
+            db_connector.create_engine()
+            uvicorn.Server(config).run(sockets=[sock])
+
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+        for child in children:
+            os.kill(child, signal.SIGTERM)
+
+    failed = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("Started parent process [%d], forking %d workers", os.getpid(), workers)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        pid, status = os.wait()
+        lifetime = time.monotonic() - children.pop(pid)
+        mark_process_dead(pid)
+
+        if stopping:
+            continue
+
+        delay = backoff.exited(lifetime)
+
+        if delay is None:
+            logger.error(
+                "Worker [%d] exited with %s after %.1f s, %d workers failed to start in a row, stopping",
+                pid,
+                exit_reason(status),
+                lifetime,
+                backoff.quick_exits,
+            )
+            failed = True
+            stop(signal.SIGTERM, None)
+            continue
+
+        logger.warning(
+            "Worker [%d] exited with %s after %.1f s, restarting in %.1f s",
+            pid,
+            exit_reason(status),
+            lifetime,
+            delay,
+        )
+        # Ожидание короткими отрезками, чтобы SIGTERM во время задержки не ждал ее окончания
+        restart_at = time.monotonic() + delay
+
+        while not stopping and time.monotonic() < restart_at:
+            time.sleep(min(0.1, restart_at - time.monotonic()))
+
+        if not stopping:
+            spawn()
+
+    sock.close()
+
+    if failed:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.serve")
+    parser.add_argument("--host", default=server_settings.host)
+    parser.add_argument("--port", type=int, default=server_settings.port)
+    parser.add_argument("--workers", type=int, default=server_settings.workers, help="by default one per CPU core")
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        default=server_settings.preload,
+        help="import the application once and fork workers from it",
+    )
+    args = parser.parse_args()
+    workers = args.workers or cpu_count()
+
+    if args.preload:
+        prefork(host=args.host, port=args.port, workers=workers)
+        return
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        **uvicorn_options(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ __all__ = [
     "TokenService",
     "ProductService",
     "ProfileService",
+    "PartitionService",
+    "SalesService",
 ]
 
 from app.service.base import BaseService
@@ -17,3 +19,5 @@ from app.service.token import TokenService
 from app.service.order import OrderService
 from app.service.product import ProductService
 from app.service.profile import ProfileService
+from app.service.partition import PartitionService
+from app.service.sales import SalesService
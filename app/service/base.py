@@ -114,11 +114,14 @@ class BaseService(Generic[Repo], AService):
         :param session: Объект сессии, полученный в качестве аргумента
         :param partial: Флаг, передаваем значение True или False,
         :return: Модель пользователя, обновленную в БД
+        :raises ConflictError: Переданная в схеме версия устарела или модель изменена другим запросом
         """
         new_data = scheme_in.model_dump(
             exclude_unset=partial,
             exclude_none=True,
         )
+        # Версия не является данными модели, это условие UPDATE
+        version = new_data.pop("version", None)
 
         model = await cls.get_model(
             session=session,
@@ -133,6 +136,7 @@ class BaseService(Generic[Repo], AService):
             new_data=new_data,
             update_model=model,
             session=session,
+            version=version,
         )
 
     @classmethod
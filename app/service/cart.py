@@ -12,7 +12,8 @@ from app.models import (
     Cart as Cart_model,
     CartProduct as Cart_Product_model,
 )
-from app.schemas import ProductAddOrUpdate, ProductInCart
+from app.schemas import ProductAddOrUpdate
+from app.utils import ResponseUtils
 
 
 class CartService(BaseService[CartRepo]):
@@ -27,31 +28,13 @@ class CartService(BaseService[CartRepo]):
         :param param:
         :return:
         """
-        products = [
-            ProductInCart(
-                id=cp.product.id,
-                name=cp.product.name,
-                description=cp.product.description,
-                price=cp.current_price,
-                quantity=cp.quantity,
-            )
-            for cp in cart_model.products
-        ]
-
-        return CartResponse(
-            id=cart_model.id,
-            user_id=cart_model.user_id,
-            products=products,
-            created_at=cart_model.created_at,
-            updated_at=cart_model.updated_at,
-        )
+        return CartResponse.model_validate(cart_model)
 
 
     @classmethod
     async def get_all_carts(
         cls,
         session: AsyncSession,
-        dates: tuple[datetime, datetime] = None,
     ) -> list[CartResponse]:
         """ "
 
@@ -60,11 +43,10 @@ class CartService(BaseService[CartRepo]):
         :return:
         """
         cart_models = await cls.repo.get_all_carts(
-            dates=dates,
             session=session,
         )
 
-        return [CartResponse.model_validate(cart) for cart in cart_models]
+        return ResponseUtils.validate(list[CartResponse], cart_models)
 
     @classmethod
     async def get_all_carts_by_date(
@@ -83,7 +65,7 @@ class CartService(BaseService[CartRepo]):
             session=session,
         )
 
-        return [CartResponse.model_validate(cart) for cart in cart_models]
+        return ResponseUtils.validate(list[CartResponse], cart_models)
 
     @classmethod
     async def get_cart(
@@ -128,11 +110,17 @@ class CartService(BaseService[CartRepo]):
         if not cart_model:
             cart_model = Cart_model(user_id=user_id)
 
-            cart_model = await cls.repo.create(
+            await cls.repo.create(
                 model=cart_model,
                 session=session,
             )
 
+            # Созданная корзина перечитывается вместе с продуктами, ленивая загрузка в async сессии невозможна
+            cart_model = await cls.get_cart(
+                user_id=user_id,
+                session=session,
+            )
+
         return cls._to_cart_response(cart_model)
 
     @classmethod
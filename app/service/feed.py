@@ -0,0 +1,93 @@
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.schemas import PostResponse
+
+
+class FeedWindow:
+    """
+    Окно последних постов ленты в памяти процесса, от новых к старым.
+    Первые страницы ленты отдаются из окна без запроса к БД, страницы за пределами окна читаются из БД.
+    Запись постов сбрасывает окно после commit своей транзакции, следующее чтение ленты перечитывает его.
+    Записи в других процессах сбрасывают только их окна, поэтому окно устаревает не дольше, чем на ttl секунд
+    """
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+        # Номер сброса окна: чтение, начатое до сброса, не должно заполнить окно старыми данными
+        self.generation = 0
+        self._items: list[PostResponse] = []
+        # Ключи (created_at, id) от старых к новым для bisect
+        self._keys: list[tuple[datetime, int]] = []
+        # В окне все посты таблицы, за его пределами ничего нет
+        self._complete = False
+        self._expires_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return time.monotonic() < self._expires_at
+
+    def fill(self, items: list[PostResponse], generation: int) -> None:
+        """
+        Заполняет окно постами, прочитанными из БД
+        :param items: Не более size последних постов, от новых к старым
+        :param generation: Номер сброса окна на момент начала чтения, если окно с тех пор сброшено - данные не сохраняются
+        """
+        if generation != self.generation:
+            return
+
+        self._items = items
+        self._keys = [(item.created_at, item.id) for item in reversed(items)]
+        self._complete = len(items) < self.size
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._expires_at = 0.0
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> Optional[tuple[list[PostResponse], bool]]:
+        """
+        Возвращает страницу ленты из окна
+        :param limit: Размер страницы
+        :param after: (created_at, id) последнего поста предыдущей страницы
+        :return: Посты страницы и признак наличия следующей страницы | None, если окно не загружено или страница не помещается в окно
+        """
+        if not self.loaded:
+            return None
+
+        start = 0 if after is None else len(self._keys) - bisect_left(self._keys, after)
+        end = start + limit
+
+        if end >= len(self._items) and not self._complete:
+            return None
+
+        return self._items[start:end], end < len(self._items)
+
+    def mark_changed(self, session: AsyncSession) -> None:
+        """
+        Отмечает, что в транзакции сессии изменены посты, окно будет сброшено после ее commit
+        :param session: Объект сессии, полученный в качестве аргумента
+        """
+        session.info.setdefault("changed_feeds", set()).add(self)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_feeds(session: Session) -> None:
+    for feed in session.info.pop("changed_feeds", ()):
+        feed.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_feeds(session: Session) -> None:
+    session.info.pop("changed_feeds", None)
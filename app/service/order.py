@@ -1,16 +1,22 @@
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.repositories import OrderRepo
+from app.repositories import OrderRepo, SalesRepo
 from app.repositories.cart import CartRepo
 from app.service import BaseService
 from app.models import Order as Order_model
-from app.schemas import OrderCreate, OrderUpdate
+from app.schemas import (
+    OrderCreate,
+    OrderUpdate,
+    OrderPageResponse,
+    OrderSummaryResponse,
+)
+from app.utils.cursor import CursorUtils
 
 
 class OrderService(BaseService[OrderRepo]):
 
-    repo: OrderRepo
+    repo = OrderRepo
 
     @classmethod
     async def get_all_orders(
@@ -33,6 +39,42 @@ class OrderService(BaseService[OrderRepo]):
         else:
             return await cls.repo.get_all_orders(session=session)
 
+    @classmethod
+    async def get_order_page(
+        cls,
+        user_id: int,
+        limit: int,
+        session: AsyncSession,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> OrderPageResponse:
+        """
+        Возвращает страницу истории заказов пользователя без позиций заказов
+        :param user_id: id пользователя
+        :param limit: Размер страницы
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param after: Раскодированный курсор предыдущей страницы
+        :return: Страница заказов и курсор следующей страницы
+        """
+        # Запрашиваем на одну запись больше, чтобы без COUNT понять, есть ли следующая страница
+        order_models = await cls.repo.get_order_summaries_by_user_id(
+            user_id=user_id,
+            limit=limit + 1,
+            after=after,
+            session=session,
+        )
+
+        next_cursor = None
+
+        if len(order_models) > limit:
+            order_models = order_models[:limit]
+            last = order_models[-1]
+            next_cursor = CursorUtils.encode_cursor(last.created_at, last.id)
+
+        return OrderPageResponse(
+            items=[OrderSummaryResponse.model_validate(om) for om in order_models],
+            next_cursor=next_cursor,
+        )
+
     @classmethod
     async def get_orders_by_date(
         cls,
@@ -123,6 +165,18 @@ class OrderService(BaseService[OrderRepo]):
             session=session,
         )
 
+        # Ответ содержит позиции заказа, поэтому заказ перечитывается вместе с ними
+        order_model = await cls.repo.get_by_order_id(
+            order_id=order_model.id,
+            session=session,
+        )
+
+        # Строка итогов дня общая для всех заказов, поэтому блокируется последним запросом перед commit
+        await SalesRepo.record_order(
+            order_model=order_model,
+            session=session,
+        )
+
         return order_model
 
     @classmethod
@@ -149,10 +203,92 @@ class OrderService(BaseService[OrderRepo]):
         if not order_model:
             return None
 
-        updated_order_model = cls.repo.update(
-            new_data=order_schema.model_dump(exclude_unset=True),
+        new_data = order_schema.model_dump(exclude_unset=True)
+        # Версия не является данными заказа, это условие UPDATE
+        version = new_data.pop("version")
+
+        updated_order_model = await cls.repo.update(
+            new_data=new_data,
             update_model=order_model,
             session=session,
+            version=version,
         )
 
         return updated_order_model
+
+    @classmethod
+    async def delete_model(
+        cls,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        model_id: Optional[int] = None,
+    ) -> Optional[Order_model]:
+        """
+        Удаляет заказ и в той же транзакции вычитает его из итогов продаж его дня
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id пользователя, если заказ удаляет его владелец
+        :param model_id: id заказа
+        :return: Удаленный заказ или None, если заказ не найден
+        """
+        order_model = await cls.get_model(
+            session=session,
+            user_id=user_id,
+            model_id=model_id,
+        )
+
+        if not order_model:
+            return None
+
+        await SalesRepo.subtract_orders(
+            order_ids=[order_model.id],
+            session=session,
+        )
+
+        return await cls.repo.delete(
+            del_model=order_model,
+            session=session,
+        )
+
+    @classmethod
+    async def delete_all_models(
+        cls,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+    ) -> Optional[list]:
+        """
+        Удаляет заказы пользователя и в той же транзакции вычитает их из итогов продаж
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id пользователя
+        :return: Пустой список или None, если заказов нет
+        """
+        order_models = await cls.get_all_models(
+            session=session,
+            user_id=user_id,
+        )
+
+        if not order_models:
+            return None
+
+        await SalesRepo.subtract_orders(
+            order_ids=[om.id for om in order_models],
+            session=session,
+        )
+
+        return await cls.repo.delete_all(
+            list_models=order_models,
+            session=session,
+        )
+
+    @classmethod
+    async def clear_table(
+        cls,
+        session: AsyncSession,
+    ) -> list:
+        """
+        Очищает таблицу заказов вместе с итогами продаж, которые из них собраны
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Пустой список
+        """
+        await SalesRepo.clear(session=session)
+
+        return await cls.repo.clear(session=session)
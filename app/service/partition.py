@@ -0,0 +1,142 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.connector import DBConnector
+from app.models.partition import PARTITIONED_TABLES, partition_name
+from app.repositories import PartitionRepo
+from app.tools.exeptions import DatabaseError
+
+
+def month_start(day: date) -> datetime:
+    """
+    Возвращает начало месяца в UTC, границы секций задаются в UTC независимо от часового пояса сессии
+    :param day: Любая дата месяца
+    :return: Первое число месяца, 00:00 UTC
+    """
+    return datetime(day.year, day.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """
+    Сдвигает начало месяца на указанное количество месяцев
+    :param month: Начало месяца
+    :param months: Количество месяцев, может быть отрицательным
+    :return: Начало месяца
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+class PartitionService:
+
+    repo = PartitionRepo
+
+    @classmethod
+    async def ensure_partitions(
+        cls,
+        connector: DBConnector,
+        months_ahead: int = 3,
+        since: Optional[date] = None,
+    ) -> list[str]:
+        """
+        Создает недостающие месячные секции всех секционированных таблиц, начиная с месяца since
+        и заканчивая текущим месяцем плюс months_ahead. Вызывается периодически из app.maintenance.partitions,
+        запас в несколько месяцев не дает новым заказам попадать в секцию по умолчанию.
+        Каждый месяц создается отдельной единицей работы: месяц, который не удалось создать,
+        не мешает создать следующие, а блокировки секций по умолчанию держатся только на время одного месяца
+        :param connector: Подключение к БД, единицы работы берут соединения из пула background
+        :param months_ahead: На сколько месяцев вперед создавать секции
+        :param since: Первый месяц, по умолчанию текущий
+        :return: Список созданных секций
+        :raises DatabaseError: Секции некоторых месяцев не созданы, остальные месяцы созданы
+        """
+        first = month_start(since or datetime.now(timezone.utc))
+        last = add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+
+        existing = set().union(*(await cls._get_partitions(connector)).values())
+
+        created, failed = [], []
+        month = first
+
+        while month <= last:
+            partitions = [
+                (table_name, partition_name(table_name, month), month, add_months(month, 1))
+                for table_name in PARTITIONED_TABLES
+                if partition_name(table_name, month) not in existing
+            ]
+
+            if partitions:
+                try:
+                    # Повтор после потерянного commit не выполняется: секции могли быть созданы,
+                    # следующий запуск найдет их в каталоге
+                    created += await connector.run(
+                        lambda session: cls.repo.create_partitions(partitions=partitions, session=session),
+                        operation="partitions.create",
+                        pool="background",
+                    )
+
+                except DatabaseError as e:
+                    failed.append(e)
+
+            month = add_months(month, 1)
+
+        if failed:
+            raise DatabaseError(
+                f"Created partitions: {', '.join(created) or 'none'}. Failed: {'; '.join(map(str, failed))}"
+            ) from failed[0]
+
+        return created
+
+    @classmethod
+    async def detach_partitions(
+        cls,
+        before: date,
+        connector: DBConnector,
+    ) -> list[str]:
+        """
+        Отсоединяет месячные секции, целиком лежащие раньше месяца before, вместо DELETE старых заказов.
+        Каждый месяц отсоединяется отдельной единицей работы, секции позиций заказов - раньше секций заказов
+        того же месяца
+        :param before: Первый месяц, секции которого остаются в таблицах
+        :param connector: Подключение к БД, единицы работы берут соединения из пула background
+        :return: Список отсоединенных секций
+        """
+        boundary = partition_name("", month_start(before))
+
+        months: dict[str, list[tuple[str, str]]] = {}
+
+        for table_name, names in reversed((await cls._get_partitions(connector)).items()):
+            for name in names:
+                # Имена месячных секций заканчиваются на _pYYYYMM и сравниваются как строки
+                suffix = name[len(table_name):]
+
+                if suffix.startswith("_p") and suffix < boundary:
+                    months.setdefault(suffix, []).append((table_name, name))
+
+        detached = []
+
+        for suffix in sorted(months):
+            detached += await connector.run(
+                lambda session: cls.repo.detach_partitions(partitions=months[suffix], session=session),
+                operation="partitions.detach",
+                pool="background",
+            )
+
+        return detached
+
+    @classmethod
+    async def _get_partitions(cls, connector: DBConnector) -> dict[str, list[str]]:
+        """
+        Возвращает секции секционированных таблиц
+        :param connector: Подключение к БД
+        :return: {таблица: имена секций} в порядке PARTITIONED_TABLES
+        """
+        async def work(session: AsyncSession) -> dict[str, list[str]]:
+            return {
+                table_name: await cls.repo.get_partitions(table_name=table_name, session=session)
+                for table_name in PARTITIONED_TABLES
+            }
+
+        return await connector.run(work, operation="partitions.list", pool="background", idempotent=True)
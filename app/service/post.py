@@ -1,9 +1,229 @@
+from functools import lru_cache
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import feed_settings
 from app.repositories import PostRepo
 from app.service import BaseService
+from app.service.feed import FeedWindow
 from app.models import Post as PostModel
+from app.schemas import (
+    PostCreate,
+    PostUpdate,
+    PostResponse,
+    PostPageResponse,
+    PostSearchHit,
+    PostSearchPageResponse,
+)
+from app.utils.cursor import CursorUtils
+
+
+@lru_cache(maxsize=None)
+def feed_window() -> FeedWindow:
+    """Окно ленты процесса создается при первом обращении, поэтому импорт сервиса не читает FeedSettings"""
+    return FeedWindow(size=feed_settings.window, ttl=feed_settings.ttl)
 
 
 class PostService(BaseService[PostModel]):
 
     repo = PostRepo
 
+    @classmethod
+    async def get_feed_page(
+        cls,
+        limit: int,
+        session: AsyncSession,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> PostPageResponse:
+        """
+        Возвращает страницу ленты постов, первые страницы отдаются из окна последних постов в памяти
+        :param limit: Размер страницы
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param after: Раскодированный курсор предыдущей страницы
+        :return: Страница постов и курсор следующей страницы
+        """
+        feed = feed_window()
+
+        if not feed.loaded:
+            generation = feed.generation
+            post_models = await cls.repo.get_feed(limit=feed.size, session=session)
+            feed.fill([PostResponse.model_validate(pm) for pm in post_models], generation)
+
+        page = feed.page(limit=limit, after=after)
+
+        if page is not None:
+            items, has_next = page
+
+        else:
+            # Запрашиваем на одну запись больше, чтобы без COUNT понять, есть ли следующая страница
+            post_models = await cls.repo.get_feed(limit=limit + 1, after=after, session=session)
+            has_next = len(post_models) > limit
+            items = [PostResponse.model_validate(pm) for pm in post_models[:limit]]
+
+        next_cursor = None
+
+        if has_next:
+            last = items[-1]
+            next_cursor = CursorUtils.encode_cursor(last.created_at, last.id)
+
+        return PostPageResponse(
+            items=items,
+            next_cursor=next_cursor,
+        )
+
+    @classmethod
+    async def search_page(
+        cls,
+        query: str,
+        limit: int,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        dates: tuple[Optional[datetime], Optional[datetime]] = (None, None),
+        after: Optional[tuple[float, int]] = None,
+    ) -> PostSearchPageResponse:
+        """
+        Возвращает страницу результатов полнотекстового поиска постов
+        :param query: Строка поиска
+        :param limit: Размер страницы
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: Искать только среди постов пользователя
+        :param dates: Начало и конец интервала даты создания поста, любая граница может быть None
+        :param after: Раскодированный курсор предыдущей страницы
+        :return: Страница результатов и курсор следующей страницы
+        """
+        # Запрашиваем на одну запись больше, чтобы без COUNT понять, есть ли следующая страница
+        rows = await cls.repo.search(
+            query=query,
+            limit=limit + 1,
+            user_id=user_id,
+            dates=dates,
+            after=after,
+            session=session,
+        )
+
+        next_cursor = None
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_post, last_rank, _ = rows[-1]
+            next_cursor = CursorUtils.encode_rank_cursor(last_rank, last_post.id)
+
+        return PostSearchPageResponse(
+            items=[
+                PostSearchHit.model_validate({"post": post_model, "rank": rank, "headline": headline})
+                for post_model, rank, headline in rows
+            ],
+            next_cursor=next_cursor,
+        )
+
+    @classmethod
+    async def register_model(
+        cls,
+        scheme_in: PostCreate,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+    ) -> PostModel:
+        """
+        Добавляет пост в БД и сбрасывает окно ленты после commit транзакции
+        :param scheme_in: Pydantic Схема - объект, содержащий данные поста
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id автора поста
+        :return: Модель поста, добавленную в БД
+        """
+        post_model = await super().register_model(
+            scheme_in=scheme_in,
+            session=session,
+            user_id=user_id,
+        )
+        feed_window().mark_changed(session)
+
+        return post_model
+
+    @classmethod
+    async def update_model(
+        cls,
+        scheme_in: PostUpdate,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        model_id: Optional[int] = None,
+        partial: bool = False,
+    ) -> Optional[PostModel]:
+        """
+        Изменяет пост в БД и сбрасывает окно ленты после commit транзакции
+        :param scheme_in: Pydantic Схема - объект, содержащий данные поста
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id автора поста
+        :param model_id: id поста
+        :param partial: Флаг частичного обновления
+        :return: Модель поста, обновленную в БД
+        :raises ConflictError: Переданная в схеме версия устарела или пост изменен другим запросом
+        """
+        post_model = await super().update_model(
+            scheme_in=scheme_in,
+            session=session,
+            user_id=user_id,
+            model_id=model_id,
+            partial=partial,
+        )
+        feed_window().mark_changed(session)
+
+        return post_model
+
+    @classmethod
+    async def delete_model(
+        cls,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        model_id: Optional[int] = None,
+    ) -> Optional[PostModel]:
+        """
+        Удаляет пост из БД и сбрасывает окно ленты после commit транзакции
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id автора поста
+        :param model_id: id поста
+        :return: Модель поста, удаленную из БД
+        """
+        post_model = await super().delete_model(
+            session=session,
+            user_id=user_id,
+            model_id=model_id,
+        )
+        feed_window().mark_changed(session)
+
+        return post_model
+
+    @classmethod
+    async def delete_all_models(
+        cls,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+    ) -> Optional[PostModel]:
+        """
+        Удаляет все посты пользователя из БД и сбрасывает окно ленты после commit транзакции
+        :param session: Объект сессии, полученный в качестве аргумента
+        :param user_id: id автора постов
+        :return: Результат удаления
+        """
+        result = await super().delete_all_models(
+            session=session,
+            user_id=user_id,
+        )
+        feed_window().mark_changed(session)
+
+        return result
+
+    @classmethod
+    async def clear_table(
+        cls,
+        session: AsyncSession,
+    ) -> list:
+        """
+        Очищает таблицу постов и сбрасывает окно ленты после commit транзакции
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Пустой список
+        """
+        cleared_table = await super().clear_table(session=session)
+        feed_window().mark_changed(session)
+
+        return cleared_table
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.connector import DBConnector
+from app.repositories import SalesRepo
+from app.schemas import ProductSalesResponse, SalesReportResponse
+from app.service.partition import add_months, month_start
+from app.tools import SalesPeriod
+
+
+class SalesService:
+
+    repo = SalesRepo
+
+    @classmethod
+    async def get_sales_report(
+        cls,
+        dates: tuple[date, date],
+        period: SalesPeriod,
+        session: AsyncSession,
+    ) -> list[SalesReportResponse]:
+        """
+        Возвращает итоги продаж за интервал дней, сгруппированные по периоду
+        :param dates: Первый и последний день интервала включительно
+        :param period: Период группировки
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список итогов по периодам
+        """
+        rows = await cls.repo.get_sales(dates=dates, period=period, session=session)
+        return [SalesReportResponse.model_validate(row) for row in rows]
+
+    @classmethod
+    async def get_product_sales(
+        cls,
+        dates: tuple[date, date],
+        limit: int,
+        session: AsyncSession,
+    ) -> list[ProductSalesResponse]:
+        """
+        Возвращает продукты с наибольшей выручкой за интервал дней
+        :param dates: Первый и последний день интервала включительно
+        :param limit: Количество продуктов
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Список итогов по продуктам
+        """
+        rows = await cls.repo.get_product_sales(dates=dates, limit=limit, session=session)
+        return [ProductSalesResponse.model_validate(row) for row in rows]
+
+    @classmethod
+    async def rebuild(
+        cls,
+        dates: tuple[date, date],
+        connector: DBConnector,
+    ) -> list[tuple[date, date]]:
+        """
+        Пересчитывает итоги интервала дней помесячно, каждый месяц отдельной единицей работы,
+        чтобы пересчет за годы не держал блокировки итогов одной длинной транзакцией.
+        Пересчет месяца удаляет и собирает его итоги заново, поэтому после временной ошибки БД повторяется только он
+        :param dates: Первый и последний день интервала включительно
+        :param connector: Подключение к БД, единицы работы берут соединения из пула background
+        :return: Список пересчитанных интервалов
+        """
+        rebuilt = []
+        start, last = dates
+
+        while start <= last:
+            end = min(add_months(month_start(start), 1).date() - timedelta(days=1), last)
+
+            await connector.run(
+                lambda session: cls.repo.rebuild(dates=(start, end), session=session),
+                operation="sales.rebuild",
+                pool="background",
+                idempotent=True,
+            )
+            rebuilt.append((start, end))
+
+            start = end + timedelta(days=1)
+
+        return rebuilt
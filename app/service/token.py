@@ -1,7 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.service.base import BaseService
 from app.repositories import TokenRepo
+from app.models import RefreshToken as Refresh_model
+from app.schemas import RefreshCreate
 
 
 class TokenService(BaseService[TokenRepo]):
 
-    repo = TokenRepo
\ No newline at end of file
+    repo = TokenRepo
+
+    @classmethod
+    async def rotate_refresh(
+        cls,
+        refresh_scheme: RefreshCreate,
+        session: AsyncSession,
+    ) -> Refresh_model:
+        """
+        Возвращает результат выполнения метода записи (ротации) refresh токена устройства пользователя
+        :param refresh_scheme: Pydantic Схема - объект, содержащий user_id, device_id и хэш токена
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель refresh токена, записанную в БД
+        """
+        return await cls.repo.upsert(
+            refresh_scheme=refresh_scheme,
+            session=session,
+        )
@@ -1,7 +1,7 @@
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.schemas.user import UserUpdate ,UserCreate
+from app.schemas.user import UserUpdate ,UserCreate, UserMeResponse
 from app.service.base import BaseService
 from app.models import User as User_model
 from app.repositories import UserRepo
@@ -27,3 +27,55 @@ class UserService(BaseService[UserRepo]):
         user_model = await cls.repo.get_by_login(login=login, session=session)
 
         return user_model if user_model else None
+
+    @classmethod
+    async def get_user_by_refresh(
+        cls,
+        user_id: int,
+        device_id: str,
+        token_hash: bytes,
+        session: AsyncSession,
+    ) -> Optional[User_model]:
+        """
+        Возвращает модель пользователя по хэшу refresh токена его устройства
+        :param user_id: id пользователя
+        :param device_id: id устройства
+        :param token_hash: SHA-256 хэш refresh токена
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Модель пользователя | None
+        """
+        return await cls.repo.get_by_refresh(
+            user_id=user_id,
+            device_id=device_id,
+            token_hash=token_hash,
+            session=session,
+        )
+
+    @classmethod
+    async def get_me(
+        cls,
+        user_id: int,
+        session: AsyncSession,
+    ) -> Optional[UserMeResponse]:
+        """
+        Возвращает пользователя, его профиль и итоги корзины, полученные одним запросом к БД
+        :param user_id: id пользователя
+        :param session: Объект сессии, полученный в качестве аргумента
+        :return: Pydantic схема UserMeResponse | None
+        """
+        row = await cls.repo.get_me(user_id=user_id, session=session)
+
+        if row is None:
+            return None
+
+        user_model, cart_id, total_price, total_quantity = row
+
+        return UserMeResponse.model_validate({
+            "user": user_model,
+            "profile": user_model.profile,
+            "cart": None if cart_id is None else {
+                "id": cart_id,
+                "total_price": total_price,
+                "total_quantity": total_quantity,
+            },
+        })
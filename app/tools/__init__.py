@@ -1,9 +1,31 @@
+import importlib
+from typing import Any
+
+
 __all__ = [
     "UserRole",
+    "SalesPeriod",
     "HTTPErrors",
     "DatabaseError",
+    "ConflictError",
 ]
 
 
-from app.tools.exeptions import DatabaseError, HTTPErrors
-from app.tools.types import UserRole
+# Модули импортируются при первом обращении к имени: модели импортируют app.tools.types без FastAPI из exeptions
+_EXPORTS = {
+    "UserRole": "app.tools.types",
+    "SalesPeriod": "app.tools.types",
+    "HTTPErrors": "app.tools.exeptions",
+    "DatabaseError": "app.tools.exeptions",
+    "ConflictError": "app.tools.exeptions",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+
+    return value
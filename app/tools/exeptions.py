@@ -1,3 +1,5 @@
+from typing import Any
+
 from fastapi import HTTPException, status
 
 
@@ -7,6 +9,18 @@ class DatabaseError(Exception):
     pass
 
 
+class ConflictError(DatabaseError):
+    """Модель изменена другим запросом после того, как была прочитана."""
+
+    def __init__(self, message: str, current: Any = None) -> None:
+        """
+        :param message: Текст ошибки
+        :param current: ORM модель в текущем состоянии из БД или None, если модель уже удалена
+        """
+        super().__init__(message)
+        self.current = current
+
+
 class HTTPErrors(Exception):
     """Ошибка нахождения данных."""
 
@@ -69,3 +83,33 @@ class HTTPErrors(Exception):
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="Error cleared table",
     )
+
+    deadline_exceeded = HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail="Request deadline exceeded",
+    )
+
+    @staticmethod
+    def conflict(current: Any = None) -> HTTPException:
+        """
+        Ошибка оптимистичной блокировки: модель изменена другим запросом
+        :param current: Текущее состояние модели в виде JSON совместимых данных, клиент повторяет изменение от него
+        :return: HTTPException со статусом 409
+        """
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Model was changed by another request", "current": current},
+        )
+
+    @staticmethod
+    def too_many_requests(retry_after: int) -> HTTPException:
+        """
+        Превышен лимит попыток
+        :param retry_after: Через сколько секунд клиент может повторить запрос
+        :return: HTTPException со статусом 429 и заголовком Retry-After
+        """
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -13,7 +13,18 @@ Repo = TypeVar("Repo", bound="ARepo")
 PDScheme = TypeVar("PDScheme", bound="BaseModel")
 
 
+# Идентификатор устройства, если клиент не передал свой
+DEFAULT_DEVICE_ID = "default"
+
+
 # Определяет возможные роли пользователей
 class UserRole(str, enum.Enum):
     user = "user"
     admin = "admin"
+
+
+# Период, по которому группируются отчеты о продажах
+class SalesPeriod(str, enum.Enum):
+    day = "day"
+    month = "month"
+    year = "year"
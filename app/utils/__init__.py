@@ -1,7 +1,11 @@
 __all__ = [
     "AuthUtils",
     "JWTUtils",
+    "CursorUtils",
+    "ResponseUtils",
 ]
 
 from app.utils.auth import AuthUtils
-from app.utils.jwt import JWTUtils
\ No newline at end of file
+from app.utils.jwt import JWTUtils
+from app.utils.cursor import CursorUtils
+from app.utils.response import ResponseUtils
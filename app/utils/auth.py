@@ -1,3 +1,5 @@
+import hashlib
+
 import bcrypt
 from pydantic import SecretStr
 from app.models.user import User as User_model
@@ -18,6 +20,16 @@ class AuthUtils:
             salt=bcrypt.gensalt(),
         )
 
+    @classmethod
+    def hash_token(cls, token: str) -> bytes:
+        """
+        Хэширует refresh токен для хранения и поиска в БД,
+        токен уже является случайной подписанной строкой, поэтому достаточно быстрого SHA-256 без соли
+        :param token: Токен в виде строки
+        :return: SHA-256 хэш токена (32 байта)
+        """
+        return hashlib.sha256(token.encode()).digest()
+
     @classmethod
     def check_password(
         cls,
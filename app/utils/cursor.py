@@ -0,0 +1,79 @@
+import base64
+from datetime import datetime
+
+
+class CursorUtils:
+    """Содержит служебные утилиты для keyset пагинации по паре (created_at, id) и по паре (rank, id) результатов поиска"""
+
+    @classmethod
+    def encode_cursor(
+        cls,
+        created_at: datetime,
+        model_id: int,
+    ) -> str:
+        """
+        Кодирует позицию последней записи страницы в непрозрачную для клиента строку
+        :param created_at: Дата создания последней записи страницы
+        :param model_id: id последней записи страницы
+        :return: Курсор в виде urlsafe base64 строки
+        """
+        raw = f"{created_at.isoformat()}|{model_id}"
+
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def decode_cursor(
+        cls,
+        cursor: str,
+    ) -> tuple[datetime, int]:
+        """
+        Раскодирует курсор, полученный от клиента
+        :param cursor: Курсор в виде urlsafe base64 строки
+        :return: Кортеж (created_at, id) последней записи предыдущей страницы
+        :raises ValueError: Если курсор поврежден
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, model_id = raw.rsplit("|", 1)
+
+            return datetime.fromisoformat(created_at), int(model_id)
+
+        except ValueError as e:
+            raise ValueError("Invalid cursor") from e
+
+    @classmethod
+    def encode_rank_cursor(
+        cls,
+        rank: float,
+        model_id: int,
+    ) -> str:
+        """
+        Кодирует позицию последнего результата страницы поиска в непрозрачную для клиента строку
+        :param rank: Ранг последнего результата страницы
+        :param model_id: id последнего результата страницы
+        :return: Курсор в виде urlsafe base64 строки
+        """
+        # repr float восстанавливается float() без потери точности, иначе страницы на границе пропускали бы строки
+        raw = f"{rank!r}|{model_id}"
+
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def decode_rank_cursor(
+        cls,
+        cursor: str,
+    ) -> tuple[float, int]:
+        """
+        Раскодирует курсор страницы поиска, полученный от клиента
+        :param cursor: Курсор в виде urlsafe base64 строки
+        :return: Кортеж (rank, id) последнего результата предыдущей страницы
+        :raises ValueError: Если курсор поврежден
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            rank, model_id = raw.rsplit("|", 1)
+
+            return float(rank), int(model_id)
+
+        except ValueError as e:
+            raise ValueError("Invalid cursor") from e
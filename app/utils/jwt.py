@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
+
 import jwt
 from app.models import User as User_model
 from app.core import jwt_settings
+from app.tools.types import DEFAULT_DEVICE_ID
 
 
 
@@ -34,10 +38,12 @@ class JWTUtils:
         user_model: User_model,
         token_type: str,
         expire_minuts: int,
+        extra: Optional[dict] = None,
     ) -> str:
         """
         Создает access или refresh токен, в записимости от полученного типа и срока действия
         :param user: схема пользователя с данными изи БД
+        :param extra: Дополнительные поля payload
         :return: Закодированный токен
         """
         payload = {
@@ -47,6 +53,9 @@ class JWTUtils:
             "is_active": user_model.is_active,
         }
 
+        if extra:
+            payload.update(extra)
+
         payload.update(cls.expire_jwt(expire_minuts=expire_minuts))
 
         return cls.encode_jwt(payload)
@@ -103,14 +112,24 @@ class JWTUtils:
         )
 
     @classmethod
-    def create_refresh_token(cls, user_model: User_model) -> str:
+    def create_refresh_token(
+        cls,
+        user_model: User_model,
+        device_id: str = DEFAULT_DEVICE_ID,
+    ) -> str:
         """
-        Создает конкретно refresh_token
+        Создает конкретно refresh_token, привязанный к устройству пользователя
         :param user: схема пользователя с данными изи БД
+        :param device_id: id устройства, для которого выдается токен
         :return: refresh_token
         """
         return cls.create_jwt(
             user_model=user_model,
             token_type=jwt_settings.refresh_name,
             expire_minuts=jwt_settings.refresh_token_expire,
+            extra={
+                "device": device_id,
+                # Случайный jti гарантирует уникальность хэша даже для токенов, выданных в одну секунду
+                "jti": uuid4().hex,
+            },
         )
@@ -0,0 +1,81 @@
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+class ResponseUtils:
+    """
+    Содержит служебные утилиты для сериализации ответов.
+    TypeAdapter строится один раз на тип (list[OrderResponse], CartResponse, ...) и переиспользуется всеми запросами
+    """
+
+    @classmethod
+    def type_adapter(
+        cls,
+        tp: Any,
+    ) -> TypeAdapter:
+        """
+        Возвращает закешированный TypeAdapter для типа ответа
+        :param tp: Тип ответа, например list[OrderResponse]
+        :return: TypeAdapter
+        """
+        return _type_adapter(tp)
+
+    @classmethod
+    def validate(
+        cls,
+        tp: Any,
+        content: Any,
+    ) -> Any:
+        """
+        Валидирует объекты SQLAlchemy или схемы по типу ответа одним вызовом pydantic-core
+        :param tp: Тип ответа
+        :param content: Объект или список объектов
+        :return: Схема или список схем
+        """
+        return _type_adapter(tp).validate_python(content, from_attributes=True)
+
+    @classmethod
+    def dump_json(
+        cls,
+        tp: Any,
+        content: Any,
+    ) -> bytes:
+        """
+        Валидирует содержимое по типу ответа и сериализует его сразу в JSON байты, минуя промежуточные dict и json.dumps
+        :param tp: Тип ответа
+        :param content: Объект или список объектов
+        :return: JSON в виде байт
+        """
+        adapter = _type_adapter(tp)
+
+        return adapter.dump_json(
+            adapter.validate_python(content, from_attributes=True),
+            by_alias=True,
+        )
+
+    @classmethod
+    def dump_python(
+        cls,
+        tp: Any,
+        content: Any,
+    ) -> Any:
+        """
+        Валидирует содержимое по типу ответа и возвращает JSON совместимые данные, например для detail в HTTPException
+        :param tp: Тип ответа
+        :param content: Объект или список объектов
+        :return: dict, list или скалярное значение
+        """
+        adapter = _type_adapter(tp)
+
+        return adapter.dump_python(
+            adapter.validate_python(content, from_attributes=True),
+            mode="json",
+            by_alias=True,
+        )
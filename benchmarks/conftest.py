@@ -0,0 +1,202 @@
+"""
+Микробенчмарки слоя репозиториев:
+
+    python -m pytest benchmarks -q
+    TEST_DB_URL=postgresql+asyncpg://... python -m pytest benchmarks -q --bench-json results.json
+    TEST_DB_URL=postgresql+asyncpg://... python -m pytest benchmarks/test_posts.py -q --bench-posts 10000000
+
+Каждый метод выполняется на SQLite в памяти (aiosqlite, схема из Base.metadata) и на PostgreSQL, если задан TEST_DB_URL.
+ВНИМАНИЕ: все таблицы в БД TEST_DB_URL удаляются и создаются заново
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import MetaData, Text, event, insert, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.models import Base
+from benchmarks.recorder import Measurement, Recorder
+
+
+TEST_DB_URL = os.getenv("TEST_DB_URL")
+
+USERS = 50
+PRODUCTS = 100
+POSTS_PER_USER = 20
+ORDERS_PER_USER = 20
+LINES_PER_ORDER = 3
+PRODUCTS_PER_CART = 5
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--bench-repeat", type=int, default=20, help="calls per measured repository method")
+    parser.addoption("--bench-json", help="save measurements to a JSON file")
+    parser.addoption("--bench-posts", type=int, default=1_000_000, help="posts in the feed and search benchmark table")
+
+
+@pytest.fixture(scope="session")
+def loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def sqlite_metadata() -> MetaData:
+    """
+    Копия Base.metadata для SQLite: первичный ключ секционированных таблиц составной (id, created_at),
+    а SQLite не поддерживает autoincrement в составном ключе, поэтому id в них задается явно.
+    Колонки tsvector хранятся как текст, функции их вычисления регистрируются в configure_sqlite
+    """
+    metadata = MetaData()
+
+    for table in Base.metadata.sorted_tables:
+        table = table.to_metadata(metadata)
+
+        if len(table.primary_key.columns) > 1:
+            table.c.id.autoincrement = False
+
+        for column in table.columns:
+            if isinstance(column.type, TSVECTOR):
+                column.type = Text()
+
+    return metadata
+
+
+def seed_rows() -> dict[str, list[dict]]:
+    """Одинаковые данные для обеих БД, created_at растет вместе с id"""
+    now = datetime.now(timezone.utc)
+    rows: dict[str, list[dict]] = {table: [] for table in Base.metadata.tables}
+
+    for user_id in range(1, USERS + 1):
+        created_at = now - timedelta(hours=USERS - user_id)
+        rows["users"].append(
+            {"id": user_id, "login": f"user{user_id}@example.com", "password": b"\x00",
+             "role": "user", "created_at": created_at, "updated_at": created_at}
+        )
+        rows["carts"].append({"id": user_id, "user_id": user_id, "created_at": created_at, "updated_at": created_at})
+
+        for k in range(PRODUCTS_PER_CART):
+            rows["cart_products"].append(
+                {"id": len(rows["cart_products"]) + 1, "cart_id": user_id,
+                 "product_id": 1 + (user_id * 7 + k) % PRODUCTS, "quantity": 1 + k, "current_price": 100,
+                 "created_at": created_at, "updated_at": created_at}
+            )
+
+    for product_id in range(1, PRODUCTS + 1):
+        created_at = now - timedelta(hours=PRODUCTS - product_id)
+        rows["products"].append(
+            {"id": product_id, "name": f"product {product_id}", "description": f"description {product_id}",
+             "price": 100 + product_id, "created_at": created_at, "updated_at": created_at}
+        )
+
+    for post_id in range(1, USERS * POSTS_PER_USER + 1):
+        created_at = now - timedelta(minutes=USERS * POSTS_PER_USER - post_id)
+        rows["posts"].append(
+            {"id": post_id, "user_id": 1 + post_id % USERS, "title": f"title {post_id}",
+             "body": f"body of post {post_id}", "created_at": created_at, "updated_at": created_at}
+        )
+
+    for order_id in range(1, USERS * ORDERS_PER_USER + 1):
+        created_at = now - timedelta(minutes=USERS * ORDERS_PER_USER - order_id)
+        rows["orders"].append(
+            {"id": order_id, "user_id": 1 + order_id % USERS, "original_price": 300, "discount": 0,
+             "total_price": 300, "total_quantity": LINES_PER_ORDER, "created_at": created_at, "updated_at": created_at}
+        )
+
+        for k in range(LINES_PER_ORDER):
+            rows["order_products"].append(
+                {"id": len(rows["order_products"]) + 1, "order_id": order_id, "created_at": created_at,
+                 "product_id": 1 + (order_id * 11 + k) % PRODUCTS, "quantity": 1, "current_price": 100,
+                 "updated_at": created_at}
+            )
+
+    return {table: table_rows for table, table_rows in rows.items() if table_rows}
+
+
+async def prepare(engine: AsyncEngine) -> None:
+    metadata = sqlite_metadata() if engine.dialect.name == "sqlite" else Base.metadata
+    rows = seed_rows()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+        for table in metadata.sorted_tables:
+            table_rows = rows.get(table.name)
+
+            if table_rows:
+                await conn.execute(insert(table), table_rows)
+
+                # Строки вставлены с явными id, последовательность продолжает нумерацию после них
+                if engine.dialect.name == "postgresql":
+                    await conn.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                            f"(SELECT max(id) FROM {table.name}))"
+                        )
+                    )
+
+
+@pytest.fixture(scope="session", params=["sqlite", "postgresql"])
+def engine(request: pytest.FixtureRequest, loop: asyncio.AbstractEventLoop) -> AsyncEngine:
+    if request.param == "postgresql":
+        if not TEST_DB_URL:
+            pytest.skip("TEST_DB_URL is not set")
+
+        engine = create_async_engine(TEST_DB_URL)
+    else:
+        engine = create_async_engine("sqlite+aiosqlite://")
+
+        # ON DELETE CASCADE в SQLite работает только с включенными внешними ключами,
+        # char_length из CHECK ограничения orders и функции вычисляемой колонки posts.search_vector в SQLite отсутствуют
+        @event.listens_for(engine.sync_engine, "connect")
+        def configure_sqlite(dbapi_connection, connection_record) -> None:
+            dbapi_connection.create_function("char_length", 1, len, deterministic=True)
+            dbapi_connection.create_function("to_tsvector", 2, lambda config, value: value, deterministic=True)
+            dbapi_connection.create_function("setweight", 2, lambda vector, weight: vector, deterministic=True)
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    loop.run_until_complete(prepare(engine))
+    yield engine
+    # Потоки aiosqlite не являются daemon, без dispose процесс не завершится
+    loop.run_until_complete(engine.dispose())
+
+
+# Замеры всех тестов сессии, выводятся в итоговом отчете pytest
+MEASUREMENTS: list[Measurement] = []
+
+
+@pytest.fixture
+def recorder(request: pytest.FixtureRequest, engine: AsyncEngine) -> Recorder:
+    recorder = Recorder(engine, repeat=request.config.getoption("--bench-repeat"))
+    yield recorder
+    MEASUREMENTS.extend(recorder.results)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    if not MEASUREMENTS:
+        return
+
+    terminalreporter.write_sep("-", "repository benchmarks")
+    terminalreporter.write_line(
+        f"{'method':<48}{'dialect':>12}{'statements':>12}{'rows':>8}{'commits':>9}{'ms':>10}"
+    )
+
+    for m in MEASUREMENTS:
+        terminalreporter.write_line(
+            f"{m.name:<48}{m.dialect:>12}{m.statements:>12}{m.rows:>8}{m.commits:>9}{m.wall_ms:>10.2f}"
+        )
+
+    path = config.getoption("--bench-json")
+
+    if path:
+        with open(path, "w") as file:
+            json.dump([asdict(m) for m in MEASUREMENTS], file, indent=2)
@@ -0,0 +1,335 @@
+"""
+Нагрузочный прогон основных пользовательских сценариев:
+
+    python -m benchmarks.load seed --scale 20000 --reset
+    python -m benchmarks.load run --journeys 200 --concurrency 20
+    python -m benchmarks.load compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+seed наполняет БД из DB_URL (схема должна быть создана alembic upgrade head) пользователями, продуктами,
+корзинами, постами и заказами, --reset предварительно очищает таблицы. ВНИМАНИЕ: используйте отдельную БД.
+
+run выполняет сценарии регистрация -> вход -> корзина -> добавление продуктов -> оформление заказа -> история заказов
+асинхронным клиентом httpx. По умолчанию запросы идут в ASGI приложение main.app в том же процессе,
+с --base-url - в запущенный сервер. Все сценарии входят с одного адреса, поэтому серверу для прогона нужен
+RATE_LIMIT_LOGIN_PER_IP не меньше --journeys, в процессе лимит поднимается сам. По каждому маршруту считаются пропускная способность, p50/p95/p99 и ошибки,
+результат сохраняется в JSON для сравнения между коммитами командой compare
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.core import db_connector
+from app.service import PartitionService
+from tests.seed import seed_database, seed_sizes
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Таблицы, очищаемые перед наполнением, секции orders и order_products очищаются вместе с родителем
+SEED_TABLES = (
+    "users",
+    "products",
+    "profiles",
+    "carts",
+    "cart_products",
+    "posts",
+    "orders",
+    "order_products",
+    "refresh_tokens",
+    "sales_daily",
+    "sales_daily_products",
+)
+
+PASSWORD = "load-test-password"
+
+
+class Stats:
+    """Задержки и ошибки запросов, сгруппированные по маршрутам"""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        expected: int,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Выполняет запрос и записывает его задержку в миллисекундах
+        :param client: HTTP клиент
+        :param route: Метод и шаблон пути, например "POST /user/cart/"
+        :param expected: Ожидаемый код ответа, остальные считаются ошибками
+        :param kwargs: Аргументы httpx.AsyncClient.request
+        :return: Ответ
+        """
+        method, url = route.split(" ", 1)
+        url = kwargs.pop("url", url)
+
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            raise
+        finally:
+            self.latencies[route].append((time.perf_counter() - start) * 1000)
+
+        if response.status_code != expected:
+            self.errors[route] += 1
+
+        return response
+
+    def report(self, elapsed: float) -> dict[str, dict[str, float]]:
+        """
+        Сводка по маршрутам
+        :param elapsed: Длительность прогона в секундах
+        :return: Словарь маршрут -> requests, errors, rps, p50, p95, p99, max (задержки в мс)
+        """
+        routes = {}
+
+        for route, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            routes[route] = {
+                "requests": len(latencies),
+                "errors": self.errors[route],
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2),
+            }
+
+        return routes
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Перцентиль методом ближайшего ранга по отсортированному списку"""
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+async def journey(
+    client: httpx.AsyncClient,
+    stats: Stats,
+    login: str,
+    product_ids: list[int],
+    products_per_order: int,
+) -> None:
+    """Сценарий одного пользователя: регистрация, вход, корзина, оформление заказа, история заказов"""
+    await stats.request(
+        client, "POST /user/auth/", 201, json={"login": login, "password": PASSWORD}
+    )
+    response = await stats.request(
+        client,
+        "POST /user/auth/login",
+        200,
+        data={"username": login, "password": PASSWORD},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    await stats.request(client, "GET /user/cart/", 200, headers=headers)
+
+    for product_id in random.sample(product_ids, products_per_order):
+        await stats.request(
+            client,
+            "POST /user/cart/",
+            200,
+            headers=headers,
+            json={"product_id": product_id, "quantity": random.randint(1, 3)},
+        )
+
+    await stats.request(client, "POST /user/orders/", 201, headers=headers, json={})
+    await stats.request(client, "GET /user/orders/all", 200, headers=headers)
+
+
+async def get_product_ids() -> list[int]:
+    async with db_connector.session_factory() as session:
+        result = await session.execute(
+            text("SELECT id FROM products ORDER BY random() LIMIT 1000")
+        )
+        return list(result.scalars().all())
+
+
+async def seed(args: argparse.Namespace) -> dict[str, int]:
+    try:
+        async with db_connector.engine.begin() as conn:
+            if args.reset:
+                await conn.execute(
+                    text(f"TRUNCATE {', '.join(SEED_TABLES)} RESTART IDENTITY CASCADE")
+                )
+
+        # Заказы наполнения создаются с шагом 10 минут в прошлое, секции нужны на весь этот интервал
+        oldest = datetime.now(timezone.utc) - timedelta(minutes=10 * seed_sizes(args.scale)["orders"])
+
+        await PartitionService.ensure_partitions(connector=db_connector, since=oldest)
+
+        return await seed_database(engine=db_connector.engine, scale=args.scale)
+
+    finally:
+        await db_connector.dispose()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        product_ids = await get_product_ids()
+    finally:
+        await db_connector.engine.dispose()
+
+    if len(product_ids) < args.products_per_order:
+        raise SystemExit("not enough products, run `python -m benchmarks.load seed` first")
+
+    if args.base_url:
+        transport = httpx.AsyncHTTPTransport()
+        base_url = args.base_url
+    else:
+        from main import app
+        from app.core import rate_limit_settings
+
+        # Все сценарии входят с одного адреса клиента ASGITransport
+        rate_limit_settings.login_per_ip = max(rate_limit_settings.login_per_ip, args.journeys)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://load"
+
+    stats = Stats()
+    run_id = uuid.uuid4().hex[:8]
+    journeys = iter(range(args.journeys))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for number in journeys:
+            try:
+                await journey(
+                    client,
+                    stats,
+                    f"load-{run_id}-{number}@example.com",
+                    product_ids,
+                    args.products_per_order,
+                )
+            except (httpx.HTTPError, KeyError, ValueError):
+                # Ошибка уже учтена в статистике маршрута, сценарий пользователя прерывается
+                continue
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    if not args.base_url:
+        await db_connector.engine.dispose()
+
+    routes = stats.report(elapsed)
+    requests = sum(route["requests"] for route in routes.values())
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "journeys": args.journeys,
+            "concurrency": args.concurrency,
+            "products_per_order": args.products_per_order,
+            "base_url": args.base_url,
+        },
+        "elapsed": round(elapsed, 3),
+        "requests": requests,
+        "errors": sum(route["errors"] for route in routes.values()),
+        "rps": round(requests / elapsed, 2),
+        "routes": routes,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result: dict[str, Any]) -> None:
+    print(f"{'route':<24}{'requests':>9}{'errors':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+
+    for route, row in result["routes"].items():
+        print(
+            f"{route:<24}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+            f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+        )
+
+    print(
+        f"total: {result['requests']} requests, {result['errors']} errors, "
+        f"{result['rps']} rps in {result['elapsed']} s"
+    )
+
+
+def compare(old: dict[str, Any], new: dict[str, Any]) -> None:
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    print(f"{'route':<24}{'rps':>16}{'p50':>16}{'p95':>16}{'p99':>16}")
+
+    for route in sorted(old["routes"].keys() & new["routes"].keys()):
+        cells = []
+
+        for key in ("rps", "p50", "p95", "p99"):
+            before, after = old["routes"][route][key], new["routes"][route][key]
+            change = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{after:>8.1f} {change:>+6.1f}%")
+
+        print(f"{route:<24}" + "".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="fill the database from DB_URL with generated data")
+    seed_parser.add_argument("--scale", type=int, default=20000, help="number of orders, other tables scale from it")
+    seed_parser.add_argument("--reset", action="store_true", help="truncate tables before seeding")
+
+    run_parser = commands.add_parser("run", help="run user journeys and save results")
+    run_parser.add_argument("--journeys", type=int, default=200)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--products-per-order", type=int, default=3)
+    run_parser.add_argument("--base-url", help="running server, by default requests go to main.app in process")
+    run_parser.add_argument("--output", type=Path, help="results file, by default benchmarks/results/<commit>.json")
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        for table, rows in asyncio.run(seed(args)).items():
+            print(f"{table}: {rows}")
+
+    elif args.command == "run":
+        result = asyncio.run(run(args))
+        print_result(result)
+
+        output = args.output or RESULTS_DIR / f"{result['commit'] or 'results'}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2))
+        print(f"saved to {output}")
+
+    else:
+        compare(json.loads(args.old.read_text()), json.loads(args.new.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Пропускная способность чтения корзины с циклом событий asyncio и uvloop:
+
+    python -m benchmarks.loops --user-id 1 --duration 10 --concurrency 64
+
+Для каждого цикла запускается python -m app.serve с одним процессом и SERVER_LOOP=<цикл>, после чего
+клиент в течение --duration секунд отправляет GET /user/cart/ от пользователя --user-id в --concurrency
+параллельных запросов. Сервер работает с БД из DB_URL, пользователь должен в ней существовать.
+HTTP парсер одинаковый для обоих прогонов (SERVER_HTTP, по умолчанию httptools, если установлен).
+Если uvloop не установлен, его прогон пропускается
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import httpx
+
+from app.tools import UserRole
+from app.utils.jwt import JWTUtils
+from benchmarks.load import Stats
+
+
+ROUTE = "GET /user/cart/"
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"server exited with code {server.returncode}")
+
+        try:
+            await client.get("/metrics/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+
+    raise SystemExit("server did not start")
+
+
+async def load(args: argparse.Namespace, server: subprocess.Popen) -> dict[str, Any]:
+    user = SimpleNamespace(id=args.user_id, role=UserRole.user, is_active=True)
+    headers = {"Authorization": f"Bearer {JWTUtils.create_access_token(user_model=user)}"}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    stats = Stats()
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        await wait_ready(client, server)
+
+        # Прогрев: соединения клиента и пула сервера, подготовленные запросы
+        for _ in range(args.concurrency):
+            await client.get("/user/cart/", headers=headers)
+
+        deadline = time.monotonic() + args.duration
+
+        async def worker() -> None:
+            while time.monotonic() < deadline:
+                try:
+                    await stats.request(client, ROUTE, 200, headers=headers)
+                except httpx.HTTPError:
+                    continue
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return stats.report(elapsed)[ROUTE]
+
+
+def run_loop(args: argparse.Namespace, loop: str) -> Optional[dict[str, Any]]:
+    if loop == "uvloop" and importlib.util.find_spec("uvloop") is None:
+        return None
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", "1", "--host", "127.0.0.1", "--port", str(args.port)],
+        env={**os.environ, "SERVER_LOOP": loop},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        return asyncio.run(load(args, server))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loops")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {loop: run_loop(args, loop) for loop in ("asyncio", "uvloop")}
+
+    print(f"{'loop':<10}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+
+    for loop, row in results.items():
+        if row is None:
+            print(f"{loop:<10}  not installed")
+            continue
+
+        print(
+            f"{loop:<10}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+            f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+        )
+
+    if results["asyncio"] and results["uvloop"]:
+        print(f"uvloop / asyncio: {results['uvloop']['rps'] / results['asyncio']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Память процессов-обработчиков при обычном запуске и при запуске с --preload:
+
+    python -m benchmarks.memory --workers 4 --user-id 1
+
+Для каждого режима запускается python -m app.serve, клиент отправляет --requests запросов GET /user/cart/,
+чтобы каждый процесс прогрел пул и кэши, затем по /proc/<pid>/smaps_rollup каждого процесса-обработчика
+считаются USS (Private_Clean + Private_Dirty, память только этого процесса), PSS и RSS.
+С --preload страницы с импортированным приложением общие с родителем, поэтому USS процессов меньше.
+Работает только в Linux, сервер подключается к БД из DB_URL
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+from app.tools import UserRole
+from app.utils.jwt import JWTUtils
+
+
+FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def memory(pid: int) -> dict[str, int]:
+    """Поля smaps_rollup процесса в килобайтах"""
+    values = {}
+
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        name, _, value = line.partition(":")
+
+        if name in FIELDS:
+            values[name] = int(value.split()[0])
+
+    return values
+
+
+def workers(parent: int) -> list[int]:
+    """Процессы-обработчики сервера: дочерние процессы, которые слушают сокет, а не служебные multiprocessing"""
+    children = Path(f"/proc/{parent}/task/{parent}/children").read_text().split()
+
+    return [
+        int(pid) for pid in children
+        if b"multiprocessing.resource_tracker" not in Path(f"/proc/{pid}/cmdline").read_bytes()
+    ]
+
+
+async def warm(args: argparse.Namespace, server: subprocess.Popen) -> None:
+    user = SimpleNamespace(id=args.user_id, role=UserRole.user, is_active=True)
+    headers = {"Authorization": f"Bearer {JWTUtils.create_access_token(user_model=user)}"}
+    deadline = time.monotonic() + 60
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30) as client:
+        while True:
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise SystemExit("server did not start")
+
+            try:
+                await client.get("/metrics/")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+
+        # Новые соединения распределяются ядром между процессами, отдельный клиент на каждый запрос
+        for _ in range(args.requests):
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30) as request_client:
+                response = await request_client.get("/user/cart/", headers=headers)
+
+            if response.status_code != 200:
+                raise SystemExit(f"GET /user/cart/ returned {response.status_code}: {response.text}")
+
+
+def measure(args: argparse.Namespace, preload: bool) -> list[dict[str, int]]:
+    command = [
+        sys.executable, "-m", "app.serve",
+        "--workers", str(args.workers), "--host", "127.0.0.1", "--port", str(args.port),
+    ]
+
+    if preload:
+        command.append("--preload")
+
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        asyncio.run(warm(args, server))
+        return [memory(pid) for pid in workers(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("/proc/<pid>/smaps_rollup is required")
+
+    print(f"{'mode':<10}{'workers':>8}{'USS MiB':>10}{'PSS MiB':>10}{'RSS MiB':>10}{'total USS':>11}")
+
+    for mode, preload in (("spawn", False), ("preload", True)):
+        rows = measure(args, preload)
+        uss = [row["Private_Clean"] + row["Private_Dirty"] for row in rows]
+
+        print(
+            f"{mode:<10}{len(rows):>8}{statistics.median(uss) / 1024:>10.1f}"
+            f"{statistics.median(row['Pss'] for row in rows) / 1024:>10.1f}"
+            f"{statistics.median(row['Rss'] for row in rows) / 1024:>10.1f}"
+            f"{sum(uss) / 1024:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
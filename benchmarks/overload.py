@@ -0,0 +1,165 @@
+"""
+Полезная пропускная способность (goodput) при перегрузке с AdmissionMiddleware и без него:
+
+    python -m benchmarks.overload --pool-size 4 --db-time 0.05 --duration 10
+
+Медленный PostgreSQL моделируется маршрутом, который держит соединение из пула --db-time секунд (pg_sleep),
+поэтому пропускная способность сервера - pool-size / db-time запросов в секунду. Клиент отправляет запросы
+с постоянной частотой (открытая модель нагрузки: новые запросы не ждут ответов на старые) 1x и 3x от нее,
+каждый запрос с X-Request-Timeout --timeout. Goodput - ответы 200, полученные до срока, в секунду.
+Без ограничения очередь пула растет, запросы получают соединение, когда их срок почти истек, и goodput падает,
+с ограничением лишние запросы сразу получают 503 и goodput остается около пропускной способности.
+Приложение работает в том же процессе, БД из DB_URL
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Annotated, Optional
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.middleware import AdmissionMiddleware
+from app.api.response import PydanticRoute
+from app.core.connector import DBConnector
+
+
+def make_app(connector: DBConnector, db_time: float, admission: bool) -> FastAPI:
+    router = APIRouter(route_class=PydanticRoute)
+
+    @router.get("/slow", response_model=dict)
+    async def slow(
+        session: Annotated[AsyncSession, Depends(connector.get_session, scope="function")],
+    ) -> dict:
+        await session.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": db_time})
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    if admission:
+        app.add_middleware(AdmissionMiddleware)
+
+    return app
+
+
+async def request(client: httpx.AsyncClient, timeout: float) -> tuple[str, float]:
+    started = time.perf_counter()
+
+    try:
+        # Клиент ждет немного дольше срока, чтобы получить 504 сервера, а не оборвать запрос сам
+        response = await asyncio.wait_for(
+            client.get("/slow", headers={"X-Request-Timeout": str(timeout)}),
+            timeout=timeout + 0.5,
+        )
+        status = str(response.status_code)
+
+    except asyncio.TimeoutError:
+        status = "timeout"
+
+    return status, time.perf_counter() - started
+
+
+async def run(
+    url: str,
+    pool_size: int,
+    db_time: float,
+    admission: bool,
+    rate: float,
+    duration: float,
+    timeout: float,
+) -> dict:
+    """
+    Отправляет запросы с частотой rate в течение duration секунд
+    :return: Предложенная нагрузка, goodput, число ответов по кодам и задержки успешных ответов в миллисекундах
+    """
+    pools = {
+        pool: {"pool_size": pool_size, "max_overflow": 0, "pool_timeout": 30.0}
+        for pool in ("interactive", "admin", "background")
+    }
+    connector = DBConnector(url=url, echo=False, pools=pools)
+    app = make_app(connector, db_time, admission)
+    loop = asyncio.get_running_loop()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            limits=limits,
+            timeout=None,
+        ) as client:
+            await connector.warm_up(connections=pool_size)
+
+            tasks = []
+            started = loop.time()
+
+            for i in range(int(rate * duration)):
+                await asyncio.sleep(max(0.0, started + i / rate - loop.time()))
+                tasks.append(asyncio.create_task(request(client, timeout)))
+
+            results = await asyncio.gather(*tasks)
+
+    finally:
+        await connector.dispose()
+
+    statuses: dict[str, int] = {}
+
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    good = sorted(elapsed * 1000 for status, elapsed in results if status == "200" and elapsed <= timeout)
+
+    return {
+        "offered": rate,
+        "goodput": len(good) / duration,
+        "statuses": statuses,
+        "p50": statistics.median(good) if good else None,
+        "p99": good[int(len(good) * 0.99) - 1] if good else None,
+    }
+
+
+def format_ms(value: Optional[float]) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def main() -> None:
+    from app.core import db_settings
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.overload")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--db-time", type=float, default=0.05, help="seconds each request holds a connection")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=1.0, help="request deadline, X-Request-Timeout")
+    parser.add_argument("--overload", type=float, nargs="+", default=[1, 3])
+    args = parser.parse_args()
+
+    capacity = args.pool_size / args.db_time
+    print(f"capacity {capacity:.0f} rps")
+    print(f"{'admission':<11}{'load':>6}{'offered':>9}{'goodput':>9}{'p50 ms':>8}{'p99 ms':>8}  statuses")
+
+    for admission in (False, True):
+        for overload in args.overload:
+            result = asyncio.run(
+                run(
+                    url=db_settings.url,
+                    pool_size=args.pool_size,
+                    db_time=args.db_time,
+                    admission=admission,
+                    rate=capacity * overload,
+                    duration=args.duration,
+                    timeout=args.timeout,
+                )
+            )
+            print(
+                f"{'on' if admission else 'off':<11}{overload:>5g}x{result['offered']:>9.0f}{result['goodput']:>9.1f}"
+                f"{format_ms(result['p50']):>8}{format_ms(result['p99']):>8}  {result['statuses']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.models import Base
+
+
+@dataclass
+class Measurement:
+    """Результат замера одного метода репозитория, statements, rows и commits - за один вызов"""
+
+    name: str
+    dialect: str
+    statements: int
+    rows: int
+    wall_ms: float
+    commits: int = 0
+    statements_text: list[str] = field(default_factory=list, repr=False)
+
+
+class Recorder:
+    """
+    Замеряет вызовы методов репозитория: выданные драйверу запросы, созданные из строк ORM объекты и время.
+    Каждый вызов выполняется в новой сессии, чтобы объекты гидрировались заново, а не брались из identity map.
+    Сессии, привязанные к соединению с открытой транзакцией, видят ее данные и не фиксируют их
+    """
+
+    def __init__(self, engine: Union[AsyncEngine, AsyncConnection], repeat: int) -> None:
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.repeat = repeat
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        self.results: list[Measurement] = []
+        self._recording = False
+        self._statements: list[str] = []
+        self._rows = 0
+        self._commits = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self._recording:
+            self._statements.append(statement)
+
+    def _on_load(self, target, context) -> None:
+        if self._recording:
+            self._rows += 1
+
+    def _on_commit(self, conn) -> None:
+        if self._recording:
+            self._commits += 1
+
+    async def measure(
+        self,
+        name: str,
+        call: Callable[[AsyncSession, Any], Awaitable[Any]],
+        setup: Optional[Callable[[AsyncSession], Awaitable[Any]]] = None,
+    ) -> Measurement:
+        """
+        Вызывает метод repeat раз и возвращает медиану времени, запросы и строки последнего вызова
+        :param name: Название замера в отчете
+        :param call: Вызов метода, получает сессию и результат setup
+        :param setup: Подготовка данных в той же сессии, в замер не входит
+        :return: Measurement
+        """
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(Base, "load", self._on_load, propagate=True)
+        event.listen(self.engine.sync_engine, "commit", self._on_commit)
+
+        timings = []
+        try:
+            for _ in range(self.repeat):
+                async with self.session_factory() as session:
+                    prepared = await setup(session) if setup else None
+
+                    self._statements, self._rows, self._commits = [], 0, 0
+                    self._recording = True
+                    start = time.perf_counter()
+                    try:
+                        await call(session, prepared)
+                    finally:
+                        timings.append((time.perf_counter() - start) * 1000)
+                        self._recording = False
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+            event.remove(Base, "load", self._on_load)
+            event.remove(self.engine.sync_engine, "commit", self._on_commit)
+
+        # Начало и конец транзакции не являются запросами метода
+        statements = [
+            statement for statement in self._statements
+            if statement.strip().upper() not in ("BEGIN", "COMMIT", "ROLLBACK")
+        ]
+        measurement = Measurement(
+            name=name,
+            dialect=self.dialect,
+            statements=len(statements),
+            rows=self._rows,
+            wall_ms=statistics.median(timings),
+            commits=self._commits,
+            statements_text=statements,
+        )
+        self.results.append(measurement)
+
+        return measurement
@@ -0,0 +1,171 @@
+"""
+Сравнение сериализации списков заказов и корзин стандартным путем FastAPI и путем PydanticRoute:
+
+    python -m benchmarks.serialization --sizes 1000 10000 --repeat 5
+
+Стандартный путь: serialize_response (валидация по response_model и dump_python в dict) и json.dumps в JSONResponse.
+Путь PydanticRoute: валидация закешированным TypeAdapter и TypeAdapter.dump_json сразу в байты.
+Модели SQLAlchemy строятся в памяти без БД, поэтому измеряется только сериализация
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.api.response import PydanticJSONResponse
+from app.models import (
+    Cart as Cart_model,
+    CartProduct as Cart_Product_model,
+    Order as Order_model,
+    OrderProducts as OrderProducts_model,
+    Product as Product_model,
+)
+from app.schemas import CartResponse, OrderResponse
+from app.utils import ResponseUtils
+
+
+def build_products(count: int) -> list[Product_model]:
+    now = datetime.now(timezone.utc)
+
+    return [
+        Product_model(
+            id=i,
+            name=f"product {i}",
+            description=f"description of product {i}",
+            price=100 + i,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def build_orders(size: int, products: list[Product_model], lines: int) -> list[Order_model]:
+    now = datetime.now(timezone.utc)
+    orders = []
+
+    for i in range(1, size + 1):
+        created_at = now - timedelta(minutes=i)
+        items = [
+            OrderProducts_model(
+                id=i * lines + j,
+                order_id=i,
+                created_at=created_at,
+                product_id=product.id,
+                product=product,
+                quantity=j + 1,
+                current_price=product.price,
+            )
+            for j, product in enumerate(products[i % len(products):][:lines])
+        ]
+        orders.append(
+            Order_model(
+                id=i,
+                user_id=i,
+                promo_code=None,
+                comment=None,
+                products=items,
+                total_price=sum(item.quantity * item.current_price for item in items),
+                total_quantity=sum(item.quantity for item in items),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+        )
+
+    return orders
+
+
+def build_carts(size: int, products: list[Product_model], lines: int) -> list[Cart_model]:
+    now = datetime.now(timezone.utc)
+
+    return [
+        Cart_model(
+            id=i,
+            user_id=i,
+            products=[
+                Cart_Product_model(
+                    cart_id=i,
+                    product_id=product.id,
+                    product=product,
+                    quantity=j + 1,
+                    current_price=product.price,
+                )
+                for j, product in enumerate(products[i % len(products):][:lines])
+            ],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def fastapi_default(response_model: Any) -> Callable[[Any], Awaitable[bytes]]:
+    field = APIRoute("/", lambda: None, response_model=response_model).response_field
+
+    async def render(content: Any) -> bytes:
+        value = await serialize_response(
+            field=field, response_content=content, is_coroutine=True
+        )
+        return JSONResponse(value).body
+
+    return render
+
+
+def pydantic_route(response_model: Any) -> Callable[[Any], Awaitable[bytes]]:
+    async def render(content: Any) -> bytes:
+        return PydanticJSONResponse(ResponseUtils.dump_json(response_model, content)).body
+
+    return render
+
+
+async def measure(render: Callable[[Any], Awaitable[bytes]], content: Any, repeat: int) -> tuple[float, bytes]:
+    """Лучшее время из repeat прогонов в миллисекундах и тело ответа"""
+    body = await render(content)
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await render(content)
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000, body
+
+
+async def run(args: argparse.Namespace) -> None:
+    products = build_products(100)
+
+    print(f"{'list':<22}{'size':>7}{'fastapi, ms':>14}{'pydantic, ms':>14}{'speedup':>9}{'body, KiB':>11}")
+
+    for size in args.sizes:
+        cases = (
+            ("list[OrderResponse]", list[OrderResponse], build_orders(size, products, args.lines)),
+            ("list[CartResponse]", list[CartResponse], build_carts(size, products, args.lines)),
+        )
+
+        for name, response_model, content in cases:
+            default_ms, default_body = await measure(fastapi_default(response_model), content, args.repeat)
+            fast_ms, fast_body = await measure(pydantic_route(response_model), content, args.repeat)
+            assert default_body == fast_body, "responses differ"
+
+            print(
+                f"{name:<22}{size:>7}{default_ms:>14.1f}{fast_ms:>14.1f}"
+                f"{default_ms / fast_ms:>8.1f}x{len(fast_body) / 1024:>11.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--lines", type=int, default=3, help="line items per order and cart")
+    parser.add_argument("--repeat", type=int, default=5)
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
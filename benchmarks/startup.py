@@ -0,0 +1,88 @@
+"""
+Задержка первых запросов нового процесса приложения:
+
+    python -m benchmarks.startup --requests 5
+    python -m benchmarks.startup --requests 5 --warm
+
+Процесс импортирует main.app и отправляет запросы GET /user/cart/ от пользователя с id 1 в ASGI приложение.
+С --warm перед запросами выполняется lifespan приложения, как при запуске uvicorn, без него соединения пула
+открываются и запросы подготавливаются первыми запросами. Запросы идут в БД из DB_URL, в ней должен быть
+пользователь с id 1. Результат - JSON с временем, новыми соединениями и запросами к БД каждого запроса.
+Каждый замер нужно запускать в новом процессе: мапперы ORM и кэши запросов живут до его завершения
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from contextlib import AsyncExitStack
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+from sqlalchemy import event
+
+from app.api.lifespan import lifespan
+from app.core import db_connector
+from app.tools import UserRole
+from app.utils.jwt import JWTUtils
+from main import app
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    counters = {"connects": 0, "statements": 0}
+
+    @event.listens_for(db_connector.engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record) -> None:
+        counters["connects"] += 1
+
+    @event.listens_for(db_connector.engine.sync_engine, "before_cursor_execute")
+    def on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        counters["statements"] += 1
+
+    # Не ORM модель: ее создание настроило бы мапперы до замера
+    user = SimpleNamespace(id=args.user_id, role=UserRole.user, is_active=True)
+    headers = {"Authorization": f"Bearer {JWTUtils.create_access_token(user_model=user)}"}
+    result: dict[str, Any] = {"warm": args.warm, "startup_ms": 0.0, "requests": []}
+
+    async with AsyncExitStack() as stack:
+        if args.warm:
+            start = time.perf_counter()
+            await stack.enter_async_context(lifespan(app))
+            result["startup_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        else:
+            stack.push_async_callback(db_connector.engine.dispose)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+            for _ in range(args.requests):
+                before = dict(counters)
+                start = time.perf_counter()
+                response = await client.get("/user/cart/", headers=headers)
+                elapsed = (time.perf_counter() - start) * 1000
+
+                if response.status_code != 200:
+                    raise SystemExit(f"GET /user/cart/ returned {response.status_code}: {response.text}")
+
+                result["requests"].append(
+                    {
+                        "ms": round(elapsed, 2),
+                        "connects": counters["connects"] - before["connects"],
+                        "statements": counters["statements"] - before["statements"],
+                    }
+                )
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--warm", action="store_true", help="run the application lifespan before the requests")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args))))
+
+
+if __name__ == "__main__":
+    main()
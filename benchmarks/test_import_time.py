@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+# Бюджет импорта в миллисекундах по python -X importtime, лучший из RUNS запусков.
+# IMPORT_BUDGET_SCALE умножает бюджеты на медленных машинах CI
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", "1"))
+
+RUNS = 3
+
+BUDGETS_MS = {
+    "main": 2000,
+    "app.models": 600,
+    "app.core": 50,
+}
+
+# Модули, которые импорт не должен загружать: их цену платят только те, кому они нужны
+FORBIDDEN = {
+    "main": (),
+    "app.models": ("fastapi", "pydantic", "email_validator"),
+    "app.core": ("sqlalchemy.ext.asyncio", "redis", "prometheus_client"),
+}
+
+# Окружение без DB_*, JWT_* и остальных настроек: импорт не должен их читать
+ENVIRONMENT = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": os.getcwd()}
+
+
+def import_module(module: str) -> tuple[float, set[str]]:
+    """
+    Импортирует модуль в новом процессе
+    :return: Суммарное время импорта модуля в миллисекундах, загруженные модули
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print(*sys.modules)"],
+        env=ENVIRONMENT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, _, fields = line.partition("import time:")
+        self_us, cumulative_us, name = (field.strip() for field in fields.split("|"))
+
+        if name == module:
+            return int(cumulative_us) / 1000, set(result.stdout.split())
+
+    raise AssertionError(f"{module} is not in the importtime output")
+
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_import_time_within_budget(module: str) -> None:
+    runs = [import_module(module) for _ in range(RUNS)]
+    best = min(elapsed for elapsed, _ in runs)
+    loaded = runs[0][1]
+
+    assert not loaded & set(FORBIDDEN[module]), f"{module} imports {loaded & set(FORBIDDEN[module])}"
+    assert best <= BUDGETS_MS[module] * SCALE, f"import {module} took {best:.0f} ms"
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from benchmarks.conftest import TEST_DB_URL
+from benchmarks.overload import run
+
+
+POOL_SIZE = 4
+
+DB_TIME = 0.05
+
+
+def test_goodput_under_3x_overload() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    capacity = POOL_SIZE / DB_TIME
+    result = asyncio.run(
+        run(
+            url=TEST_DB_URL,
+            pool_size=POOL_SIZE,
+            db_time=DB_TIME,
+            admission=True,
+            rate=capacity * 3,
+            duration=3,
+            timeout=1.0,
+        )
+    )
+
+    # Лишние запросы отклоняются сразу, успешные укладываются в срок, а goodput остается около пропускной способности
+    assert result["statuses"].get("503", 0) > 0
+    assert result["goodput"] >= capacity * 0.7
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.repositories import PostRepo
+from app.service import PostService, post as post_service
+from app.service.feed import FeedWindow
+from benchmarks.conftest import MEASUREMENTS
+from benchmarks.recorder import Recorder
+
+
+PAGE = 20
+
+
+@pytest.fixture(scope="module")
+def large_posts(
+    request: pytest.FixtureRequest,
+    loop: asyncio.AbstractEventLoop,
+    engine: AsyncEngine,
+) -> tuple[AsyncConnection, int]:
+    """
+    Соединение, в транзакции которого в posts вставлено --bench-posts постов.
+    Транзакция откатывается после тестов модуля, остальные бенчмарки этих постов не видят
+    """
+    if engine.dialect.name != "postgresql":
+        pytest.skip("the posts table is filled with generate_series")
+
+    posts = request.config.getoption("--bench-posts")
+
+    async def fill() -> AsyncConnection:
+        conn = await engine.connect()
+        await conn.execute(
+            text(
+                "INSERT INTO posts (user_id, title, body, created_at, updated_at) "
+                "SELECT 1 + g % 50, 'title ' || g, 'body of post ' || g, "
+                "now() - (:posts - g) * interval '1 second', now() "
+                "FROM generate_series(1, :posts) AS g"
+            ),
+            {"posts": posts},
+        )
+        await conn.execute(text("ANALYZE posts"))
+        return conn
+
+    conn = loop.run_until_complete(fill())
+    yield conn, posts
+
+    async def rollback() -> None:
+        await conn.rollback()
+        await conn.close()
+
+    loop.run_until_complete(rollback())
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: tuple) -> str:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    return str(result.scalar_one())
+
+
+def test_feed_pages(
+    request: pytest.FixtureRequest,
+    loop: asyncio.AbstractEventLoop,
+    large_posts: tuple[AsyncConnection, int],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    conn, posts = large_posts
+    feed = FeedWindow(size=1000, ttl=3600)
+    monkeypatch.setattr(post_service, "feed_window", lambda: feed)
+
+    # Курсор из середины таблицы, страница далеко за пределами окна
+    after = (datetime.now(timezone.utc) - timedelta(seconds=posts // 2), 2 ** 31 - 1)
+
+    async def warm_window(session: AsyncSession) -> None:
+        await PostService.get_feed_page(limit=1, session=session)
+
+    async def first_page(session: AsyncSession, _) -> None:
+        page = await PostService.get_feed_page(limit=PAGE, session=session)
+        assert len(page.items) == PAGE and page.next_cursor
+
+    async def first_page_from_db(session: AsyncSession, _) -> None:
+        assert len(await PostRepo.get_feed(limit=PAGE + 1, session=session)) == PAGE + 1
+
+    async def deep_page(session: AsyncSession, _) -> None:
+        page = await PostService.get_feed_page(limit=PAGE, after=after, session=session)
+        assert len(page.items) == PAGE
+
+    async def run() -> str:
+        recorder = Recorder(conn, repeat=request.config.getoption("--bench-repeat"))
+
+        # Первые страницы отдаются из окна в памяти без запросов к БД
+        m = await recorder.measure(f"PostService.get_feed_page[window,{posts}]", first_page, setup=warm_window)
+        assert m.statements == 0
+
+        m = await recorder.measure(f"PostRepo.get_feed[first,{posts}]", first_page_from_db)
+        assert m.statements == 1
+
+        # Страница за пределами окна - один запрос по индексу (created_at DESC, id DESC)
+        m = await recorder.measure(f"PostService.get_feed_page[deep,{posts}]", deep_page, setup=warm_window)
+        assert m.statements == 1
+
+        MEASUREMENTS.extend(recorder.results)
+        return await explain(conn, m.statements_text[0], (*after, PAGE + 1))
+
+    assert "Seq Scan" not in loop.run_until_complete(run())
+
+
+@pytest.mark.parametrize(
+    "query, user_id",
+    [
+        ("4242 or 1717", None),
+        # Частое слово в сочетании с редким
+        ("post 4242", None),
+        ("title 4242 or 1717", 43),
+    ],
+)
+def test_search(
+    request: pytest.FixtureRequest,
+    loop: asyncio.AbstractEventLoop,
+    large_posts: tuple[AsyncConnection, int],
+    query: str,
+    user_id: int,
+) -> None:
+    conn, posts = large_posts
+
+    async def search(session: AsyncSession, _) -> None:
+        page = await PostService.search_page(query=query, limit=PAGE, user_id=user_id, session=session)
+        assert page.items
+        assert all("<b>" in hit.headline for hit in page.items)
+
+    async def run() -> str:
+        recorder = Recorder(conn, repeat=request.config.getoption("--bench-repeat"))
+
+        # Совпадения, ранг и фрагменты - один запрос
+        m = await recorder.measure(f"PostService.search_page[{query!r},{posts}]", search)
+        assert m.statements == 1
+
+        MEASUREMENTS.extend(recorder.results)
+
+        parameters = ("simple", "simple", query, "")
+        if user_id is not None:
+            parameters = (*parameters, user_id)
+
+        return await explain(conn, m.statements_text[0], (*parameters, PAGE + 1))
+
+    plan = loop.run_until_complete(run())
+    assert "ix_posts_search_vector" in plan
+    assert "Seq Scan" not in plan
@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import CartProduct, Order, OrderProducts, Post, User
+from app.repositories import OrderRepo, PostRepo, UserRepo
+from app.repositories.cart import CartRepo
+from benchmarks.conftest import (
+    LINES_PER_ORDER,
+    ORDERS_PER_USER,
+    POSTS_PER_USER,
+    PRODUCTS_PER_CART,
+    USERS,
+)
+from benchmarks.recorder import Recorder
+
+
+# id строк, создаваемых в подготовке замеров, не пересекаются с наполнением
+IDS = itertools.count(1_000_000)
+
+
+def measure(loop: asyncio.AbstractEventLoop, recorder: Recorder, name: str, call, setup=None):
+    return loop.run_until_complete(recorder.measure(name, call, setup))
+
+
+async def create_user_with_posts(session: AsyncSession, count: int) -> list[Post]:
+    user_id = next(IDS)
+    now = datetime.now(timezone.utc)
+
+    await session.execute(
+        insert(User), [{"id": user_id, "login": f"bench{user_id}@example.com", "password": b"\x00", "role": "user"}]
+    )
+    await session.execute(
+        insert(Post),
+        [{"id": next(IDS), "user_id": user_id, "title": "title", "body": "body", "created_at": now}
+         for _ in range(count)],
+    )
+    await session.commit()
+
+    return await PostRepo.get_all_by_user_id(user_id=user_id, session=session)
+
+
+async def create_user_with_orders(session: AsyncSession, count: int) -> list[Order]:
+    user_id = next(IDS)
+    now = datetime.now(timezone.utc)
+    orders = [{"id": next(IDS), "user_id": user_id, "original_price": 100, "discount": 0,
+               "total_price": 100, "total_quantity": 1, "created_at": now} for _ in range(count)]
+
+    await session.execute(
+        insert(User), [{"id": user_id, "login": f"bench{user_id}@example.com", "password": b"\x00", "role": "user"}]
+    )
+    await session.execute(insert(Order), orders)
+    await session.execute(
+        insert(OrderProducts),
+        [{"id": next(IDS), "order_id": order["id"], "created_at": now, "product_id": 1 + k,
+          "quantity": 1, "current_price": 100} for order in orders for k in range(LINES_PER_ORDER)],
+    )
+    await session.commit()
+
+    # Как в OrderService.delete_all_models: заказы без загруженных позиций
+    return await OrderRepo.get_all_by_user_id(user_id=user_id, session=session)
+
+
+def test_base_repo_reads(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    dates = (datetime.now(timezone.utc) - timedelta(hours=1), datetime.now(timezone.utc))
+
+    m = measure(loop, recorder, "PostRepo.get_all", lambda s, _: PostRepo.get_all(session=s))
+    assert (m.statements, m.rows) == (1, USERS * POSTS_PER_USER)
+
+    m = measure(loop, recorder, "PostRepo.get_by_id", lambda s, _: PostRepo.get_by_id(model_id=1, session=s))
+    assert (m.statements, m.rows) == (1, 1)
+
+    m = measure(
+        loop, recorder, "PostRepo.get_all_by_user_id",
+        lambda s, _: PostRepo.get_all_by_user_id(user_id=1, session=s),
+    )
+    assert (m.statements, m.rows) == (1, POSTS_PER_USER)
+
+    m = measure(loop, recorder, "PostRepo.get_by_date", lambda s, _: PostRepo.get_by_date(dates=dates, session=s))
+    assert m.statements == 1
+
+
+def test_base_repo_writes(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    async def create(session: AsyncSession, _) -> None:
+        await PostRepo.create(model=Post(user_id=1, title="title", body="body"), session=session)
+
+    # Значения по умолчанию из БД возвращаются INSERT ... RETURNING, без перечитывания строки
+    m = measure(loop, recorder, "PostRepo.create", create)
+    assert m.statements == 1
+    assert "RETURNING" in m.statements_text[0]
+
+    async def get_post(session: AsyncSession) -> Post:
+        return await PostRepo.get_by_id(model_id=1, session=session)
+
+    async def update(session: AsyncSession, post: Post) -> None:
+        await PostRepo.update(new_data={"title": f"title {next(IDS)}"}, update_model=post, session=session)
+
+    # UPDATE с условием на версию, новое updated_at возвращается RETURNING
+    m = measure(loop, recorder, "PostRepo.update", update, setup=get_post)
+    assert m.statements == 1
+    assert "version" in m.statements_text[0]
+    assert "RETURNING" in m.statements_text[0]
+
+
+@pytest.mark.parametrize("count", [5, 50])
+def test_delete_all_does_not_loop_over_rows(
+    loop: asyncio.AbstractEventLoop,
+    recorder: Recorder,
+    count: int,
+) -> None:
+    async def delete_all(session: AsyncSession, models: list) -> None:
+        await PostRepo.delete_all(list_models=models, session=session)
+
+    m = measure(
+        loop, recorder, f"PostRepo.delete_all[{count}]", delete_all,
+        setup=lambda s: create_user_with_posts(s, count),
+    )
+    assert m.statements == 1
+
+    async def delete_all_orders(session: AsyncSession, models: list) -> None:
+        await OrderRepo.delete_all(list_models=models, session=session)
+        await session.commit()
+
+    # Позиции заказов удаляются каскадом в БД, без загрузки коллекций заказов
+    m = measure(
+        loop, recorder, f"OrderRepo.delete_all[{count}]", delete_all_orders,
+        setup=lambda s: create_user_with_orders(s, count),
+    )
+    assert m.statements == 1
+
+    async def orphan_lines() -> int:
+        async with recorder.session_factory() as session:
+            return await session.scalar(
+                text("SELECT count(*) FROM order_products WHERE order_id NOT IN (SELECT id FROM orders)")
+            )
+
+    assert loop.run_until_complete(orphan_lines()) == 0
+
+
+def test_cart_repo(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    # Корзина, ее позиции и продукты позиций - по одному запросу на уровень selectinload
+    m = measure(loop, recorder, "CartRepo.get_by_user_id", lambda s, _: CartRepo.get_by_user_id(user_id=1, session=s))
+    assert (m.statements, m.rows) == (3, 1 + PRODUCTS_PER_CART * 2)
+
+    m = measure(loop, recorder, "CartRepo.get_all_carts", lambda s, _: CartRepo.get_all_carts(session=s))
+    assert m.statements == 3
+
+    async def fill_cart(session: AsyncSession):
+        await session.execute(
+            insert(CartProduct),
+            [{"id": next(IDS), "cart_id": USERS, "product_id": 90 + k, "quantity": 1, "current_price": 100}
+             for k in range(PRODUCTS_PER_CART)],
+        )
+        await session.commit()
+
+        return await CartRepo.get_by_user_id(user_id=USERS, session=session)
+
+    async def clear_cart(session: AsyncSession, cart) -> None:
+        await CartRepo.clear_cart(cart_model=cart, session=session)
+        await session.commit()
+
+    # Позиции удаляются одним DELETE по cart_id
+    m = measure(loop, recorder, "CartRepo.clear_cart", clear_cart, setup=fill_cart)
+    assert m.statements == 1
+
+
+def test_user_repo_get_me(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    async def get_me(session: AsyncSession, _):
+        row = await UserRepo.get_me(user_id=1, session=session)
+        # Профиль загружен вместе с пользователем, обращение к нему не выполняет запрос
+        assert row.User.profile is None
+        assert row.total_quantity == sum(range(1, PRODUCTS_PER_CART + 1))
+        assert row.total_price == 100 * row.total_quantity
+        return row
+
+    # Пользователь, профиль и итоги корзины - один запрос
+    m = measure(loop, recorder, "UserRepo.get_me", get_me)
+    assert (m.statements, m.rows) == (1, 1)
+
+
+def test_order_repo(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    dates = (datetime.now(timezone.utc) - timedelta(hours=2), datetime.now(timezone.utc))
+
+    m = measure(
+        loop, recorder, "OrderRepo.get_all_orders_by_user_id",
+        lambda s, _: OrderRepo.get_all_orders_by_user_id(user_id=1, session=s),
+    )
+    assert m.statements == 3
+    assert m.rows >= ORDERS_PER_USER * (1 + LINES_PER_ORDER)
+
+    m = measure(
+        loop, recorder, "OrderRepo.get_by_order_id",
+        lambda s, _: OrderRepo.get_by_order_id(order_id=1, session=s),
+    )
+    assert m.statements == 3
+
+    m = measure(
+        loop, recorder, "OrderRepo.get_orders_by_date",
+        lambda s, _: OrderRepo.get_orders_by_date(dates=dates, session=s),
+    )
+    assert m.statements == 3
+
+    # Страница истории не загружает позиции заказов
+    m = measure(
+        loop, recorder, "OrderRepo.get_order_summaries_by_user_id",
+        lambda s, _: OrderRepo.get_order_summaries_by_user_id(user_id=1, limit=10, session=s),
+    )
+    assert (m.statements, m.rows) == (1, 10)
+
+    m = measure(loop, recorder, "OrderRepo.get_by_id", lambda s, _: OrderRepo.get_by_id(model_id=1, session=s))
+    assert (m.statements, m.rows) == (1, 1)
+
+
+def test_order_repo_create_order(loop: asyncio.AbstractEventLoop, recorder: Recorder) -> None:
+    if recorder.dialect == "sqlite":
+        pytest.skip("SQLite does not autoincrement id in the composite primary key of orders")
+
+    async def create_order(session: AsyncSession, _) -> None:
+        await OrderRepo.create_order(user_id=1, total_price=100, total_quantity=1, session=session)
+        await session.commit()
+
+    # INSERT ... RETURNING без перечитывания строки
+    m = measure(loop, recorder, "OrderRepo.create_order", create_order)
+    assert m.statements == 1
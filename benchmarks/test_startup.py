@@ -0,0 +1,54 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.conftest import MEASUREMENTS, TEST_DB_URL
+from benchmarks.recorder import Measurement
+
+
+# Новых процессов на каждый вариант запуска, в отчет идет медиана первого запроса
+RUNS = 3
+
+
+def start_process(warm: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.startup", "--requests", "3"]
+
+    if warm:
+        command.append("--warm")
+
+    output = subprocess.run(
+        command,
+        env={**os.environ, "DB_URL": TEST_DB_URL},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return json.loads(output)
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+def test_first_request(engine: AsyncEngine, warm: bool) -> None:
+    if engine.dialect.name != "postgresql":
+        pytest.skip("the application process connects to TEST_DB_URL")
+
+    runs = [start_process(warm) for _ in range(RUNS)]
+    first = [run["requests"][0] for run in runs]
+
+    MEASUREMENTS.append(
+        Measurement(
+            name=f"GET /user/cart/ first request[{'warm' if warm else 'cold'}]",
+            dialect=engine.dialect.name,
+            statements=first[0]["statements"],
+            rows=0,
+            wall_ms=statistics.median(request["ms"] for request in first),
+        )
+    )
+
+    # После lifespan первый запрос берет готовое соединение из пула, без него открывает новое
+    assert all(request["connects"] == (0 if warm else 1) for request in first)
@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+from typing import Optional
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import db_connector, rate_limit_settings
+from app.models import Cart, CartProduct, Order, User
+from app.repositories import SalesRepo
+from app.tools import DatabaseError
+from benchmarks.recorder import Recorder
+from main import app
+
+
+PASSWORD = "bench-password"
+
+# Продуктов в оформляемой корзине
+PRODUCTS_IN_CHECKOUT = 3
+
+LOGINS = itertools.count(1)
+
+
+@pytest.fixture
+def client(recorder: Recorder, monkeypatch: pytest.MonkeyPatch) -> httpx.AsyncClient:
+    """Клиент приложения, запросы которого выполняются в единицах работы на БД замера"""
+    if recorder.dialect != "postgresql":
+        pytest.skip("cart and checkout use PostgreSQL INSERT ... ON CONFLICT")
+
+    monkeypatch.setattr(
+        db_connector,
+        "session_factory",
+        async_sessionmaker(bind=recorder.engine, autoflush=False, expire_on_commit=False),
+    )
+    # Все пользователи замеров входят с одного адреса клиента ASGITransport
+    monkeypatch.setattr(rate_limit_settings, "login_per_ip", 10 ** 6)
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def login(client: httpx.AsyncClient, user_login: str) -> dict[str, str]:
+    await client.post("/user/auth/", json={"login": user_login, "password": PASSWORD})
+    response = await client.post("/user/auth/login", data={"username": user_login, "password": PASSWORD})
+
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def fill_cart(client: httpx.AsyncClient, user_login: Optional[str] = None) -> dict[str, str]:
+    headers = await login(client, user_login or f"uow{next(LOGINS)}@example.com")
+    # Корзина создается при первом запросе, как в сценарии benchmarks.load
+    await client.get("/user/cart/", headers=headers)
+
+    for product_id in range(1, PRODUCTS_IN_CHECKOUT + 1):
+        response = await client.post(
+            "/user/cart/", headers=headers, json={"product_id": product_id, "quantity": 1}
+        )
+        assert response.status_code == 200
+
+    return headers
+
+
+def test_each_request_commits_once(
+    loop: asyncio.AbstractEventLoop,
+    recorder: Recorder,
+    client: httpx.AsyncClient,
+) -> None:
+    async def add_to_cart(session: AsyncSession, headers: dict[str, str]) -> None:
+        response = await client.post("/user/cart/", headers=headers, json={"product_id": 1, "quantity": 1})
+        assert response.status_code == 200
+
+    async def checkout(session: AsyncSession, headers: dict[str, str]) -> None:
+        response = await client.post("/user/orders/", headers=headers, json={})
+        assert response.status_code == 201
+
+    async def run() -> None:
+        async with client:
+            # Запрос целиком, вместе с проверкой токена и перечитыванием корзины для ответа
+            m = await recorder.measure("POST /user/cart/", add_to_cart, setup=lambda _: fill_cart(client))
+            assert m.commits == 1
+
+            # Заказ, его позиции, дневные итоги продаж и очистка корзины фиксируются одним commit
+            m = await recorder.measure("POST /user/orders/", checkout, setup=lambda _: fill_cart(client))
+            assert m.commits == 1
+
+    loop.run_until_complete(run())
+
+
+def test_failed_checkout_leaves_no_partial_state(
+    loop: asyncio.AbstractEventLoop,
+    recorder: Recorder,
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fail(*args, **kwargs) -> None:
+        raise DatabaseError("record_order failed")
+
+    async def run() -> tuple[int, int]:
+        user_login = f"uow{next(LOGINS)}@example.com"
+
+        async with client:
+            headers = await fill_cart(client, user_login)
+
+            # Ошибка после того, как заказ и его позиции уже отправлены в БД
+            monkeypatch.setattr(SalesRepo, "record_order", fail)
+
+            with pytest.raises(DatabaseError):
+                await client.post("/user/orders/", headers=headers, json={})
+
+        async with recorder.session_factory() as session:
+            user_id = await session.scalar(select(User.id).where(User.login == user_login))
+            orders = await session.scalar(select(func.count()).select_from(Order).where(Order.user_id == user_id))
+            cart_products = await session.scalar(
+                select(func.count()).select_from(CartProduct).join(Cart).where(Cart.user_id == user_id)
+            )
+
+        return orders, cart_products
+
+    orders, cart_products = loop.run_until_complete(run())
+
+    assert orders == 0
+    assert cart_products == PRODUCTS_IN_CHECKOUT
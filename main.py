@@ -1,15 +1,54 @@
 import uvicorn
 from fastapi import FastAPI, Depends
 from fastapi.security import HTTPBearer
+from starlette.requests import ClientDisconnect
 from app.api.view.user import include_user_routers
 from app.api.view.admin import include_admin_routers
+from app.api.response import PydanticJSONResponse
+from app.api.middleware import AdmissionMiddleware, CompressionMiddleware
+from app.api.lifespan import lifespan
+from app.api.deadline import client_disconnected
+from app.core import admission_settings, compression_settings
+from app.core.metrics import metrics_app
 
 http_bearer = HTTPBearer(auto_error=False)
 
 
-app = FastAPI(dependencies=[Depends(http_bearer)])
+app = FastAPI(
+    dependencies=[Depends(http_bearer)],
+    default_response_class=PydanticJSONResponse,
+    lifespan=lifespan,
+    exception_handlers={ClientDisconnect: client_disconnected},
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=compression_settings.minimum_size,
+    gzip_level=compression_settings.gzip_level,
+    brotli_quality=compression_settings.brotli_quality,
+    cache_paths=compression_settings.cache_paths,
+    cache_size=compression_settings.cache_size,
+)
+# Добавлен последним, поэтому выполняется первым: отклоненный запрос не доходит до сжатия и маршрутов
+if admission_settings.enabled:
+    app.add_middleware(
+        AdmissionMiddleware,
+        initial_limit=admission_settings.initial_limit,
+        min_limit=admission_settings.min_limit,
+        max_limit=admission_settings.max_limit,
+        backoff=admission_settings.backoff,
+        wait_target=admission_settings.wait_target,
+        retry_after=admission_settings.retry_after,
+        exempt_paths=admission_settings.exempt_paths,
+    )
 include_user_routers(app)
 include_admin_routers(app)
+app.mount("/metrics", metrics_app())
+
+
+@app.get("/health", include_in_schema=False)
+async def health() -> dict[str, str]:
+    """Проверка живости процесса для балансировщика, не обращается к БД"""
+    return {"status": "ok"}
 
 
 
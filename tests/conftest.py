@@ -0,0 +1,70 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.connector import DBConnector
+from app.models import Base
+from app.service import PartitionService
+from tests.seed import seed_database
+
+
+# Тесты, которым нужен настоящий PostgreSQL, пропускаются, если TEST_DB_URL не задан.
+# ВНИМАНИЕ: все таблицы в указанной БД удаляются и создаются заново
+TEST_DB_URL = os.getenv("TEST_DB_URL")
+
+# За сколько месяцев назад создаются секции orders и order_products, наполнение укладывается в этот интервал
+PARTITION_MONTHS_BACK = 12
+
+# Количество заказов в тестовой БД, от него вычисляются размеры остальных таблиц
+SEED_SCALE = int(os.getenv("TEST_SEED_SCALE", "20000"))
+
+
+@pytest.fixture(scope="session")
+def loop() -> asyncio.AbstractEventLoop:
+    """Общий event loop сессии тестов, к нему привязан пул соединений движка"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def pg_engine(loop: asyncio.AbstractEventLoop) -> AsyncEngine:
+    """Движок PostgreSQL с заново созданной схемой и наполненными таблицами"""
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    engine = create_async_engine(TEST_DB_URL)
+
+    async def prepare() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        connector = DBConnector(url=TEST_DB_URL, echo=False)
+
+        try:
+            await PartitionService.ensure_partitions(
+                connector=connector,
+                since=datetime.now(timezone.utc)
+                - timedelta(days=31 * PARTITION_MONTHS_BACK),
+            )
+
+        finally:
+            await connector.dispose()
+
+        await seed_database(engine=engine, scale=SEED_SCALE)
+
+    loop.run_until_complete(prepare())
+    yield engine
+    loop.run_until_complete(engine.dispose())
+
+
+@pytest.fixture
+def pg_connector(pg_engine: AsyncEngine, loop: asyncio.AbstractEventLoop) -> DBConnector:
+    """Подключение к подготовленной БД для сервисов, которые сами открывают единицы работы"""
+    connector = DBConnector(url=TEST_DB_URL, echo=False)
+    yield connector
+    loop.run_until_complete(connector.dispose())
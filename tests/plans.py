@@ -0,0 +1,62 @@
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+async def capture_selects(
+    engine: AsyncEngine,
+    query: Callable[[AsyncSession], Awaitable[Any]],
+) -> list[tuple[str, Any]]:
+    """
+    Выполняет сценарий и перехватывает все выданные им SELECT вместе с параметрами
+    :param engine: Движок БД
+    :param query: Сценарий, вызывающий метод репозитория
+    :return: Список (текст запроса, параметры драйвера)
+    """
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            await query(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert captured, "repository method did not emit any SELECT"
+    return captured
+
+
+async def explain(
+    engine: AsyncEngine,
+    statement: str,
+    parameters: Any,
+) -> dict:
+    """
+    Возвращает корневой узел плана EXPLAIN (FORMAT JSON) с теми же параметрами, что получил драйвер
+    :param engine: Движок БД
+    :param statement: Текст запроса
+    :param parameters: Параметры драйвера
+    :return: Узел плана
+    """
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        return result.scalar_one()[0]["Plan"]
+
+
+def iter_nodes(plan: dict) -> Iterator[dict]:
+    """
+    Рекурсивно обходит узлы плана
+    :param plan: Узел плана
+    :return: Итератор по узлу и всем вложенным узлам
+    """
+    yield plan
+
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child)
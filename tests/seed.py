@@ -0,0 +1,96 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Наполнение выполняется на стороне БД через generate_series, чтобы не гонять сотни тысяч строк через Python.
+# created_at растет вместе с id, как при реальной вставке, - на этом основаны BRIN индексы
+SEED_STATEMENTS = (
+    """
+    INSERT INTO users (login, password, role, created_at, updated_at)
+    SELECT 'user' || g || '@example.com', '\\x00'::bytea, 'user',
+           now() - (:users - g) * interval '1 hour', now()
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO products (name, description, price, created_at, updated_at)
+    SELECT 'product ' || g, 'description of product ' || g, 100 + g % 900,
+           now() - (:products - g) * interval '4 hour', now()
+    FROM generate_series(1, :products) AS g
+    """,
+    """
+    INSERT INTO profiles (user_id, name, address, created_at, updated_at)
+    SELECT g, 'name ' || g, 'address of user ' || g,
+           now() - (:users - g) * interval '1 hour', now()
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO carts (user_id, created_at, updated_at)
+    SELECT g, now() - (:users - g) * interval '1 hour', now()
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO cart_products (cart_id, product_id, quantity, current_price)
+    SELECT c, 1 + (c * 7 + k) % :products, 1 + k, 100
+    FROM generate_series(1, :users) AS c, generate_series(0, 2) AS k
+    """,
+    """
+    INSERT INTO posts (user_id, title, body, created_at, updated_at)
+    SELECT 1 + g % :users, 'title ' || g, 'body of post ' || g,
+           now() - (:posts - g) * interval '10 minute', now()
+    FROM generate_series(1, :posts) AS g
+    """,
+    """
+    INSERT INTO orders (user_id, original_price, total_price, total_quantity, created_at, updated_at)
+    SELECT 1 + g % :users, 300, 300, 3,
+           now() - (:orders - g) * interval '10 minute', now()
+    FROM generate_series(1, :orders) AS g
+    """,
+    """
+    INSERT INTO order_products (order_id, product_id, quantity, current_price, created_at)
+    SELECT o.id, 1 + (o.id * 11 + k) % :products, 1, 100, o.created_at
+    FROM orders AS o, generate_series(0, 2) AS k
+    """,
+    """
+    INSERT INTO refresh_tokens (user_id, device_id, token_hash)
+    SELECT g, 'default', sha256(convert_to(g::text, 'UTF8'))
+    FROM generate_series(1, :users) AS g
+    """,
+)
+
+
+def seed_sizes(scale: int) -> dict[str, int]:
+    """
+    Вычисляет размеры таблиц от количества заказов
+    :param scale: Количество заказов
+    :return: Словарь с количеством строк, подставляется в параметры SEED_STATEMENTS
+    """
+    return {
+        "orders": scale,
+        "posts": scale,
+        "users": max(scale // 4, 10),
+        "products": max(scale // 10, 10),
+    }
+
+
+async def seed_database(
+    engine: AsyncEngine,
+    scale: int,
+) -> dict[str, int]:
+    """
+    Наполняет пустую схему тестовыми данными и обновляет статистику планировщика
+    :param engine: Движок БД
+    :param scale: Количество заказов
+    :return: Размеры таблиц
+    """
+    sizes = seed_sizes(scale)
+
+    async with engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement), sizes)
+
+    # ANALYZE не выполняется внутри транзакции вместе с вставкой, поэтому отдельным соединением
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+    return sizes
@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.api.middleware import AdmissionMiddleware, AIMDLimit
+
+
+def test_limit_backs_off_once_per_wave_and_grows_additively() -> None:
+    limit = AIMDLimit(initial=10, min_limit=2, max_limit=20, backoff=0.5)
+    epochs = [limit.try_acquire() for _ in range(10)]
+
+    assert limit.try_acquire() is None
+
+    # Все запросы волны видели перегрузку, лимит уменьшается один раз
+    for epoch in epochs:
+        limit.release(epoch, overloaded=True)
+
+    assert limit.limit == 5
+
+    # Лимит занят полностью: каждый завершенный запрос сразу сменяется новым
+    epochs = [limit.try_acquire() for _ in range(5)]
+
+    for _ in range(100):
+        limit.release(epochs.pop(0), overloaded=False)
+
+        while (epoch := limit.try_acquire()) is not None:
+            epochs.append(epoch)
+
+    # +1 / limit за запрос, то есть примерно +1 за каждые limit запросов: limit ** 2 растет на 2 за запрос
+    assert 14 < limit.limit < 16
+
+
+def test_excess_requests_get_fast_503_and_exempt_paths_pass() -> None:
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({})
+
+    app = AdmissionMiddleware(
+        Starlette(routes=[Route("/user/slow", slow), Route("/health", slow)]),
+        initial_limit=2,
+        exempt_paths=("/health",),
+    )
+
+    async def main() -> tuple[list[int], int, str, int]:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            admitted = [asyncio.create_task(client.get("/user/slow")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+
+            rejected = await client.get("/user/slow")
+            health = asyncio.create_task(client.get("/health"))
+            await asyncio.sleep(0.05)
+
+            release.set()
+            statuses = [response.status_code for response in await asyncio.gather(*admitted)]
+
+            return statuses, rejected.status_code, rejected.headers["Retry-After"], (await health).status_code
+
+    statuses, rejected, retry_after, health = asyncio.run(main())
+
+    assert statuses == [200, 200]
+    assert rejected == 503
+    assert retry_after == "1"
+    assert health == 200
@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.api.middleware import CompressionMiddleware, negotiate_encoding
+
+
+ITEMS = [{"id": i, "name": f"product {i}", "description": "description"} for i in range(500)]
+
+
+async def catalog(request):
+    return JSONResponse(ITEMS)
+
+
+async def small(request):
+    return JSONResponse({"id": 1})
+
+
+async def export(request):
+    async def rows():
+        for item in ITEMS:
+            yield (json.dumps(item) + "\n").encode()
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+async def encoded(request):
+    return Response(gzip.compress(b"x" * 4096), headers={"Content-Encoding": "gzip"})
+
+
+def make_app() -> CompressionMiddleware:
+    app = Starlette(
+        routes=[
+            Route("/catalog", catalog),
+            Route("/small", small),
+            Route("/export", export),
+            Route("/encoded", encoded),
+        ]
+    )
+    return CompressionMiddleware(app, minimum_size=500, cache_paths=("/catalog",))
+
+
+def request(
+    app: CompressionMiddleware,
+    loop: asyncio.AbstractEventLoop,
+    path: str,
+    accept_encoding: str = "gzip",
+) -> httpx.Response:
+    async def run() -> httpx.Response:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+    return loop.run_until_complete(run())
+
+
+def test_negotiate_encoding() -> None:
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_response_is_compressed(loop: asyncio.AbstractEventLoop) -> None:
+    response = request(make_app(), loop, "/catalog")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(ITEMS))
+    assert response.json() == ITEMS
+
+
+def test_small_and_identity_responses_are_not_compressed(loop: asyncio.AbstractEventLoop) -> None:
+    app = make_app()
+
+    assert "content-encoding" not in request(app, loop, "/small").headers
+    assert "content-encoding" not in request(app, loop, "/catalog", "identity").headers
+    assert request(app, loop, "/encoded").content == b"x" * 4096
+
+
+def test_streaming_response_is_compressed_in_chunks(loop: asyncio.AbstractEventLoop) -> None:
+    response = request(make_app(), loop, "/export")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == ITEMS
+
+
+def test_catalog_responses_reuse_compressed_body(loop: asyncio.AbstractEventLoop) -> None:
+    app = make_app()
+
+    first = request(app, loop, "/catalog")
+    size = app.cache.size
+    second = request(app, loop, "/catalog")
+
+    assert size > 0
+    assert app.cache.size == size
+    assert first.content == second.content
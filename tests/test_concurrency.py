@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.api.depends.order import OrderDepends
+from app.models import Cart, CartProduct, Order, Product
+from app.repositories import OrderRepo, ProductRepo
+from app.repositories.cart import CartRepo
+from app.schemas import ProductAddOrUpdate
+from app.schemas.order import OrderUpdate
+from app.tools import ConflictError
+
+
+# Параллельных запросов к одной корзине
+CONCURRENT_REQUESTS = 10
+
+
+def test_concurrent_update_raises_conflict_with_current_state(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def run() -> tuple[Product, ConflictError]:
+        async with session_factory() as first, session_factory() as second:
+            first_product = await ProductRepo.get_by_id(model_id=1, session=first)
+            second_product = await ProductRepo.get_by_id(model_id=1, session=second)
+
+            updated = await ProductRepo.update(
+                new_data={"price": first_product.price + 1},
+                update_model=first_product,
+                session=first,
+            )
+            await first.commit()
+
+            # Второй запрос прочитал продукт до первого изменения и не должен его перезаписать
+            with pytest.raises(ConflictError) as conflict:
+                await ProductRepo.update(
+                    new_data={"name": "stale write"},
+                    update_model=second_product,
+                    session=second,
+                )
+
+            return updated, conflict.value
+
+    updated, conflict = loop.run_until_complete(run())
+
+    assert conflict.current.version == updated.version
+    assert conflict.current.price == updated.price
+    assert conflict.current.name != "stale write"
+
+
+def test_outdated_version_is_rejected_without_update(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def run() -> tuple[int, int]:
+        async with session_factory() as session:
+            product = await ProductRepo.get_by_id(model_id=2, session=session)
+            version = product.version
+
+            with pytest.raises(ConflictError):
+                await ProductRepo.update(
+                    new_data={"name": "stale write"},
+                    update_model=product,
+                    session=session,
+                    version=version - 1 or version + 1,
+                )
+
+            await session.refresh(product)
+            return version, product.version
+
+    before, after = loop.run_until_complete(run())
+
+    assert before == after
+
+
+def test_concurrent_cart_increments_are_not_lost(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def quantity(cart_id: int, product_id: int) -> int:
+        async with session_factory() as session:
+            return await session.scalar(
+                text("SELECT quantity FROM cart_products WHERE cart_id = :cart_id AND product_id = :product_id"),
+                {"cart_id": cart_id, "product_id": product_id},
+            )
+
+    async def increment(user_id: int, product_id: int) -> None:
+        async with session_factory() as session:
+            cart = await CartRepo.get_by_user_id(user_id=user_id, session=session)
+            await CartRepo.update_count_product(
+                product_scheme=ProductAddOrUpdate(product_id=product_id, quantity=1),
+                cart_model=cart,
+                session=session,
+            )
+            await session.commit()
+
+    async def add(user_id: int, product: Product) -> None:
+        async with session_factory() as session:
+            cart = await CartRepo.get_by_user_id(user_id=user_id, session=session)
+            await CartRepo.add_product(quantity=1, product_model=product, cart_model=cart, session=session)
+            await session.commit()
+
+    async def run() -> tuple[int, int, int]:
+        async with session_factory() as session:
+            cart_product = await session.scalar(select(CartProduct).order_by(CartProduct.id).limit(1))
+            cart_id, product_id = cart_product.cart_id, cart_product.product_id
+            user_id = await session.scalar(select(Cart.user_id).where(Cart.id == cart_id))
+            new_product = await session.scalar(
+                select(Product)
+                .where(Product.id.not_in(select(CartProduct.product_id).where(CartProduct.cart_id == cart_id)))
+                .order_by(Product.id)
+                .limit(1)
+            )
+
+        before = await quantity(cart_id, product_id)
+
+        # Изменения выполняются параллельно в отдельных сессиях, запись прочитанного количества теряла бы часть из них
+        await asyncio.gather(*(increment(user_id, product_id) for _ in range(CONCURRENT_REQUESTS)))
+        await asyncio.gather(*(add(user_id, new_product) for _ in range(CONCURRENT_REQUESTS)))
+
+        return before, await quantity(cart_id, product_id), await quantity(cart_id, new_product.id)
+
+    before, after, added = loop.run_until_complete(run())
+
+    assert after == before + CONCURRENT_REQUESTS
+    assert added == CONCURRENT_REQUESTS
+
+
+def test_concurrent_order_patch_returns_409_with_current_order(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def run() -> tuple[Order, HTTPException]:
+        async with session_factory() as first, session_factory() as second:
+            order_id = await first.scalar(select(func.min(Order.id)))
+            # Второй запрос прочитал заказ до изменения первым и отправляет ту же версию
+            stale = await OrderRepo.get_by_order_id(order_id=order_id, session=second)
+
+            updated = await OrderDepends.update_oreder(
+                order_id=order_id,
+                order_schema=OrderUpdate(comment="first write", version=stale.version),
+                session=first,
+            )
+            await first.commit()
+
+            with pytest.raises(HTTPException) as conflict:
+                await OrderDepends.update_oreder(
+                    order_id=order_id,
+                    order_schema=OrderUpdate(comment="stale write", version=stale.version),
+                    session=second,
+                )
+
+            return updated, conflict.value
+
+    updated, conflict = loop.run_until_complete(run())
+    current = conflict.detail["current"]
+
+    assert conflict.status_code == 409
+    assert current["version"] == updated.version
+    assert current["comment"] == "first write"
+    assert len(current["products"]) == len(updated.products)
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from typing import Annotated
+
+import httpx
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.api.deadline import client_disconnected
+from app.api.depends.deadline import RouteTimeout
+from app.api.response import PydanticRoute
+from app.core.connector import DBConnector
+from tests.conftest import TEST_DB_URL
+
+
+def make_app(connector: DBConnector = None) -> tuple[FastAPI, list[str]]:
+    """Приложение с маршрутами, которые ждут дольше срока, и список событий их обработчиков"""
+    events = []
+    router = APIRouter(route_class=PydanticRoute)
+
+    @router.get("/sleep", response_model=dict)
+    async def sleep() -> dict:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+        return {}
+
+    @router.get("/report", response_model=dict, dependencies=[Depends(RouteTimeout(0.5))])
+    async def report() -> dict:
+        await asyncio.sleep(0.3)
+        return {}
+
+    if connector is not None:
+        @router.get("/db/timeout", response_model=dict)
+        async def statement_timeout(
+            session: Annotated[AsyncSession, Depends(connector.get_session, scope="function")],
+        ) -> dict:
+            return {"value": (await session.execute(text("SHOW statement_timeout"))).scalar_one()}
+
+        @router.get("/db/sleep", response_model=dict)
+        async def db_sleep(
+            session: Annotated[AsyncSession, Depends(connector.get_session, scope="function")],
+        ) -> dict:
+            await session.execute(text("SELECT pg_sleep(10)"))
+            return {}
+
+    app = FastAPI(exception_handlers={ClientDisconnect: client_disconnected})
+    app.include_router(router)
+
+    if connector is not None:
+        async def guard(
+            request: Request,
+            session: Annotated[AsyncSession, Depends(connector.get_session, scope="function")],
+        ) -> None:
+            # Как admin_guard: зависимость роутера открывает транзакцию раньше RouteTimeout маршрута
+            await session.execute(text("SELECT 1"))
+            request.state.guard_session = session
+
+        guarded = APIRouter(dependencies=[Depends(guard)], route_class=PydanticRoute)
+
+        @guarded.get("/db/guarded", response_model=dict, dependencies=[Depends(RouteTimeout(30))])
+        async def guarded_timeout(
+            request: Request,
+            session: Annotated[AsyncSession, Depends(connector.get_session, scope="function")],
+        ) -> dict:
+            return {
+                "value": (await session.execute(text("SHOW statement_timeout"))).scalar_one(),
+                "same_transaction": session is request.state.guard_session,
+            }
+
+        app.include_router(guarded)
+
+    return app, events
+
+
+async def get(app: FastAPI, path: str, timeout: float = None) -> httpx.Response:
+    headers = {"X-Request-Timeout": str(timeout)} if timeout is not None else {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_deadline_from_header_returns_504() -> None:
+    app, events = make_app()
+
+    started = time.perf_counter()
+    response = asyncio.run(get(app, "/sleep", timeout=0.2))
+
+    assert response.status_code == 504
+    assert time.perf_counter() - started < 2
+    assert events == ["cancelled"]
+
+
+def test_route_timeout_replaces_default_and_header_shortens_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.core import deadline_settings
+
+    monkeypatch.setattr(deadline_settings, "default", 0.1)
+    app, _ = make_app()
+
+    assert asyncio.run(get(app, "/sleep")).status_code == 504
+    assert asyncio.run(get(app, "/report")).status_code == 200
+    assert asyncio.run(get(app, "/report", timeout=0.1)).status_code == 504
+
+
+def test_client_disconnect_cancels_handler() -> None:
+    app, events = make_app()
+    sent = []
+
+    async def main() -> None:
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive() -> dict:
+            if messages:
+                return messages.pop()
+
+            await asyncio.sleep(0.1)
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/sleep",
+            "raw_path": b"/sleep",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1),
+            "server": ("test", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), timeout=2)
+
+    asyncio.run(main())
+
+    assert events == ["cancelled"]
+    assert sent[0]["status"] == 499
+
+
+def test_deadline_reaches_postgres() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    connector = DBConnector(url=TEST_DB_URL, echo=False)
+    app, _ = make_app(connector)
+
+    async def main() -> tuple[httpx.Response, httpx.Response, float, int]:
+        try:
+            timeout = await get(app, "/db/timeout", timeout=5)
+
+            started = time.perf_counter()
+            cancelled = await get(app, "/db/sleep", timeout=0.3)
+            elapsed = time.perf_counter() - started
+
+            async with connector.engine.connect() as conn:
+                running = (
+                    await conn.execute(
+                        text("SELECT count(*) FROM pg_stat_activity WHERE query = 'SELECT pg_sleep(10)' AND state = 'active'")
+                    )
+                ).scalar_one()
+
+            return timeout, cancelled, elapsed, running
+
+        finally:
+            await connector.dispose()
+
+    timeout, cancelled, elapsed, running = asyncio.run(main())
+
+    # SET LOCAL statement_timeout выставляется из оставшегося срока запроса
+    assert timeout.status_code == 200
+    assert 4000 <= int(timeout.json()["value"].removesuffix("ms")) <= 5000
+    assert cancelled.status_code == 504
+    assert elapsed < 2
+    assert running == 0
+
+
+def test_route_timeout_reaches_transaction_opened_by_router_dependency() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    connector = DBConnector(url=TEST_DB_URL, echo=False)
+    app, _ = make_app(connector)
+
+    async def main() -> httpx.Response:
+        try:
+            return await get(app, "/db/guarded")
+
+        finally:
+            await connector.dispose()
+
+    response = asyncio.run(main())
+
+    # Срок маршрута известен до первой зависимости, statement_timeout транзакции выставлен по нему, а не по default
+    assert response.status_code == 200
+    assert response.json()["same_transaction"] is True
+    assert 29000 <= int(response.json()["value"].removesuffix("ms")) <= 30000
+
+
+def test_pool_statement_timeout_spares_set_config_round_trip() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    from app.core import deadline_settings
+
+    connector = DBConnector(url=TEST_DB_URL, echo=False)
+    app, _ = make_app(connector)
+    statements = []
+
+    async def main() -> tuple[httpx.Response, list[str], httpx.Response, list[str]]:
+        try:
+            await connector.warm_up(connections=1)
+            event.listen(
+                connector.engine.sync_engine,
+                "before_cursor_execute",
+                lambda conn, cursor, statement, *args: statements.append(statement),
+            )
+
+            default = await get(app, "/db/timeout")
+            default_statements = list(statements)
+            statements.clear()
+
+            shortened = await get(app, "/db/timeout", timeout=5)
+
+            return default, default_statements, shortened, list(statements)
+
+        finally:
+            await connector.dispose()
+
+    default, default_statements, shortened, shortened_statements = asyncio.run(main())
+
+    # Срок по умолчанию совпадает со statement_timeout пула, транзакция обходится без set_config
+    assert default.json()["value"] == f"{int(deadline_settings.default)}s"
+    assert not any("set_config" in statement for statement in default_statements)
+    assert any("set_config" in statement for statement in shortened_statements)
+    assert 4000 <= int(shortened.json()["value"].removesuffix("ms")) <= 5000
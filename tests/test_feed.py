@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.schemas import PostResponse
+from app.service.feed import FeedWindow
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def posts(count: int) -> list[PostResponse]:
+    """Посты от новых к старым, как их возвращает PostRepo.get_feed"""
+    return [
+        PostResponse(
+            id=post_id, user_id=1, title="title", body="body", version=1,
+            created_at=NOW - timedelta(minutes=count - post_id), updated_at=NOW,
+        )
+        for post_id in range(count, 0, -1)
+    ]
+
+
+def ids(page: tuple[list[PostResponse], bool]) -> tuple[list[int], bool]:
+    items, has_next = page
+    return [item.id for item in items], has_next
+
+
+def test_pages_inside_window_are_served_from_memory() -> None:
+    feed = FeedWindow(size=10, ttl=60)
+    assert feed.page(limit=3) is None
+
+    feed.fill(posts(100)[:10], feed.generation)
+
+    assert ids(feed.page(limit=3)) == ([100, 99, 98], True)
+    last = feed.page(limit=3)[0][-1]
+    assert ids(feed.page(limit=3, after=(last.created_at, last.id))) == ([97, 96, 95], True)
+
+    # Окно не содержит всей таблицы: страницу, которая доходит до его конца, отдает БД
+    last = feed.page(limit=9)[0][-1]
+    assert feed.page(limit=3, after=(last.created_at, last.id)) is None
+
+
+def test_window_with_whole_table_serves_last_page() -> None:
+    feed = FeedWindow(size=10, ttl=60)
+    feed.fill(posts(5), feed.generation)
+
+    last = feed.page(limit=3)[0][-1]
+    assert ids(feed.page(limit=3, after=(last.created_at, last.id))) == ([2, 1], False)
+
+
+def test_fill_started_before_invalidation_is_discarded() -> None:
+    feed = FeedWindow(size=10, ttl=60)
+    generation = feed.generation
+
+    feed.invalidate()
+    feed.fill(posts(5), generation)
+
+    assert not feed.loaded
+
+
+def test_window_is_invalidated_after_commit_only() -> None:
+    feed = FeedWindow(size=10, ttl=60)
+
+    with Session(create_engine("sqlite://")) as session:
+        feed.fill(posts(5), feed.generation)
+        session.execute(text("SELECT 1"))
+        feed.mark_changed(session)
+        session.rollback()
+        assert feed.loaded
+
+        session.execute(text("SELECT 1"))
+        feed.mark_changed(session)
+        assert feed.loaded
+        session.commit()
+        assert not feed.loaded
+
+
+def test_importing_post_service_does_not_read_feed_settings() -> None:
+    code = (
+        "import app.service.post\n"
+        "from app.core import feed_settings\n"
+        "print(object.__getattribute__(feed_settings, '_settings') is None)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "True"
@@ -0,0 +1,256 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.connector import DBConnector
+from app.models import Order, OrderProducts
+from app.repositories import OrderRepo, PartitionRepo
+from app.service import PartitionService
+from app.service.partition import add_months, month_start
+from app.tools.exeptions import DatabaseError
+from tests.plans import capture_selects, explain, iter_nodes
+
+
+def scanned_relations(plan: dict) -> set[str]:
+    return {node["Relation Name"] for node in iter_nodes(plan) if "Relation Name" in node}
+
+
+def test_date_range_query_prunes_partitions(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    end = datetime.now(timezone.utc) - timedelta(days=1)
+    dates = (end - timedelta(hours=2), end)
+    expected = {
+        f"{table}_p{month:%Y%m}"
+        for table in ("orders", "order_products")
+        for month in {month_start(dates[0]), month_start(dates[1])}
+    }
+
+    async def run() -> list[set[str]]:
+        captured = await capture_selects(
+            engine=pg_engine,
+            query=lambda s: OrderRepo.get_orders_by_date(dates=dates, session=s),
+        )
+        return [
+            scanned_relations(await explain(pg_engine, statement, parameters))
+            for statement, parameters in captured
+        ]
+
+    plans = loop.run_until_complete(run())
+    scanned = set().union(*plans)
+
+    # Первый запрос выбирает заказы, второй (selectinload) - их позиции
+    assert any(name.startswith("orders_p") for name in plans[0])
+    assert any(name.startswith("order_products_p") for name in plans[1])
+    assert {
+        name for name in scanned if name.startswith(("orders_", "order_products_"))
+    } <= expected
+
+
+def test_ensure_partitions_is_idempotent(
+    pg_connector: DBConnector,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    async def run() -> tuple[list[str], list[str]]:
+        created = await PartitionService.ensure_partitions(
+            connector=pg_connector, months_ahead=6
+        )
+        again = await PartitionService.ensure_partitions(
+            connector=pg_connector, months_ahead=6
+        )
+        return created, again
+
+    created, again = loop.run_until_complete(run())
+
+    month = add_months(month_start(datetime.now(timezone.utc)), 6)
+    assert f"orders_p{month:%Y%m}" in created
+    assert f"order_products_p{month:%Y%m}" in created
+    assert again == []
+
+
+def test_rows_outside_partitions_go_to_default(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    async def run() -> str:
+        async with async_sessionmaker(pg_engine, expire_on_commit=False)() as session:
+            order = Order(
+                user_id=1,
+                original_price=1,
+                total_price=1,
+                total_quantity=1,
+                created_at=datetime(2001, 1, 1, tzinfo=timezone.utc),
+            )
+            session.add(order)
+            await session.commit()
+
+            result = await session.execute(
+                text("SELECT tableoid::regclass::text FROM orders WHERE id = :id"),
+                {"id": order.id},
+            )
+            partition = result.scalar_one()
+
+            await session.delete(order)
+            await session.commit()
+            return partition
+
+    assert loop.run_until_complete(run()) == "orders_default"
+
+
+def test_detach_archives_oldest_month_without_delete(
+    pg_engine: AsyncEngine,
+    pg_connector: DBConnector,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    async def run() -> None:
+        session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+        async with session_factory() as session:
+            oldest = min(
+                name
+                for name in await PartitionRepo.get_partitions("orders", session)
+                if name.startswith("orders_p")
+            )
+            month = datetime.strptime(oldest, "orders_p%Y%m").replace(tzinfo=timezone.utc)
+
+            order = Order(
+                user_id=1,
+                original_price=1,
+                total_price=1,
+                total_quantity=1,
+                created_at=month + timedelta(days=1),
+            )
+            order.products.append(
+                OrderProducts(product_id=1, quantity=1, current_price=1)
+            )
+            session.add(order)
+            await session.commit()
+
+            detached = await PartitionService.detach_partitions(
+                before=add_months(month, 1), connector=pg_connector
+            )
+
+        try:
+            assert detached == [f"order_products_p{month:%Y%m}", oldest]
+
+            async with session_factory() as session:
+                assert await OrderRepo.get_by_order_id(order.id, session) is None
+                assert oldest not in await PartitionRepo.get_partitions("orders", session)
+
+                archived = await session.execute(
+                    text(f"SELECT count(*) FROM {oldest} WHERE id = :id"),
+                    {"id": order.id},
+                )
+                assert archived.scalar_one() == 1
+
+                foreign_keys = await session.execute(
+                    text(
+                        "SELECT count(*) FROM pg_constraint "
+                        "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+                    ),
+                    {"name": oldest},
+                )
+                assert foreign_keys.scalar_one() == 0
+
+        finally:
+            async with pg_engine.begin() as conn:
+                for name in detached:
+                    await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+    loop.run_until_complete(run())
+
+
+def test_late_partition_moves_rows_out_of_default(
+    pg_engine: AsyncEngine,
+    pg_connector: DBConnector,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    async def run() -> tuple[list[str], str, str, str, str, int, list[str]]:
+        session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+        async with session_factory() as session:
+            oldest = min(
+                name
+                for name in await PartitionRepo.get_partitions("orders", session)
+                if name.startswith("orders_p")
+            )
+            late = add_months(datetime.strptime(oldest, "orders_p%Y%m").replace(tzinfo=timezone.utc), -2)
+            blocked = add_months(late, 1)
+            names = [f"{table}_p{late:%Y%m}" for table in ("orders", "order_products")]
+            blocked_name = f"order_products_p{blocked:%Y%m}"
+
+            # Заказ месяца без секции, как при запоздавшем задании, попадает в секцию по умолчанию
+            order = Order(
+                user_id=1,
+                original_price=1,
+                total_price=1,
+                total_quantity=1,
+                created_at=late + timedelta(days=3),
+            )
+            order.products.append(
+                OrderProducts(product_id=1, quantity=1, current_price=1, created_at=order.created_at)
+            )
+            session.add(order)
+            # Одноименная обычная таблица не дает создать секцию следующего месяца
+            await session.execute(text(f"CREATE TABLE {blocked_name} (id integer)"))
+            await session.commit()
+
+        try:
+            async with session_factory() as session:
+                try:
+                    await PartitionService.ensure_partitions(connector=pg_connector, months_ahead=0, since=late)
+                    error = ""
+                except DatabaseError as e:
+                    error = str(e)
+
+                partitions = await PartitionRepo.get_partitions("orders", session)
+                order_partition = (
+                    await session.execute(
+                        text("SELECT tableoid::regclass::text FROM orders WHERE id = :id"), {"id": order.id}
+                    )
+                ).scalar_one()
+                line_partition = (
+                    await session.execute(
+                        text("SELECT tableoid::regclass::text FROM order_products WHERE order_id = :id"),
+                        {"id": order.id},
+                    )
+                ).scalar_one()
+                loaded = await OrderRepo.get_by_order_id(order.id, session)
+
+                return names, blocked_name, error, order_partition, line_partition, len(loaded.products), partitions
+
+        finally:
+            async with session_factory() as session:
+                await session.execute(delete(Order).where(Order.id == order.id))
+                await session.commit()
+
+                attached = set(await PartitionRepo.get_partitions("orders", session))
+                attached.update(await PartitionRepo.get_partitions("order_products", session))
+                await PartitionRepo.detach_partitions(
+                    partitions=[
+                        (table, f"{table}_p{month:%Y%m}")
+                        for month in (blocked, late)
+                        for table in ("order_products", "orders")
+                        if f"{table}_p{month:%Y%m}" in attached
+                    ],
+                    session=session,
+                )
+                await session.commit()
+
+            async with pg_engine.begin() as conn:
+                for month in (late, blocked):
+                    for table in ("order_products", "orders"):
+                        await conn.execute(text(f"DROP TABLE IF EXISTS {table}_p{month:%Y%m}"))
+
+    names, blocked_name, error, order_partition, line_partition, lines, partitions = loop.run_until_complete(run())
+
+    # Строки месяца перенесены в его секцию, заблокированный месяц не помешал созданию остальных и указан в ошибке
+    assert order_partition == names[0]
+    assert line_partition == names[1]
+    assert lines == 1
+    assert names[0] in partitions
+    assert error.startswith(f"Created partitions: {names[0]}, {names[1]}.")
+    assert blocked_name in error.split("Failed:")[1]
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc as sa_exc, text
+
+from app.core.connector import DBConnector
+from tests.conftest import TEST_DB_URL
+
+
+POOLS = {
+    "interactive": {"pool_size": 2, "max_overflow": 0, "pool_timeout": 5.0},
+    "admin": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 0.2},
+    "background": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 0.2},
+}
+
+
+def sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+def test_saturated_admin_pool_does_not_block_interactive() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    connector = DBConnector(url=TEST_DB_URL, echo=False, pools=POOLS)
+    timeouts = sample("db_pool_timeouts_total", "admin")
+
+    async def main() -> tuple[float, float, float]:
+        try:
+            # Долгий отчет занимает единственное соединение пула admin
+            async with connector.unit_of_work(pool="admin") as report:
+                await report.execute(text("SELECT 1"))
+
+                started = time.perf_counter()
+                with pytest.raises(sa_exc.TimeoutError):
+                    async with connector.unit_of_work(pool="admin") as session:
+                        await session.execute(text("SELECT 1"))
+
+                admin_wait = time.perf_counter() - started
+                in_use = sample("db_pool_connections_in_use", "admin")
+
+                started = time.perf_counter()
+                async with connector.unit_of_work() as session:
+                    await session.execute(text("SELECT 1"))
+
+                return admin_wait, time.perf_counter() - started, in_use
+
+        finally:
+            await connector.dispose()
+
+    admin_wait, interactive_wait, in_use = asyncio.run(main())
+
+    assert admin_wait >= POOLS["admin"]["pool_timeout"]
+    assert interactive_wait < POOLS["admin"]["pool_timeout"]
+    assert in_use == 1
+    assert sample("db_pool_timeouts_total", "admin") - timeouts == 1
+    assert sample("db_pool_capacity", "admin") == 1
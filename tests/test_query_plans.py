@@ -0,0 +1,122 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.repositories import OrderRepo, PostRepo, ProfileRepo, UserRepo
+from app.repositories.cart import CartRepo
+from app.utils import AuthUtils
+from tests.plans import capture_selects, explain, iter_nodes
+
+
+# Таблицы, в которых по статистике планировщика меньше строк, можно читать полным сканированием
+SEQ_SCAN_ROWS_THRESHOLD = int(os.getenv("TEST_SEQ_SCAN_THRESHOLD", "1000"))
+
+
+def narrow_window() -> tuple[datetime, datetime]:
+    """Узкий интервал времени, который выбирают отчеты администратора"""
+    end = datetime.now(timezone.utc) - timedelta(days=1)
+    return end - timedelta(hours=2), end
+
+
+# Каждый сценарий вызывает метод репозитория так же, как это делают сервисы
+HOT_QUERIES: dict[str, Callable[[AsyncSession], Awaitable[Any]]] = {
+    "user_by_id": lambda s: UserRepo.get_by_id(model_id=42, session=s),
+    "user_by_login": lambda s: UserRepo.get_by_login(
+        login="user42@example.com", session=s
+    ),
+    "user_by_refresh": lambda s: UserRepo.get_by_refresh(
+        user_id=42,
+        device_id="default",
+        token_hash=AuthUtils.hash_token("42"),
+        session=s,
+    ),
+    "user_by_date": lambda s: UserRepo.get_by_date(dates=narrow_window(), session=s),
+    "profile_by_user_id": lambda s: ProfileRepo.get_by_user_id(user_id=42, session=s),
+    "posts_by_user_id": lambda s: PostRepo.get_all_by_user_id(user_id=42, session=s),
+    "post_by_user_and_id": lambda s: PostRepo.get_by_user_and_model_id(
+        model_id=42, user_id=43, session=s
+    ),
+    "posts_by_date": lambda s: PostRepo.get_by_date(dates=narrow_window(), session=s),
+    "posts_feed": lambda s: PostRepo.get_feed(limit=21, session=s),
+    "posts_feed_after_cursor": lambda s: PostRepo.get_feed(
+        limit=21, after=(narrow_window()[0], 42), session=s
+    ),
+    "cart_by_user_id": lambda s: CartRepo.get_by_user_id(user_id=42, session=s),
+    "carts_by_date": lambda s: CartRepo.get_all_carts_by_date(
+        dates=narrow_window(), session=s
+    ),
+    "orders_by_user_id": lambda s: OrderRepo.get_all_orders_by_user_id(
+        user_id=42, session=s
+    ),
+    "order_summaries_by_user_id": lambda s: OrderRepo.get_order_summaries_by_user_id(
+        user_id=42, limit=20, session=s
+    ),
+    "order_by_user_and_id": lambda s: OrderRepo.get_by_user_id_and_order_id(
+        user_id=43, order_id=42, session=s
+    ),
+    "orders_by_date": lambda s: OrderRepo.get_orders_by_date(
+        dates=narrow_window(), session=s
+    ),
+}
+
+
+async def explain_hot_query(
+    engine: AsyncEngine,
+    query: Callable[[AsyncSession], Awaitable[Any]],
+) -> list[tuple[str, str, int]]:
+    """
+    Выполняет метод репозитория, перехватывает все выданные им SQL запросы и получает их планы
+    :param engine: Движок БД
+    :param query: Сценарий, вызывающий метод репозитория
+    :return: Список (запрос, таблица, оценка строк) для полных сканирований больших таблиц
+    """
+    captured = await capture_selects(engine=engine, query=query)
+
+    async with engine.connect() as conn:
+        reltuples = dict(
+            (
+                await conn.execute(
+                    text(
+                        "SELECT relname, reltuples::bigint FROM pg_class "
+                        "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+                    )
+                )
+            ).all()
+        )
+
+    violations = []
+
+    for statement, parameters in captured:
+        plan = await explain(engine=engine, statement=statement, parameters=parameters)
+
+        for node in iter_nodes(plan):
+            relation = node.get("Relation Name")
+
+            if (
+                node["Node Type"] == "Seq Scan"
+                and reltuples.get(relation, 0) >= SEQ_SCAN_ROWS_THRESHOLD
+            ):
+                violations.append((statement, relation, reltuples[relation]))
+
+    return violations
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_avoids_seq_scan(
+    name: str,
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    violations = loop.run_until_complete(
+        explain_hot_query(engine=pg_engine, query=HOT_QUERIES[name])
+    )
+
+    assert not violations, "\n\n".join(
+        f"Seq Scan on {relation} (~{rows} rows) in:\n{statement}"
+        for statement, relation, rows in violations
+    )
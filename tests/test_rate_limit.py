@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+import main
+from app.api.depends import security
+from app.core import db_connector, rate_limit_settings
+from app.core.limiter import MemoryWindows, SlidingWindowLimiter, retry_after
+
+
+def test_memory_windows_weigh_previous_window() -> None:
+    windows = MemoryWindows()
+
+    assert [windows.hit("key", 10, 1.0, 3)[0] for _ in range(4)] == [True, True, True, False]
+
+    # В середине следующего окна три попытки предыдущего весят 1.5, принимается еще одна
+    assert windows.hit("key", 11, 0.5, 3) == (True, 3, 1)
+    assert windows.hit("key", 11, 0.5, 3) == (False, 3, 1)
+
+    # Через окно предыдущие попытки уже не учитываются
+    assert windows.hit("key", 13, 0.5, 3) == (True, 0, 1)
+
+
+def test_retry_after_waits_until_estimate_drops_below_limit() -> None:
+    # Текущее окно заполнено: ждем конца окна и еще 1/5 следующего
+    assert retry_after(previous=0, current=5, limit=5, window=60, elapsed=10) == 62
+    # Вклад предыдущего окна 4 * (1 - 10/60) + 1 + 1 > 5, ждем, пока он не опустится до 3
+    assert retry_after(previous=4, current=1, limit=5, window=60, elapsed=10) == 5
+    assert retry_after(previous=0, current=0, limit=0, window=60, elapsed=59.5) == 1
+
+
+def test_limiter_without_redis_counts_in_memory() -> None:
+    limiter = SlidingWindowLimiter(name="test", window=60)
+
+    async def run() -> list:
+        return [await limiter.acquire(rule="login", key="alice", limit=2) for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+
+    assert first is None and second is None
+    assert 1 <= third <= 120
+
+
+@pytest.mark.parametrize(
+    "rule, key, limit",
+    [
+        ("login", "alice", rate_limit_settings.login_per_login),
+        ("ip", "127.0.0.1", rate_limit_settings.login_per_ip),
+    ],
+)
+def test_login_rejected_before_database(monkeypatch: pytest.MonkeyPatch, rule: str, key: str, limit: int) -> None:
+    limiter = SlidingWindowLimiter(name="login", window=60)
+    monkeypatch.setattr(security, "login_limiter", limiter)
+
+    sessions = []
+
+    async def get_session():
+        sessions.append(1)
+        yield None
+
+    monkeypatch.setitem(main.app.dependency_overrides, db_connector.get_session, get_session)
+
+    async def run() -> httpx.Response:
+        # Исчерпываем лимит, логин в форме отличается от ключа только регистром и пробелами
+        while await limiter.acquire(rule=rule, key=key, limit=limit) is None:
+            pass
+
+        transport = httpx.ASGITransport(app=main.app, client=("127.0.0.1", 50000))
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/user/auth/login", data={"username": " Alice ", "password": "password"})
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert sessions == []
+
+
+def test_unresponsive_redis_falls_back_to_memory_without_waiting() -> None:
+    async def run() -> tuple[list, float, list[int]]:
+        connections = []
+
+        async def hang(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            # Сервер принимает соединение и не отвечает, как Redis за разорванной сетью
+            connections.append(1)
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(hang, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        limiter = SlidingWindowLimiter(
+            name="test",
+            window=60,
+            redis_url=f"redis://127.0.0.1:{port}",
+            timeout=0.05,
+            cooldown=60,
+        )
+
+        try:
+            started = time.perf_counter()
+            results = [await limiter.acquire(rule="login", key="alice", limit=2) for _ in range(3)]
+            elapsed = time.perf_counter() - started
+            connected = len(connections)
+
+            # После cooldown Redis опрашивается снова
+            limiter._redis_down_until = 0.0
+            await limiter.acquire(rule="login", key="bob", limit=2)
+
+            return results, elapsed, [connected, len(connections)]
+
+        finally:
+            await limiter.redis.aclose()
+            server.close()
+
+    errors = REGISTRY.get_sample_value("rate_limit_backend_errors_total") or 0.0
+    results, elapsed, connections = asyncio.run(run())
+
+    # Лимит соблюдается по счетчикам в памяти, таймаут ожидается один раз, а не на каждую попытку
+    assert results[:2] == [None, None] and results[2] >= 1
+    assert elapsed < 0.5
+    assert connections == [1, 2]
+    assert REGISTRY.get_sample_value("rate_limit_backend_errors_total") - errors == 2
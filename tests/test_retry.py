@@ -0,0 +1,230 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Request
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.depends.retry import RetryUnitOfWork
+from app.api.response import PydanticRoute
+from app.core.connector import DBConnector
+from app.core.retry import Attempt, RetryPolicy, attempt_scoped, transient_reason
+from app.tools.exeptions import DatabaseError
+from tests.conftest import TEST_DB_URL
+
+
+class PostgresError(Exception):
+    """Ошибка драйвера с SQLSTATE, как у asyncpg"""
+
+    def __init__(self, sqlstate: str) -> None:
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def repo_error(sqlstate: str) -> DatabaseError:
+    """Ошибка так, как ее поднимает репозиторий: DatabaseError с ошибкой драйвера в причине"""
+    try:
+        try:
+            raise PostgresError(sqlstate)
+        except PostgresError as e:
+            raise DatabaseError("Error when updating cart") from e
+    except DatabaseError as e:
+        return e
+
+
+def retries(operation: str, reason: str, name: str = "db_retries_total") -> float:
+    return REGISTRY.get_sample_value(name, {"operation": operation, "reason": reason}) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(RetryPolicy, "backoff", lambda self, attempt: 0.0)
+
+
+def test_transient_reason_follows_cause_chain() -> None:
+    assert transient_reason(repo_error("40P01")) == "deadlock"
+    assert transient_reason(repo_error("40001")) == "serialization"
+    assert transient_reason(repo_error("08006")) == "connection"
+    assert transient_reason(repo_error("57P01")) == "connection"
+    assert transient_reason(repo_error("23505")) is None
+    assert transient_reason(ValueError()) is None
+
+
+def test_policy_retries_transient_errors_until_attempts_run_out() -> None:
+    policy = RetryPolicy(attempts=3, base_delay=0.0, max_delay=0.0)
+    calls = []
+
+    async def flaky(attempt: Attempt) -> str:
+        calls.append(attempt.number)
+
+        if len(calls) < 3:
+            raise repo_error("40P01")
+
+        return "done"
+
+    before = retries("test.flaky", "deadlock")
+
+    assert asyncio.run(policy.run(flaky, operation="test.flaky")) == "done"
+    assert calls == [0, 1, 2]
+    assert retries("test.flaky", "deadlock") - before == 2
+
+    async def always(attempt: Attempt) -> None:
+        raise repo_error("40001")
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(policy.run(always, operation="test.always"))
+
+    assert retries("test.always", "serialization", "db_retries_exhausted_total") == 1
+
+
+def test_policy_does_not_retry_permanent_errors_and_unknown_commit_outcome() -> None:
+    policy = RetryPolicy(attempts=3, base_delay=0.0, max_delay=0.0)
+    calls = []
+
+    async def unique_violation(attempt: Attempt) -> None:
+        calls.append(attempt.number)
+        raise repo_error("23505")
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(policy.run(unique_violation, operation="test.unique"))
+
+    assert calls == [0]
+
+    async def lost_on_commit(attempt: Attempt) -> None:
+        calls.append(attempt.number)
+        attempt.committing = True
+        raise repo_error("08006")
+
+    # Транзакция могла быть зафиксирована: запись не повторяется, идемпотентная работа повторяется
+    calls.clear()
+    with pytest.raises(DatabaseError):
+        asyncio.run(policy.run(lost_on_commit, operation="test.commit"))
+
+    assert calls == [0]
+
+    calls.clear()
+    with pytest.raises(DatabaseError):
+        asyncio.run(policy.run(lost_on_commit, operation="test.commit", idempotent=True))
+
+    assert calls == [0, 1, 2]
+
+
+def make_app() -> tuple[FastAPI, list[str]]:
+    """Приложение, обработчики которого падают с взаимоблокировкой на первой попытке, и события их сессий"""
+    events = []
+    router = APIRouter(route_class=PydanticRoute)
+
+    @asynccontextmanager
+    async def unit_of_work():
+        events.append("open")
+
+        try:
+            yield
+
+        except Exception:
+            events.append("rollback")
+            raise
+
+        events.append("commit")
+
+    # Как DBConnector.get_session: единица работы закрывается вместе с попыткой запроса
+    async def session(request: Request) -> None:
+        async with attempt_scoped(request, unit_of_work()):
+            yield
+
+    async def deadlocked_once() -> dict:
+        if events.count("open") == 1:
+            raise repo_error("40P01")
+
+        return {}
+
+    router.add_api_route(
+        "/read",
+        deadlocked_once,
+        methods=["GET"],
+        response_model=dict,
+        dependencies=[Depends(session, scope="function")],
+    )
+    router.add_api_route(
+        "/checkout",
+        deadlocked_once,
+        methods=["POST"],
+        response_model=dict,
+        dependencies=[Depends(RetryUnitOfWork()), Depends(session, scope="function")],
+    )
+    router.add_api_route(
+        "/write",
+        deadlocked_once,
+        methods=["POST"],
+        response_model=dict,
+        dependencies=[Depends(session, scope="function")],
+    )
+
+    app = FastAPI()
+    app.include_router(router)
+
+    return app, events
+
+
+async def call(app: FastAPI, method: str, path: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.request(method, path)
+
+
+@pytest.mark.parametrize(("method", "path"), [("GET", "/read"), ("POST", "/checkout")])
+def test_route_retried_on_fresh_session(method: str, path: str) -> None:
+    app, events = make_app()
+
+    assert asyncio.run(call(app, method, path)).status_code == 200
+
+    # Сессия неудачной попытки откатывается до начала следующей
+    assert events == ["open", "rollback", "open", "commit"]
+
+
+def test_write_without_unit_of_work_marker_not_retried() -> None:
+    app, events = make_app()
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(call(app, "POST", "/write"))
+
+    assert events == ["open", "rollback"]
+
+
+def test_deadlock_victim_retried() -> None:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    connector = DBConnector(url=TEST_DB_URL, echo=False)
+    locked = []
+
+    def transfer(first: int, second: int):
+        async def work(session: AsyncSession) -> None:
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": first})
+            locked.append(first)
+
+            # Обе транзакции держат по блокировке и ждут блокировку друг друга
+            while len(locked) < 2:
+                await asyncio.sleep(0.01)
+
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": second})
+
+        return work
+
+    async def main() -> None:
+        try:
+            await asyncio.gather(
+                connector.run(transfer(7001, 7002), operation="test.transfer"),
+                connector.run(transfer(7002, 7001), operation="test.transfer"),
+            )
+
+        finally:
+            await connector.dispose()
+
+    before = retries("test.transfer", "deadlock")
+
+    asyncio.run(main())
+
+    assert retries("test.transfer", "deadlock") - before == 1
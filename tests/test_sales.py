@@ -0,0 +1,426 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import delete, event, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.api.depends.security import admin_guard
+from app.api.view.admin.report import router as report_router
+from app.core import db_connector
+from app.core.connector import DBConnector
+from app.models import CartProduct, Order, OrderProducts, SalesDaily, SalesDailyProduct
+from app.repositories import SalesRepo
+from app.schemas.order import OrderCreate
+from app.service import OrderService, SalesService
+from app.service.partition import add_months, month_start
+
+
+async def rollups(session: AsyncSession, dates: tuple[date, date]) -> tuple[dict, dict]:
+    """Итоги интервала: {день: (заказы, выручка, единицы)} и {(день, продукт): (заказы, выручка, единицы)}"""
+    days = await session.execute(
+        select(SalesDaily.day, SalesDaily.orders_count, SalesDaily.revenue, SalesDaily.units)
+        .where(SalesDaily.day.between(*dates))
+    )
+    products = await session.execute(
+        select(
+            SalesDailyProduct.day,
+            SalesDailyProduct.product_id,
+            SalesDailyProduct.orders_count,
+            SalesDailyProduct.revenue,
+            SalesDailyProduct.units,
+        )
+        .where(SalesDailyProduct.day.between(*dates))
+    )
+
+    return (
+        {row[0]: tuple(row[1:]) for row in days},
+        {(row[0], row[1]): tuple(row[2:]) for row in products},
+    )
+
+
+def expected_rollups(orders: list[tuple[datetime, list[tuple[int, int, int]]]]) -> tuple[dict, dict]:
+    """Итоги, посчитанные по списку заказов (created_at, [(продукт, количество, цена)])"""
+    days, products = {}, {}
+
+    for created_at, lines in orders:
+        day = created_at.date()
+        count, revenue, units = days.get(day, (0, 0, 0))
+        days[day] = (count + 1, revenue + sum(q * p for _, q, p in lines), units + sum(q for _, q, _ in lines))
+
+        for product_id, quantity, price in lines:
+            count, revenue, units = products.get((day, product_id), (0, 0, 0))
+            products[(day, product_id)] = (count + 1, revenue + quantity * price, units + quantity)
+
+    return days, products
+
+
+def test_checkout_adds_order_to_daily_rollups(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    async def run() -> tuple[date, tuple[dict, dict], tuple[dict, dict], Order]:
+        session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+        async with session_factory() as session:
+            user_id = (await session.execute(text("SELECT max(user_id) FROM carts"))).scalar_one()
+            cart_id = (
+                await session.execute(text("SELECT id FROM carts WHERE user_id = :id"), {"id": user_id})
+            ).scalar_one()
+
+            await session.execute(delete(CartProduct).where(CartProduct.cart_id == cart_id))
+            session.add_all(
+                [
+                    CartProduct(cart_id=cart_id, product_id=3, quantity=2, current_price=150),
+                    CartProduct(cart_id=cart_id, product_id=5, quantity=1, current_price=400),
+                ]
+            )
+            await session.commit()
+
+            today = datetime.now(timezone.utc).date()
+            before = await rollups(session, (today, today))
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement.lstrip())
+
+            event.listen(pg_engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                order = await OrderService.create_order(
+                    user_id=user_id,
+                    order_schema=OrderCreate(),
+                    session=session,
+                )
+            finally:
+                event.remove(pg_engine.sync_engine, "before_cursor_execute", capture)
+
+            await session.commit()
+
+            return today, before, await rollups(session, (today, today)), order
+
+    statements = []
+    today, before, after, order = loop.run_until_complete(run())
+
+    # Строки итогов блокируются последними запросами транзакции заказа
+    assert statements[-2].startswith("INSERT INTO sales_daily ")
+    assert statements[-1].startswith("INSERT INTO sales_daily_products ")
+
+    def delta(rows: tuple[dict, dict], key) -> tuple[int, int, int]:
+        new = rows[0 if isinstance(key, date) else 1].get(key, (0, 0, 0))
+        old = before[0 if isinstance(key, date) else 1].get(key, (0, 0, 0))
+        return tuple(n - o for n, o in zip(new, old))
+
+    assert order.created_at.astimezone(timezone.utc).date() == today
+    assert (order.total_price, order.total_quantity) == (700, 3)
+    assert delta(after, today) == (1, 700, 3)
+    assert delta(after, (today, 3)) == (1, 300, 2)
+    assert delta(after, (today, 5)) == (1, 400, 1)
+
+
+def test_rebuild_reproduces_incremental_rollups_after_backfill(
+    pg_engine: AsyncEngine,
+    pg_connector: DBConnector,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    # Будущий месяц: секции созданы фикстурой, наполнение туда заказов не кладет
+    month = add_months(month_start(datetime.now(timezone.utc)), 2)
+    next_month = add_months(month, 1)
+    dates = (month.date(), (next_month - timedelta(days=1)).date())
+
+    incremental = [
+        (month, [(1, 2, 100), (2, 1, 250)]),
+        (month + timedelta(hours=5), [(1, 1, 100)]),
+        (month + timedelta(days=9, hours=12), [(3, 4, 30)]),
+    ]
+    backfilled = [
+        (month + timedelta(days=9, hours=23), [(3, 1, 30), (1, 1, 90)]),
+        (next_month - timedelta(seconds=1), [(2, 2, 250)]),
+    ]
+    # Первая секунда следующего месяца не входит в пересчет месяца
+    outside = [(next_month, [(1, 5, 100)])]
+
+    async def add_orders(session: AsyncSession, orders: list, record: bool) -> list[Order]:
+        models = []
+
+        for created_at, lines in orders:
+            order = Order(
+                user_id=1,
+                original_price=sum(q * p for _, q, p in lines),
+                total_price=sum(q * p for _, q, p in lines),
+                total_quantity=sum(q for _, q, _ in lines),
+                created_at=created_at,
+            )
+            for product_id, quantity, price in lines:
+                order.products.append(
+                    OrderProducts(product_id=product_id, quantity=quantity, current_price=price, created_at=created_at)
+                )
+            session.add(order)
+            await session.flush()
+
+            if record:
+                await SalesRepo.record_order(order_model=order, session=session)
+
+            models.append(order)
+
+        await session.commit()
+        return models
+
+    async def run() -> tuple[tuple[dict, dict], tuple[dict, dict], tuple[dict, dict]]:
+        session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+        orders = []
+
+        async with session_factory() as session:
+            try:
+                orders += await add_orders(session, incremental, record=True)
+                recorded = await rollups(session, dates)
+
+                await SalesService.rebuild(dates=dates, connector=pg_connector)
+                rebuilt = await rollups(session, dates)
+
+                # Загрузка исторических заказов минует record_order, их учитывает только пересчет
+                orders += await add_orders(session, backfilled + outside, record=False)
+                await SalesService.rebuild(dates=dates, connector=pg_connector)
+                backfill = await rollups(session, dates)
+
+                return recorded, rebuilt, backfill
+
+            finally:
+                for order in orders:
+                    await session.delete(order)
+                await session.execute(delete(SalesDaily).where(SalesDaily.day >= dates[0]))
+                await session.execute(delete(SalesDailyProduct).where(SalesDailyProduct.day >= dates[0]))
+                await session.commit()
+
+    recorded, rebuilt, backfill = loop.run_until_complete(run())
+
+    assert recorded == expected_rollups(incremental)
+    assert rebuilt == recorded
+    assert backfill == expected_rollups(incremental + backfilled)
+
+
+SALES_DAYS = {
+    date(2001, 12, 31): (1, 100, 1),
+    date(2002, 1, 1): (2, 300, 4),
+    date(2002, 1, 15): (1, 50, 2),
+    date(2002, 2, 1): (3, 600, 6),
+}
+
+PRODUCT_DAYS = {
+    (date(2001, 12, 31), 1): (1, 100, 1),
+    (date(2002, 1, 1), 1): (1, 200, 3),
+    (date(2002, 1, 1), 2): (1, 100, 1),
+    (date(2002, 1, 15), 3): (1, 50, 2),
+    (date(2002, 2, 1), 2): (3, 600, 6),
+}
+
+
+@pytest.fixture
+def report_client(pg_engine: AsyncEngine, loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """Клиент маршрутов отчетов над итогами SALES_DAYS и PRODUCT_DAYS, проверка администратора отключена"""
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+    years = (date(2000, 1, 1), date(2002, 12, 31))
+
+    async def clear(session: AsyncSession) -> None:
+        await session.execute(delete(SalesDaily).where(SalesDaily.day.between(*years)))
+        await session.execute(delete(SalesDailyProduct).where(SalesDailyProduct.day.between(*years)))
+
+    async def fill() -> None:
+        async with session_factory() as session:
+            await clear(session)
+            session.add_all(
+                [
+                    SalesDaily(day=day, orders_count=count, revenue=revenue, units=units)
+                    for day, (count, revenue, units) in SALES_DAYS.items()
+                ]
+                + [
+                    SalesDailyProduct(day=day, product_id=product_id, orders_count=count, revenue=revenue, units=units)
+                    for (day, product_id), (count, revenue, units) in PRODUCT_DAYS.items()
+                ]
+            )
+            await session.commit()
+
+    async def get_admin_session() -> AsyncSession:
+        async with session_factory() as session:
+            yield session
+
+    async def cleanup() -> None:
+        async with session_factory() as session:
+            await clear(session)
+            await session.commit()
+
+    loop.run_until_complete(fill())
+
+    app = FastAPI()
+    app.include_router(report_router)
+    app.dependency_overrides[admin_guard] = lambda: None
+    app.dependency_overrides[db_connector.get_admin_session] = get_admin_session
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+
+    loop.run_until_complete(client.aclose())
+    loop.run_until_complete(cleanup())
+
+
+def report(
+    client: httpx.AsyncClient,
+    loop: asyncio.AbstractEventLoop,
+    path: str,
+    dates: tuple[str, str],
+    **params,
+) -> list[dict]:
+    response = loop.run_until_complete(
+        client.get(path, params={"date_start": dates[0], "date_end": dates[1], **params})
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def rows(*items: tuple) -> list[dict]:
+    return [
+        {"period": period, "orders_count": count, "revenue": revenue, "units": units}
+        for period, count, revenue, units in items
+    ]
+
+
+@pytest.mark.parametrize(
+    ("period", "expected"),
+    [
+        (
+            "day",
+            rows(
+                ("2001-12-31", 1, 100, 1),
+                ("2002-01-01", 2, 300, 4),
+                ("2002-01-15", 1, 50, 2),
+                ("2002-02-01", 3, 600, 6),
+            ),
+        ),
+        (
+            "month",
+            rows(("2001-12-01", 1, 100, 1), ("2002-01-01", 3, 350, 6), ("2002-02-01", 3, 600, 6)),
+        ),
+        ("year", rows(("2001-01-01", 1, 100, 1), ("2002-01-01", 6, 950, 12))),
+    ],
+)
+def test_sales_report_groups_by_period(
+    report_client: httpx.AsyncClient,
+    loop: asyncio.AbstractEventLoop,
+    period: str,
+    expected: list[dict],
+) -> None:
+    assert report(report_client, loop, "/admin/reports/sales", ("2001-12-31", "2002-02-01"), period=period) == expected
+
+
+def test_sales_report_boundary_days_and_empty_range(
+    report_client: httpx.AsyncClient,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    path = "/admin/reports/sales"
+
+    # Оба конца интервала включаются, период подписывается своим первым днем, даже если интервал начинается позже
+    assert report(report_client, loop, path, ("2002-01-01", "2002-01-01"), period="month") == rows(
+        ("2002-01-01", 2, 300, 4)
+    )
+    assert report(report_client, loop, path, ("2002-01-02", "2002-01-31"), period="month") == rows(
+        ("2002-01-01", 1, 50, 2)
+    )
+    assert report(report_client, loop, path, ("2001-12-31", "2002-01-01"), period="year") == rows(
+        ("2001-01-01", 1, 100, 1), ("2002-01-01", 2, 300, 4)
+    )
+    assert report(report_client, loop, path, ("2000-01-01", "2000-12-31"), period="day") == []
+
+    response = loop.run_until_complete(
+        report_client.get(path, params={"date_start": "2002-02-01", "date_end": "2002-01-01"})
+    )
+    assert response.status_code == 400
+
+
+def test_product_sales_report_ranks_by_revenue_within_range(
+    report_client: httpx.AsyncClient,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    path = "/admin/reports/sales/products"
+
+    assert report(report_client, loop, path, ("2001-12-31", "2002-02-01"), limit=2) == [
+        {"product_id": 2, "orders_count": 4, "revenue": 700, "units": 7},
+        {"product_id": 1, "orders_count": 2, "revenue": 300, "units": 4},
+    ]
+    assert report(report_client, loop, path, ("2002-01-01", "2002-01-15")) == [
+        {"product_id": 1, "orders_count": 1, "revenue": 200, "units": 3},
+        {"product_id": 2, "orders_count": 1, "revenue": 100, "units": 1},
+        {"product_id": 3, "orders_count": 1, "revenue": 50, "units": 2},
+    ]
+    assert report(report_client, loop, path, ("2000-01-01", "2000-12-31")) == []
+
+
+def test_deleted_orders_leave_sales_report(
+    pg_engine: AsyncEngine,
+    report_client: httpx.AsyncClient,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    # Месяц, который не использует пересчет: секции созданы фикстурой, наполнение туда заказов не кладет
+    first = add_months(month_start(datetime.now(timezone.utc)), 3) + timedelta(hours=1)
+    second = first + timedelta(days=1)
+    days = (first.date().isoformat(), second.date().isoformat())
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def add_order(session: AsyncSession, created_at: datetime, lines: list[tuple[int, int, int]]) -> Order:
+        order = Order(
+            user_id=1,
+            original_price=sum(q * p for _, q, p in lines),
+            total_price=sum(q * p for _, q, p in lines),
+            total_quantity=sum(q for _, q, _ in lines),
+            created_at=created_at,
+        )
+        for product_id, quantity, price in lines:
+            order.products.append(
+                OrderProducts(product_id=product_id, quantity=quantity, current_price=price, created_at=created_at)
+            )
+        session.add(order)
+        await session.flush()
+        await SalesRepo.record_order(order_model=order, session=session)
+        return order
+
+    async def delete_order(order_id: int) -> None:
+        async with session_factory() as session:
+            assert await OrderService.delete_model(model_id=order_id, session=session) is not None
+            await session.commit()
+
+    async def setup() -> list[Order]:
+        async with session_factory() as session:
+            orders = [
+                await add_order(session, first, [(1, 1, 100), (2, 2, 50)]),
+                await add_order(session, first, [(2, 1, 50)]),
+                await add_order(session, second, [(1, 3, 100)]),
+            ]
+            await session.commit()
+            return orders
+
+    async def cleanup(orders: list[Order]) -> None:
+        async with session_factory() as session:
+            await session.execute(delete(Order).where(Order.id.in_([order.id for order in orders])))
+            await session.execute(delete(SalesDaily).where(SalesDaily.day >= first.date()))
+            await session.execute(delete(SalesDailyProduct).where(SalesDailyProduct.day >= first.date()))
+            await session.commit()
+
+    orders = loop.run_until_complete(setup())
+
+    try:
+        assert report(report_client, loop, "/admin/reports/sales", days, period="day") == rows(
+            (days[0], 2, 250, 4), (days[1], 1, 300, 3)
+        )
+
+        loop.run_until_complete(delete_order(orders[0].id))
+        loop.run_until_complete(delete_order(orders[2].id))
+
+        # День без заказов исчезает из отчета, как после пересчета
+        assert report(report_client, loop, "/admin/reports/sales", days, period="day") == rows(
+            (days[0], 1, 50, 1)
+        )
+        assert report(report_client, loop, "/admin/reports/sales/products", days) == [
+            {"product_id": 2, "orders_count": 1, "revenue": 50, "units": 1},
+        ]
+
+    finally:
+        loop.run_until_complete(cleanup(orders))
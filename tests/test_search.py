@@ -0,0 +1,50 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.service import PostService
+
+
+# Пять постов, каждый совпадает номером в заголовке и в тексте, поэтому ранги у них равны
+QUERY = "42 or 4242 or 420 or 421 or 422"
+
+
+def test_search_pages_cover_all_matches_in_rank_order(
+    pg_engine: AsyncEngine,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    session_factory = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+    async def run() -> tuple[list, set[int]]:
+        async with session_factory() as session:
+            # Равные ранги проверяют, что курсор (rank, id) не теряет и не повторяет строки на границе страниц
+            expected = set(
+                (
+                    await session.scalars(
+                        text("SELECT id FROM posts WHERE search_vector @@ websearch_to_tsquery('simple', :query)"),
+                        {"query": QUERY},
+                    )
+                ).all()
+            )
+
+            hits, after = [], None
+
+            while True:
+                page = await PostService.search_page(query=QUERY, limit=2, after=after, session=session)
+                hits += page.items
+
+                if page.next_cursor is None:
+                    return hits, expected
+
+                after = (page.items[-1].rank, page.items[-1].post.id)
+
+    hits, expected = loop.run_until_complete(run())
+
+    assert {hit.post.id for hit in hits} == expected
+    assert len(hits) == len(expected)
+    assert [(hit.rank, hit.post.id) for hit in hits] == sorted(
+        ((hit.rank, hit.post.id) for hit in hits), reverse=True
+    )
+    assert len(hits) == 5
+    assert all("<b>" in hit.headline for hit in hits)
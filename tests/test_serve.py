@@ -0,0 +1,121 @@
+import asyncio
+import importlib.util
+import os
+import signal
+import sys
+
+import httpx
+import pytest
+import uvicorn
+
+from app import serve
+from app.core import server_settings
+
+
+def test_server_settings_are_passed_to_uvicorn(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    monkeypatch.setattr(server_settings, "limit_concurrency", 500)
+    monkeypatch.setattr(sys, "argv", ["app.serve", "--port", "9000"])
+
+    serve.main()
+
+    [(app, kwargs)] = calls
+    assert app == "main:app"
+    assert kwargs["port"] == 9000
+    assert kwargs["workers"] == serve.cpu_count() >= 1
+    assert kwargs["limit_concurrency"] == 500
+    assert kwargs["backlog"] == server_settings.backlog
+    assert kwargs["timeout_keep_alive"] == server_settings.keep_alive
+    assert kwargs["timeout_graceful_shutdown"] == server_settings.graceful_timeout
+    assert kwargs["proxy_headers"] is server_settings.proxy_headers
+    assert kwargs["forwarded_allow_ips"] == server_settings.forwarded_allow_ips
+
+
+def test_client_ip_taken_from_trusted_balancer(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def client_ip(scope, receive, send) -> None:
+        body = scope["client"][0].encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    async def get(balancer: str) -> str:
+        config = uvicorn.Config(client_ip, **serve.uvicorn_options())
+        config.load()
+        transport = httpx.ASGITransport(app=config.loaded_app, client=(balancer, 40000))
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/", headers={"X-Forwarded-For": "203.0.113.7"})
+            return response.text
+
+    monkeypatch.setattr(server_settings, "forwarded_allow_ips", "10.0.0.0/8")
+
+    # Адрес из X-Forwarded-For принимается только от балансировщика, иначе его мог бы подставить сам клиент
+    assert asyncio.run(get("10.1.2.3")) == "203.0.113.7"
+    assert asyncio.run(get("198.51.100.1")) == "198.51.100.1"
+
+
+def test_auto_selects_installed_implementations() -> None:
+    uvloop = importlib.util.find_spec("uvloop") is not None
+    httptools = importlib.util.find_spec("httptools") is not None
+
+    assert serve.select_loop("auto") == ("uvloop" if uvloop else "asyncio")
+    assert serve.select_http("auto") == ("httptools" if httptools else "h11")
+    assert serve.select_loop("asyncio") == "asyncio"
+    assert serve.select_http("h11") == "h11"
+
+
+def test_preload_forks_workers_from_one_import(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    monkeypatch.setattr(serve, "prefork", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(uvicorn, "run", lambda *args, **kwargs: pytest.fail("uvicorn spawns workers itself"))
+    monkeypatch.setattr(sys, "argv", ["app.serve", "--preload", "--workers", "3"])
+
+    serve.main()
+
+    assert calls == [{"host": server_settings.host, "port": server_settings.port, "workers": 3}]
+
+
+def test_workers_failing_at_startup_are_restarted_with_backoff_then_given_up() -> None:
+    backoff = serve.RestartBackoff(quick_exit=10, base_delay=0.5, max_delay=1.5, max_quick_exits=4)
+
+    # Процесс, проработавший дольше quick_exit, перезапускается сразу и сбрасывает счетчик
+    assert backoff.exited(lifetime=3600) == 0.0
+    assert [backoff.exited(lifetime=0.1) for _ in range(3)] == [0.5, 1.0, 1.5]
+    assert backoff.exited(lifetime=60) == 0.0
+    assert [backoff.exited(lifetime=0.1) for _ in range(4)] == [0.5, 1.0, 1.5, None]
+
+
+def test_exit_reason_names_code_or_signal() -> None:
+    pid = os.fork()
+
+    if pid == 0:
+        os._exit(3)
+
+    _, status = os.waitpid(pid, 0)
+    assert serve.exit_reason(status) == "exit code 3"
+
+    pid = os.fork()
+
+    if pid == 0:
+        signal.pause()
+        os._exit(0)
+
+    os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    assert serve.exit_reason(status) == "signal SIGKILL"
+
+
+def test_dead_worker_gauges_are_removed(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    from app.core.metrics import mark_process_dead
+
+    live = tmp_path / "gauge_livesum_4242.db"
+    counter = tmp_path / "counter_4242.db"
+    live.touch()
+    counter.touch()
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    mark_process_dead(4242)
+
+    # Счетчики завершившегося процесса остаются в сумме, значения gauge livesum удаляются
+    assert not live.exists()
+    assert counter.exists()
@@ -0,0 +1,105 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+from sqlalchemy import event, select, update
+
+from app.core.connector import DBConnector
+from app.models import Base, User
+
+
+ROUTE = "GET /test/session"
+
+
+def hold_count() -> float:
+    return REGISTRY.get_sample_value("db_connection_hold_seconds_count", {"route": ROUTE}) or 0.0
+
+
+def run(scenario) -> tuple[object, int]:
+    """Выполняет сценарий с сессией единицы работы на SQLite в памяти, возвращает его результат и число выдач соединений"""
+    connector = DBConnector(url="sqlite+aiosqlite://", echo=False)
+    checkouts = []
+    event.listen(connector.engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+
+    async def main() -> object:
+        async with connector.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.tables["users"].create)
+
+        async with connector.unit_of_work() as session:
+            session.add(User(login="user@example.com", password=b"hash"))
+
+        checkouts.clear()
+
+        try:
+            async with connector.unit_of_work() as session:
+                session.info["route"] = ROUTE
+                return await scenario(connector, session)
+        finally:
+            await connector.engine.dispose()
+
+    result = asyncio.run(main())
+
+    return result, len(checkouts)
+
+
+def test_session_without_statements_does_not_touch_pool() -> None:
+    async def cached(connector, session) -> None:
+        return None
+
+    _, checkouts = run(cached)
+
+    assert checkouts == 0
+
+
+def test_read_only_transaction_releases_connection_between_phases() -> None:
+    async def login(connector, session) -> tuple:
+        user = (await session.execute(select(User))).scalar_one()
+        released = await connector.release_connection(session)
+        in_transaction = session.in_transaction()
+
+        # Объекты после release остаются загруженными
+        return released, in_transaction, user.login
+
+    (released, in_transaction, login), checkouts = run(login)
+
+    assert released and not in_transaction
+    assert login == "user@example.com"
+    assert checkouts == 1
+
+
+def test_transaction_with_writes_keeps_connection() -> None:
+    async def write_then_release(connector, session) -> tuple:
+        await session.execute(update(User).values(is_active=False))
+        statement_write = await connector.release_connection(session)
+
+        return statement_write, session.in_transaction()
+
+    (released, in_transaction), _ = run(write_then_release)
+
+    assert not released and in_transaction
+
+    async def flush_then_release(connector, session) -> tuple:
+        user = (await session.execute(select(User))).scalar_one()
+        user.is_active = False
+        pending = await connector.release_connection(session)
+        await session.flush()
+        flushed = await connector.release_connection(session)
+
+        return pending, flushed
+
+    (pending, flushed), _ = run(flush_then_release)
+
+    assert not pending and not flushed
+
+
+def test_connection_hold_is_recorded_per_route() -> None:
+    before = hold_count()
+
+    async def two_phases(connector, session) -> None:
+        await session.execute(select(User))
+        await connector.release_connection(session)
+        await session.execute(select(User))
+
+    run(two_phases)
+
+    # Две транзакции: до release и после него до commit единицы работы
+    assert hold_count() - before == 2